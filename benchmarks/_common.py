@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark helpers
+=================
+
+Synthetic input generation and I/O accounting shared by the benchmark scripts.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Make the project root importable when running ``python benchmarks/<script>.py``
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def make_sample_pdfs(directory, count, pages_per_file, prefix="informe"):
+    """Write ``count`` synthetic PDFs with ``pages_per_file`` pages each."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for n in range(count):
+        path = os.path.join(directory, f"{prefix}_{n + 1:05d}.pdf")
+        c = canvas.Canvas(path, pagesize=letter)
+        for page in range(pages_per_file):
+            c.setFont("Helvetica", 12)
+            c.drawString(72, 720, f"{prefix} {n + 1} - page {page + 1}")
+            for line in range(40):
+                c.drawString(72, 700 - line * 15, "Lorem ipsum dolor sit amet " * 3)
+            c.showPage()
+        c.save()
+        files.append(path)
+    return files
+
+
+def make_scanned_pdfs(directory, count, pages_per_file, size=(1700, 2200), prefix="scan"):
+    """Write ``count`` scan-like PDFs: one full-page noise JPEG per page.
+
+    Noise does not compress, so every page carries a large DCT image stream
+    (about 1.5 MB at the default size), like a 200 dpi scan.
+    """
+    import random
+    from PIL import Image
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(0)
+    images = []
+    for n in range(pages_per_file):
+        path = os.path.join(directory, f"_page{n}.jpg")
+        Image.frombytes('L', size, rng.randbytes(size[0] * size[1])).save(path, quality=85)
+        images.append(ImageReader(path))
+
+    files = []
+    for n in range(count):
+        path = os.path.join(directory, f"{prefix}_{n + 1:05d}.pdf")
+        c = canvas.Canvas(path, pagesize=letter)
+        for page in range(pages_per_file):
+            # A distinct image per page: reportlab would share a repeated one
+            c.drawImage(images[page], 0, 0, *letter)
+            c.drawString(72, 36, f"{prefix} {n + 1} - page {page + 1}")
+            c.showPage()
+        c.save()
+        files.append(path)
+    return files
+
+
+def read_proc_io():
+    """All counters of /proc/self/io (rchar, syscr, wchar, syscw...), or None if unavailable."""
+    try:
+        with open('/proc/self/io') as f:
+            return {key: int(value) for key, value in (line.split(':') for line in f.read().splitlines())}
+    except (OSError, ValueError):
+        return None
+
+
+def read_io_counters():
+    """Return (bytes written, write syscalls) for this process, or None if unavailable."""
+    values = read_proc_io()
+    if not values or 'wchar' not in values or 'syscw' not in values:
+        return None
+    return values['wchar'], values['syscw']
+
+
+@contextmanager
+def measure():
+    """Measure wall-clock time and bytes written inside the block."""
+    result = {}
+    io_before = read_io_counters()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - start
+        io_after = read_io_counters()
+        if io_before and io_after:
+            result['bytes_written'] = io_after[0] - io_before[0]
+            result['write_calls'] = io_after[1] - io_before[1]
+
+
+def format_bytes(value):
+    """Human readable byte count."""
+    if value is None:
+        return "n/a"
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
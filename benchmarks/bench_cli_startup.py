@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CLI cold-start benchmark
+========================
+
+Measures the cold-start latency of ``cli.py`` in fresh interpreters, prints
+the slowest imports from a ``-X importtime`` breakdown and checks that no
+heavy library (Qt, PDF engines) is imported before an operation needs it.
+
+Exits with status 1 when the median start-up exceeds ``--max-ms`` (over the
+bare interpreter) or a heavy module is imported, so it can be used as a
+regression check.
+
+Usage:
+    python benchmarks/bench_cli_startup.py [--repeat 20] [--top 15] [--max-ms 60]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _common import ROOT_DIR
+
+CLI = os.path.join(ROOT_DIR, 'cli.py')
+
+# Modules that must only be imported by the operation that uses them
+HEAVY_MODULES = ('PyQt6', 'PyPDF2', 'fitz', 'pymupdf', 'reportlab', 'pdf_utils')
+
+CHECK_IMPORTS = "import sys, cli; print(','.join(m for m in {modules!r} if m in sys.modules))"
+
+
+def time_command(command, repeat):
+    """Wall-clock milliseconds of ``repeat`` runs of a command."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def import_breakdown(top):
+    """Slowest modules (cumulative microseconds) while importing cli."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import cli'],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top], len(rows)
+
+
+def heavy_imports():
+    """Heavy modules present after importing cli."""
+    code = CHECK_IMPORTS.format(modules=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='fail if the median start-up over the bare interpreter exceeds this')
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, '-c', 'pass'], args.repeat)
+    help_run = time_command([sys.executable, CLI, '--help'], args.repeat)
+    overhead = statistics.median(help_run) - statistics.median(baseline)
+
+    print(f"{'command':<22}{'median ms':>12}{'min ms':>10}")
+    for label, samples in (('python -c pass', baseline), ('cli.py --help', help_run)):
+        print(f"{label:<22}{statistics.median(samples):>12.1f}{min(samples):>10.1f}")
+    print(f"{'cli overhead':<22}{overhead:>12.1f}")
+
+    rows, total = import_breakdown(args.top)
+    print(f"\nimport cli: {total} modules, slowest {len(rows)} (-X importtime, cumulative)")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative_us, self_us, name in rows:
+        print(f"{cumulative_us / 1000:>14.2f}{self_us / 1000:>10.2f}  {name}")
+
+    failures = []
+    loaded = heavy_imports()
+    if loaded:
+        failures.append(f"heavy modules imported at start-up: {', '.join(loaded)}")
+    if args.max_ms is not None and overhead > args.max_ms:
+        failures.append(f"start-up overhead {overhead:.1f} ms exceeds {args.max_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP server load benchmark
+==========================
+
+Starts ``core.http_server.CombineServer`` on an ephemeral localhost port and
+drives it with a local client: ``--requests`` merges with ``--concurrency``
+requests in flight, each one a ``POST /jobs?wait=1`` that returns the merged
+PDF in the response body. Inputs are either uploaded as multipart/form-data
+or referenced by server-side path (``--mode paths``).
+
+Reports per-request latency percentiles and throughput. No outside services
+are needed; ``--url`` points the client at an already running server
+(``cli.py serve``) instead.
+
+Usage:
+    python benchmarks/bench_http_server.py [--requests 40] [--concurrency 4] [--files 5] [--pages 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import format_bytes, make_sample_pdfs
+
+
+def encode_multipart(files, fields):
+    """Body and content type of a multipart/form-data request."""
+    boundary = uuid.uuid4().hex
+    chunks = []
+    for name, value in fields:
+        chunks.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                      f'{value}\r\n'.encode('utf-8'))
+    for path in files:
+        with open(path, 'rb') as f:
+            data = f.read()
+        chunks.append(f'--{boundary}\r\nContent-Disposition: form-data; name="files"; '
+                      f'filename="{os.path.basename(path)}"\r\n'
+                      f'Content-Type: application/pdf\r\n\r\n'.encode('utf-8'))
+        chunks.append(data + b'\r\n')
+    chunks.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(chunks), f'multipart/form-data; boundary={boundary}'
+
+
+def build_request(url, mode, files, backend):
+    fields = [('backend', backend)] if backend else []
+    if mode == 'upload':
+        body, content_type = encode_multipart(files, fields)
+    else:
+        body = json.dumps({'files': files, **dict(fields)}).encode('utf-8')
+        content_type = 'application/json'
+    return urllib.request.Request(f"{url}/jobs?wait=1", data=body, method='POST',
+                                  headers={'Content-Type': content_type})
+
+
+def run_one(request):
+    """Latency in seconds and response size of one merge."""
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        size = len(response.read())
+    return time.perf_counter() - start, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--files', type=int, default=5)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--mode', choices=('upload', 'paths'), default='upload')
+    parser.add_argument('--backend', default=None)
+    parser.add_argument('--workers', type=int, default=None, help='server workers (in-process server)')
+    parser.add_argument('--url', default=None, help='use a running server instead of starting one')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sample_pdfs(os.path.join(tmp, 'inputs'), args.files, args.pages)
+
+        server = None
+        url = args.url
+        if url is None:
+            from core.http_server import CombineServer
+            start = time.perf_counter()
+            server = CombineServer('127.0.0.1', 0, args.workers, work_dir=os.path.join(tmp, 'server'),
+                                   quiet=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = server.address
+            print(f"server ready in {(time.perf_counter() - start) * 1000:.0f} ms at {url}")
+
+        try:
+            # The first request is not counted
+            run_one(build_request(url, args.mode, files, args.backend))
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                results = list(pool.map(run_one, (build_request(url, args.mode, files, args.backend)
+                                                  for _ in range(args.requests))))
+            elapsed = time.perf_counter() - start
+        finally:
+            if server is not None:
+                server.close()
+
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.files} files x {args.pages} pages ({args.mode})")
+    print(f"{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'req/s':>10}{'response':>12}")
+    print(f"{statistics.median(latencies):>10.1f}{p95:>10.1f}{latencies[-1]:>10.1f}"
+          f"{args.requests / elapsed:>10.2f}{format_bytes(results[0][1]):>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index layout benchmark
+======================
+
+Times the index layout computation and the drawing of the index pages for
+growing numbers of entries.
+
+Usage:
+    python benchmarks/bench_index_layout.py [--entries 100 1000 10000 50000]
+"""
+
+import argparse
+
+from _common import measure, format_bytes
+
+from pdf_utils import IndexGenerator, IndexLayout
+
+
+def run(entries, pages_per_document):
+    titles = [f"Documento de ejemplo número {i + 1} con un título largo" for i in range(entries)]
+    with measure() as layout_result:
+        layout = IndexLayout(titles)
+    start_pages = layout.start_pages([pages_per_document] * entries)
+    with measure() as draw_result:
+        buffer = IndexGenerator.create_index(start_pages, titles, layout)
+    return layout, layout_result['seconds'], draw_result['seconds'], len(buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--pages', type=int, default=10, help='pages per indexed document')
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}{'pages':>8}{'columns':>9}{'layout s':>10}{'draw s':>10}{'size':>12}")
+    for entries in args.entries:
+        layout, layout_seconds, draw_seconds, size = run(entries, args.pages)
+        print(f"{entries:>10}{layout.page_count:>8}{layout.columns:>9}"
+              f"{layout_seconds:>10.3f}{draw_seconds:>10.3f}{format_bytes(size):>12}")
+
+
+if __name__ == '__main__':
+    main()
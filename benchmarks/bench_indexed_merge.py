@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indexed merge benchmark
+=======================
+
+Compares the single-pass indexed merge against the legacy three-step path
+(temp file + PyMuPDF link pass + rename): wall-clock time and bytes written.
+
+Usage:
+    python benchmarks/bench_indexed_merge.py [--files 200] [--pages 10] [--backend pypdf2]
+"""
+
+import argparse
+import os
+import tempfile
+
+from _common import make_sample_pdfs, measure, format_bytes
+
+from pdf_utils import AdvancedPDFCombiner, MERGE_BACKENDS
+
+
+def run(files, output_path, single_pass, backend):
+    combiner = AdvancedPDFCombiner(files, backend=backend)
+    with measure() as result:
+        combiner.combine_with_index(output_path, single_pass=single_pass)
+    result['output_size'] = os.path.getsize(output_path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backend', choices=sorted(MERGE_BACKENDS), default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sample_pdfs(os.path.join(tmp, 'inputs'), args.files, args.pages)
+
+        print(f"{args.files} files x {args.pages} pages")
+        print(f"{'mode':<14}{'seconds':>10}{'written':>14}{'output':>14}")
+        for label, single_pass in (('three-step', False), ('single-pass', True)):
+            best = None
+            for i in range(args.repeat):
+                result = run(files, os.path.join(tmp, f'out_{label}_{i}.pdf'), single_pass, args.backend)
+                if best is None or result['seconds'] < best['seconds']:
+                    best = result
+            print(f"{label:<14}{best['seconds']:>10.3f}"
+                  f"{format_bytes(best.get('bytes_written')):>14}"
+                  f"{format_bytes(best['output_size']):>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory-mapped input benchmark
+=============================
+
+Compares the two input paths of the PyPDF2-based backends on scan-like
+inputs (one large DCT image stream per page):
+
+* ``file``: buffered ``open(path, 'rb')`` handed to PdfReader
+* ``mmap``: ``pdf_utils.MappedInput``; the stream backend also passes large
+  stream data through as memoryviews (PdfWriter is always given bytes)
+
+For each backend and input path it reports the best wall-clock time, the
+read system calls and bytes copied out of the kernel by ``read()``
+(``syscr``/``rchar`` from /proc/self/io, Linux only), the stream bytes
+passed through without a copy, and the Python allocation peak
+(tracemalloc, measured in a separate run).
+
+Usage:
+    python benchmarks/bench_input_mmap.py [--files 4] [--pages 10] [--repeat 3] [--backends pypdf2,stream]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from _common import format_bytes, make_scanned_pdfs, read_proc_io
+
+import pdf_utils
+from pdf_utils import AdvancedPDFCombiner, MappedInput
+
+
+class ZeroCopyCounter:
+    """Sum MappedInput.zero_copy_bytes over the inputs closed during a merge."""
+
+    def __init__(self):
+        self.total = 0
+        self._close = MappedInput.close
+
+    def __enter__(self):
+        counter = self
+
+        def close(mapped):
+            counter.total += mapped.zero_copy_bytes
+            counter._close(mapped)
+
+        MappedInput.close = close
+        return self
+
+    def __exit__(self, *exc):
+        MappedInput.close = self._close
+
+
+def merge(files, output, backend):
+    AdvancedPDFCombiner(files, backend=backend).combine_simple(output)
+
+
+def measure_run(files, output, backend, use_mmap, repeat):
+    pdf_utils.MMAP_INPUTS = use_mmap
+    merge(files, output, backend)  # Warm the page cache
+
+    best = None
+    for _ in range(repeat):
+        before = read_proc_io()
+        with ZeroCopyCounter() as zero_copy:
+            start = time.perf_counter()
+            merge(files, output, backend)
+            seconds = time.perf_counter() - start
+        after = read_proc_io()
+        if best is None or seconds < best['seconds']:
+            best = {'seconds': seconds, 'zero_copy': zero_copy.total,
+                    'syscr': after['syscr'] - before['syscr'] if before else None,
+                    'rchar': after['rchar'] - before['rchar'] if before else None}
+
+    tracemalloc.start()
+    merge(files, output, backend)
+    best['peak'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', default='pypdf2,stream')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_scanned_pdfs(os.path.join(tmp, 'inputs'), args.files, args.pages)
+        total = sum(os.path.getsize(f) for f in files)
+        output = os.path.join(tmp, 'merged.pdf')
+        print(f"{args.files} files x {args.pages} scanned pages, {format_bytes(total)} of input")
+        print(f"{'backend':<9}{'input':<6}{'seconds':>9}{'read calls':>12}{'read bytes':>12}"
+              f"{'zero-copy':>12}{'py peak':>11}")
+        for backend in args.backends.split(','):
+            for use_mmap in (False, True):
+                result = measure_run(files, output, backend, use_mmap, args.repeat)
+                calls = 'n/a' if result['syscr'] is None else str(result['syscr'])
+                print(f"{backend:<9}{'mmap' if use_mmap else 'file':<6}{result['seconds']:>9.3f}"
+                      f"{calls:>12}{format_bytes(result['rchar']):>12}"
+                      f"{format_bytes(result['zero_copy']):>12}{format_bytes(result['peak']):>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pre-parse end-to-end benchmark
+==============================
+
+Pre-parsing reads every input a second time: PyMuPDF opens it in a worker
+process, then the merge parses it again with PyPDF2 in the main process to
+copy its pages. It finds damaged and encrypted inputs before assembly
+starts, but it does not make the merge itself faster.
+
+This script merges a synthetic input set with PDFCombinerService.combine,
+without pre-parsing (preparse_workers=0, the default) and with 1, 2, 4, ...
+up to --max-workers processes. It reports the pre-parse stage on its own,
+the whole combine() call and the overhead over the merge without
+pre-parsing. Every run uses an empty metadata cache, so no input is
+skipped. The last two rows repeat the merge without pre-parsing and the
+largest run with the cache left by a previous merge: every input is
+already known, so pre-parsing is skipped. Times are the best of --repeat runs, after one warm-up merge.
+
+Usage:
+    python benchmarks/bench_preparse.py [--files 200] [--pages 20] [--max-workers 8]
+        [--backend stream] [--no-index] [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from _common import make_sample_pdfs
+
+from core.metadata_cache import MetadataCache
+from core.pdf_combiner import PDFCombinerService
+from core.preparse import preparse_inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--backend', default='stream')
+    parser.add_argument('--no-index', action='store_true')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sample_pdfs(os.path.join(tmp, 'inputs'), args.files, args.pages)
+        output = os.path.join(tmp, 'combined.pdf')
+        caches = []
+
+        def merge(workers, cache=None):
+            if cache is None:
+                cache = MetadataCache(os.path.join(tmp, f"cache{len(caches)}.db"))
+                caches.append(cache)
+            start = time.perf_counter()
+            PDFCombinerService(cache).combine(files, output, create_index=not args.no_index,
+                                              backend=args.backend, preparse_workers=workers)
+            return time.perf_counter() - start
+
+        def preparse(workers):
+            start = time.perf_counter()
+            reports = preparse_inputs(files, workers=workers)
+            assert all(r.ok for r in reports)
+            return time.perf_counter() - start
+
+        def best(measure, *measure_args):
+            return min(measure(*measure_args) for _ in range(args.repeat))
+
+        print(f"{args.files} files x {args.pages} pages, backend {args.backend}, "
+              f"{os.cpu_count()} CPUs")
+        print(f"{'workers':>8}{'preparse':>10}{'combine':>10}{'overhead':>10}")
+        merge(0)
+        baseline = best(merge, 0)
+        print(f"{'off':>8}{'-':>10}{baseline:>10.3f}{'-':>10}")
+        workers = 1
+        while workers <= args.max_workers:
+            preparse_time = best(preparse, workers)
+            elapsed = best(merge, workers)
+            print(f"{workers:>8}{preparse_time:>10.3f}{elapsed:>10.3f}{elapsed / baseline - 1:>+10.1%}")
+            workers *= 2
+
+        # The cache of the last run already holds every page count (and file hash)
+        cached_baseline = best(merge, 0, caches[-1])
+        print(f"{'off*':>8}{'-':>10}{cached_baseline:>10.3f}{'-':>10}")
+        elapsed = best(merge, workers // 2, caches[-1])
+        print(f"{f'{workers // 2}*':>8}{'-':>10}{elapsed:>10.3f}{elapsed / cached_baseline - 1:>+10.1%}")
+        print("* with a warm metadata cache")
+        for cache in caches:
+            cache.close()
+
+
+if __name__ == '__main__':
+    main()
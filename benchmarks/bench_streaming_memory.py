@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Merge memory benchmark
+======================
+
+Runs an indexed merge with each backend in a fresh child process and reports
+its peak RSS, to compare the bounded-memory streaming backend against the
+in-memory writers.
+
+Usage:
+    python benchmarks/bench_streaming_memory.py [--files 200] [--pages 50]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import ROOT_DIR, make_sample_pdfs, format_bytes
+
+from pdf_utils import MERGE_BACKENDS
+
+CHILD = """
+import resource, sys
+sys.path.insert(0, {root!r})
+from pdf_utils import AdvancedPDFCombiner
+files = sys.argv[2:]
+AdvancedPDFCombiner(files, backend=sys.argv[1]).combine_with_index({output!r})
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=100)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--backends', nargs='+', default=sorted(MERGE_BACKENDS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sample_pdfs(os.path.join(tmp, 'inputs'), args.files, args.pages)
+        output = os.path.join(tmp, 'merged.pdf')
+
+        print(f"{args.files} files x {args.pages} pages")
+        print(f"{'backend':<10}{'seconds':>10}{'peak RSS':>14}{'output':>14}")
+        for backend in args.backends:
+            code = CHILD.format(root=ROOT_DIR, output=output)
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, '-c', code, backend] + files,
+                                    capture_output=True, text=True, check=True)
+            elapsed = time.perf_counter() - start
+            # ru_maxrss is in KB on Linux
+            peak = int(result.stdout.strip().splitlines()[-1]) * 1024
+            print(f"{backend:<10}{elapsed:>10.2f}{format_bytes(peak):>14}"
+                  f"{format_bytes(os.path.getsize(output)):>14}")
+
+
+if __name__ == '__main__':
+    main()
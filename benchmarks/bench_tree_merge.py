@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tree-reduction merge benchmark
+==============================
+
+Merges a synthetic input set with PDFCombinerService.combine, first
+sequentially and then as a tree (tree_batch_size / tree_workers) for every
+combination of --batch-sizes and worker count (1, 2, 4, ... up to
+--max-workers). Each tree merge is checked to produce the same outline as
+the sequential one.
+
+Usage:
+    python benchmarks/bench_tree_merge.py [--files 1000] [--pages 2]
+        [--batch-sizes 16,64,256] [--max-workers 8] [--backend stream] [--no-index]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from _common import make_sample_pdfs
+
+from core.pdf_combiner import PDFCombinerService
+
+
+def outline(path):
+    import fitz
+    with fitz.open(path) as doc:
+        return doc.get_toc()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--batch-sizes', default='16,64,256')
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--backend', default='stream')
+    parser.add_argument('--no-index', action='store_true')
+    args = parser.parse_args()
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+
+    service = PDFCombinerService()
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sample_pdfs(os.path.join(tmp, 'inputs'), args.files, args.pages)
+        output = os.path.join(tmp, 'combined.pdf')
+
+        def run(**options):
+            start = time.perf_counter()
+            service.combine(files, output, create_index=not args.no_index,
+                            backend=args.backend, **options)
+            return time.perf_counter() - start
+
+        baseline = run(tree_batch_size=0)
+        expected = outline(output)
+
+        print(f"{args.files} files x {args.pages} pages, backend {args.backend}, "
+              f"{os.cpu_count()} CPUs")
+        print(f"sequential: {baseline:.3f}s")
+        print(f"{'batch':>8}{'workers':>8}{'levels':>8}{'seconds':>10}{'speedup':>10}")
+        for batch_size in batch_sizes:
+            workers = 1
+            while workers <= args.max_workers:
+                elapsed = run(tree_batch_size=batch_size, tree_workers=workers)
+                assert outline(output) == expected, "outline differs from the sequential merge"
+                levels = (service.last_report.get('tree') or {}).get('levels', 0)
+                print(f"{batch_size:>8}{workers:>8}{levels:>8}{elapsed:>10.3f}{baseline / elapsed:>10.2f}")
+                workers *= 2
+
+
+if __name__ == '__main__':
+    main()
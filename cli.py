@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+PDF Combiner Pro - Interfaz de línea de comandos
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+
+# Agregar el directorio actual al path para imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import AppConfig
+
+# El servicio (y con él los motores PDF) se importa en main() después de
+# analizar los argumentos: --help y los errores de uso no pagan su arranque
+
+
+def _add_combine_parser(subparsers):
+    parser = subparsers.add_parser('combine', help='Combinar PDFs en un nuevo archivo')
+    parser.add_argument('files', nargs='+',
+                        help='PDFs de entrada, en orden; también miembros de un ZIP/TAR '
+                             '("bundle.zip!/carpeta/doc.pdf") o un comprimido entero')
+    parser.add_argument('-o', '--output', required=True, help='PDF de salida ("-" = salida estándar)')
+    parser.add_argument('--no-index', action='store_true', help='No crear índice interactivo')
+    parser.add_argument('--title', action='append', dest='titles',
+                        help='Título de cada archivo (repetir una vez por archivo)')
+    parser.add_argument('--pages', action='append', dest='page_ranges', metavar='RANGO',
+                        help='Páginas de cada archivo, p. ej. "1-3,10,-1" ("" = todas; '
+                             'repetir una vez por archivo)')
+    parser.add_argument('--workers', type=int, dest='preparse_workers',
+                        help='Procesos para validar las entradas en paralelo (0 = desactivado)')
+    _add_engine_options(parser)
+    parser.set_defaults(handler=_run_combine)
+
+
+def _add_engine_options(parser):
+    parser.add_argument('--backend', help='Motor de combinación (pypdf2, pymupdf, stream)')
+    parser.add_argument('--repair', action='store_true', default=None,
+                        help='Normalizar PDFs dañados durante la validación')
+    parser.add_argument('--dedup', action='store_true', default=None,
+                        help='Escribir una sola vez los recursos repetidos')
+    parser.add_argument('--profile', choices=('classic', 'compact'), dest='output_profile',
+                        help='Perfil de salida')
+    parser.add_argument('--level', type=int, dest='compression_level', help='Nivel zlib (0-9)')
+    parser.add_argument('--skip-duplicates', action='store_true', default=None,
+                        help='Omitir las entradas con el mismo contenido que otra anterior')
+    parser.add_argument('--tree-batch', type=int, dest='tree_batch_size', metavar='N',
+                        help='Combinar en árbol: lotes de N entradas en paralelo (0 = secuencial)')
+    parser.add_argument('--tree-workers', type=int, dest='tree_workers',
+                        help='Procesos de la combinación en árbol (0 = uno por CPU)')
+
+
+def _engine_options(args) -> dict:
+    return {
+        'backend': args.backend,
+        'repair': args.repair,
+        'dedup': args.dedup,
+        'output_profile': args.output_profile,
+        'compression_level': args.compression_level,
+        'skip_duplicates': args.skip_duplicates,
+        'tree_batch_size': args.tree_batch_size,
+        'tree_workers': args.tree_workers,
+    }
+
+
+def _add_append_parser(subparsers):
+    parser = subparsers.add_parser('append', help='Añadir PDFs a un PDF combinado existente')
+    parser.add_argument('combined', help='PDF combinado existente (se actualiza en el sitio)')
+    parser.add_argument('files', nargs='+',
+                        help='PDFs a añadir al final, en orden (admite comprimidos como en combine)')
+    parser.add_argument('--title', action='append', dest='titles',
+                        help='Título de cada archivo (repetir una vez por archivo)')
+    parser.set_defaults(handler=_run_append)
+
+
+def _add_split_parser(subparsers):
+    parser = subparsers.add_parser('split', help='Dividir un PDF en varios (inverso de combine)')
+    parser.add_argument('source', help='PDF a dividir')
+    parser.add_argument('-d', '--output-dir', required=True, help='Directorio de las partes')
+    parser.add_argument('--pages', action='append', dest='page_ranges', metavar='RANGO',
+                        help='Páginas de una parte, p. ej. "1-3" (repetir una vez por parte); '
+                             'por defecto, una parte por documento del índice')
+    parser.add_argument('--title', action='append', dest='titles',
+                        help='Título de cada parte (repetir una vez por parte)')
+    parser.add_argument('-j', '--jobs', type=int, dest='split_workers',
+                        help='Procesos en paralelo (0 = uno por CPU)')
+    parser.add_argument('--profile', choices=('classic', 'compact'), dest='output_profile',
+                        help='Perfil de salida')
+    parser.add_argument('--level', type=int, dest='compression_level', help='Nivel zlib (0-9)')
+    parser.set_defaults(handler=_run_split)
+
+
+def _add_batch_parser(subparsers):
+    parser = subparsers.add_parser('batch', help='Ejecutar las combinaciones de un manifiesto JSON o CSV')
+    parser.add_argument('manifest', help='Manifiesto de trabajos (.json o .csv)')
+    parser.add_argument('-j', '--jobs', type=int, dest='batch_workers',
+                        help='Procesos en paralelo (0 = uno por CPU)')
+    parser.add_argument('--results', help='Archivo JSON de resultados (por defecto <manifiesto>.results.json)')
+    _add_engine_options(parser)
+    parser.set_defaults(handler=_run_batch)
+
+
+def _add_queue_parser(subparsers):
+    parser = subparsers.add_parser('queue', help='Cola persistente de trabajos con reintentos')
+    parser.add_argument('--db', help='Archivo SQLite de la cola (por defecto en el directorio de caché)')
+    actions = parser.add_subparsers(dest='queue_action', required=True)
+
+    add = actions.add_parser('add', help='Encolar los trabajos de un manifiesto JSON o CSV')
+    add.add_argument('manifest', help='Manifiesto de trabajos (.json o .csv)')
+    _add_engine_options(add)
+
+    run = actions.add_parser('run', help='Ejecutar los trabajos pendientes')
+    run.add_argument('-j', '--jobs', type=int, dest='queue_workers',
+                     help='Procesos en paralelo (0 = uno por CPU)')
+    run.add_argument('--follow', action='store_true',
+                     help='Seguir esperando trabajos nuevos cuando la cola se vacía')
+
+    actions.add_parser('status', help='Mostrar el estado de los trabajos en JSON')
+    parser.set_defaults(handler=_run_queue)
+
+
+def _add_serve_parser(subparsers):
+    parser = subparsers.add_parser('serve', help='Servidor HTTP local de combinación')
+    parser.add_argument('--host', default=AppConfig.SERVER_HOST, help='Dirección de escucha')
+    parser.add_argument('--port', type=int, default=AppConfig.SERVER_PORT, help='Puerto (0 = libre)')
+    parser.add_argument('--workers', type=int, dest='server_workers',
+                        help='Combinaciones simultáneas')
+    parser.add_argument('--output-dir', dest='server_output_dir',
+                        help='Directorio en el que los clientes pueden pedir la salida ("output")')
+    parser.add_argument('--quiet', action='store_true', help='No registrar cada petición')
+    parser.set_defaults(handler=_run_serve)
+
+
+def _check_titles(args):
+    from core.archives import ArchiveError, expand_archives
+    from core.pdf_combiner import PDFCombinerError
+    try:
+        args.files = expand_archives(args.files)
+    except ArchiveError as e:
+        raise PDFCombinerError(str(e))
+    if not args.files:
+        raise PDFCombinerError("No hay archivos para combinar")
+    if args.titles is not None and len(args.titles) != len(args.files):
+        raise PDFCombinerError("Debe indicarse un --title por cada archivo")
+    if getattr(args, 'page_ranges', None) is not None and len(args.page_ranges) != len(args.files):
+        raise PDFCombinerError("Debe indicarse un --pages por cada archivo")
+
+
+def _emit_event(record: dict) -> None:
+    """Escribir un evento JSON (una línea) en stderr"""
+    print(json.dumps(record, ensure_ascii=False), file=sys.stderr, flush=True)
+
+
+def _emit_progress(event) -> None:
+    record = {'event': 'progress'}
+    record.update(event._asdict())
+    record['elapsed'] = round(event.elapsed, 3)
+    _emit_event(record)
+
+
+def _progress_hooks(args) -> dict:
+    """Token de cancelación (tiempo límite, SIGINT/SIGTERM) y eventos de progreso"""
+    from pdf_utils import CancellationToken
+
+    token = CancellationToken(args.timeout)
+    # Cancelar en lugar de morir: así se elimina la salida parcial
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: token.cancel())
+
+    hooks = {'cancel_token': token}
+    if args.events:
+        hooks['progress_callback'] = _emit_progress
+    return hooks
+
+
+def _run_combine(service: 'PDFCombinerService', args) -> str:
+    _check_titles(args)
+    to_stdout = args.output == '-'
+    result = service.combine(
+        files=args.files,
+        output_path=sys.stdout.buffer if to_stdout else args.output,
+        create_index=not args.no_index,
+        titles=args.titles,
+        page_ranges=args.page_ranges,
+        preparse_workers=args.preparse_workers,
+        **_engine_options(args),
+        **_progress_hooks(args),
+    )
+    for duplicate, original in service.last_report.get('skipped_duplicates', []):
+        print(f"Omitido {duplicate}: mismo contenido que {original}", file=sys.stderr)
+    # La salida estándar sólo lleva el PDF
+    return None if to_stdout else result
+
+
+def _run_append(service: 'PDFCombinerService', args) -> str:
+    _check_titles(args)
+    return service.append(args.combined, args.files, titles=args.titles, **_progress_hooks(args))
+
+
+def _run_split(service: 'PDFCombinerService', args) -> str:
+    paths = service.split(args.source, args.output_dir, page_ranges=args.page_ranges, titles=args.titles,
+                          workers=args.split_workers, output_profile=args.output_profile,
+                          compression_level=args.compression_level)
+    return "\n".join(paths)
+
+
+def _run_batch(service: 'PDFCombinerService', args) -> str:
+    from core.batch_runner import load_manifest, resolve_workers, run_batch, write_results
+    from core.pdf_combiner import PDFCombinerError
+
+    jobs = load_manifest(args.manifest)
+    workers = resolve_workers(args.batch_workers, len(jobs))
+    results_path = args.results or os.path.splitext(args.manifest)[0] + '.results.json'
+
+    def on_result(result):
+        if args.events:
+            _emit_event({'event': 'job', 'id': result.job_id, 'status': result.status,
+                         'output': result.output_path, 'seconds': round(result.seconds, 3),
+                         'error': result.error})
+            return
+        detail = result.error or result.output_path
+        print(f"[{result.status}] {result.job_id} ({result.seconds:.2f}s): {detail}", file=sys.stderr)
+
+    start = time.perf_counter()
+    results = run_batch(jobs, workers, _engine_options(args), on_result=on_result)
+    write_results(results_path, results, time.perf_counter() - start, workers)
+
+    failed = [r.job_id for r in results if r.status != 'ok']
+    if failed:
+        raise PDFCombinerError(f"{len(failed)} de {len(results)} trabajos fallaron (ver {results_path})")
+    return results_path
+
+
+def _run_queue(service: 'PDFCombinerService', args) -> str:
+    import threading
+    from core.batch_runner import load_manifest
+    from core.job_queue import JobQueue, run_queue
+    from core.pdf_combiner import PDFCombinerError
+
+    queue = JobQueue(args.db)
+    try:
+        if args.queue_action == 'add':
+            jobs = load_manifest(args.manifest)
+            options = {k: v for k, v in _engine_options(args).items() if v is not None}
+            added = queue.enqueue(jobs, options)
+            return f"{added} trabajos añadidos ({len(jobs) - added} ya estaban en la cola)"
+
+        if args.queue_action == 'status':
+            return json.dumps({'counts': queue.counts(), 'jobs': queue.jobs()}, ensure_ascii=False, indent=2)
+
+        # Al primer SIGINT/SIGTERM se terminan los trabajos en curso y no se toman más
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        def on_result(result, status):
+            if args.events:
+                _emit_event({'event': 'job', 'id': result.job_id, 'status': status,
+                             'output': result.output_path, 'seconds': round(result.seconds, 3),
+                             'error': result.error})
+                return
+            detail = result.error or result.output_path
+            print(f"[{status}] {result.job_id} ({result.seconds:.2f}s): {detail}", file=sys.stderr)
+
+        summary = run_queue(queue, args.queue_workers, follow=args.follow, on_result=on_result,
+                            stop_event=stop)
+        counts = queue.counts()
+        if summary['failed']:
+            raise PDFCombinerError(f"{summary['failed']} trabajos fallaron tras agotar los reintentos")
+        return (f"{summary['done']} completados, {counts['pending']} pendientes, "
+                f"{counts['failed']} fallidos")
+    finally:
+        queue.close()
+
+
+def _run_serve(service: 'PDFCombinerService', args) -> str:
+    import threading
+    from core.http_server import CombineServer
+
+    server = CombineServer(args.host, args.port, args.server_workers, quiet=args.quiet,
+                          output_dir=args.server_output_dir)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Escuchando en {server.address}", file=sys.stderr, flush=True)
+    stop.wait()
+    server.close()
+    return "Servidor detenido"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construir el parser de argumentos"""
+    parser = argparse.ArgumentParser(prog='pdfcombiner', description=AppConfig.WINDOW_TITLE)
+    parser.add_argument('--report', action='store_true',
+                        help='Mostrar el informe de la operación en JSON')
+    parser.add_argument('--events', action='store_true',
+                        help='Emitir eventos de progreso por stderr en JSON (uno por línea)')
+    parser.add_argument('--timeout', type=float,
+                        help='Cancelar la combinación si dura más de estos segundos (combine, append)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    _add_combine_parser(subparsers)
+    _add_append_parser(subparsers)
+    _add_split_parser(subparsers)
+    _add_batch_parser(subparsers)
+    _add_queue_parser(subparsers)
+    _add_serve_parser(subparsers)
+    return parser
+
+
+def main(argv=None) -> int:
+    """Función principal de la línea de comandos"""
+    args = build_parser().parse_args(argv)
+    from core.pdf_combiner import PDFCombinerService, PDFCombinerError, PDFCombinerCancelled
+
+    try:
+        service = PDFCombinerService()
+        result = args.handler(service, args)
+    except PDFCombinerError as e:
+        if args.events:
+            _emit_event({'event': 'error', 'message': str(e),
+                         'cancelled': isinstance(e, PDFCombinerCancelled)})
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    # Con el PDF en la salida estándar, los mensajes van a stderr
+    messages = sys.stderr if getattr(args, 'output', None) == '-' else sys.stdout
+    if result is not None:
+        print(result, file=messages)
+    if args.report:
+        print(json.dumps(service.last_report, ensure_ascii=False), file=messages)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,3 +20,63 @@ class AppConfig:
 
     # Configuración de archivos
     DEFAULT_OUTPUT_NAME = "PDF_Combinado.pdf"
+
+    # Motor de combinación: "pypdf2" (Python puro), "pymupdf" (nativo, más rápido)
+    # o "stream" (escritura en streaming con memoria acotada para combinaciones muy grandes)
+    MERGE_BACKEND = "pypdf2"
+
+    # Caché persistente de metadatos (recuento de páginas, títulos, hashes)
+    METADATA_CACHE_ENABLED = True
+    METADATA_CACHE_PATH = None  # None = directorio de caché del usuario
+    METADATA_CACHE_MAX_ENTRIES = 20000
+
+    # Procesos para el pre-análisis en paralelo de los PDFs (0 = desactivado). Cada entrada
+    # se lee una vez más: los errores aparecen antes de combinar, pero la combinación no es
+    # más rápida (ver benchmarks/bench_preparse.py)
+    PREPARSE_WORKERS = 0
+    REPAIR_INPUTS = False
+
+    # Escribir una sola vez los recursos repetidos entre PDFs (backends "stream" y "pymupdf")
+    DEDUP_RESOURCES = False
+
+    # Archivos con el mismo contenido (SHA-256) que otro anterior de la lista: se omiten al
+    # añadirlos y al combinar si está activado; si no, la interfaz sólo los señala
+    SKIP_DUPLICATE_INPUTS = False
+    DUPLICATE_HASH_WORKERS = 4  # Hilos para calcular los hashes
+
+    # Perfil de salida: "classic" o "compact" (object streams + xref stream, backends "stream" y "pymupdf")
+    OUTPUT_PROFILE = "classic"
+    COMPRESSION_LEVEL = 6  # Nivel zlib (0-9)
+
+    # Procesos para el modo por lotes (cli.py batch; 0 = uno por CPU)
+    BATCH_WORKERS = 0
+
+    # Procesos que escriben las partes al dividir un PDF (cli.py split; 0 = uno por CPU)
+    SPLIT_WORKERS = 0
+
+    # Combinación en árbol: con más entradas que el tamaño de lote, se combinan lotes en
+    # paralelo en documentos intermedios y después éstos entre sí (0 = combinación secuencial)
+    TREE_MERGE_BATCH_SIZE = 0
+    TREE_MERGE_WORKERS = 0  # Procesos (0 = uno por CPU)
+
+    # Combinaciones simultáneas de la API asyncio (core.async_service)
+    ASYNC_MAX_CONCURRENCY = 4
+
+    # Servidor HTTP local (cli.py serve)
+    SERVER_HOST = "127.0.0.1"
+    SERVER_PORT = 8765
+    SERVER_WORKERS = 4
+    SERVER_MAX_UPLOAD_MB = 512
+    SERVER_JOB_TTL = 3600  # Segundos que se conservan los trabajos terminados
+    # Directorio en el que los clientes pueden pedir la salida con 'output'
+    # (None = el resultado sólo se descarga desde /jobs/<id>/result)
+    SERVER_OUTPUT_DIR = None
+
+    # Cola persistente de trabajos (cli.py queue)
+    QUEUE_DB_PATH = None  # None = directorio de caché del usuario
+    QUEUE_WORKERS = 0  # Procesos (0 = uno por CPU)
+    QUEUE_MAX_ATTEMPTS = 3
+    QUEUE_RETRY_DELAY = 5.0  # Segundos antes del primer reintento; se duplica en cada fallo
+    QUEUE_RETRY_MAX_DELAY = 300.0
+    QUEUE_LEASE_SECONDS = 300.0  # Un trabajo sin renovar durante este tiempo se considera huérfano
+    QUEUE_POLL_INTERVAL = 1.0
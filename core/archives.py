@@ -0,0 +1,309 @@
+"""
+PDFs dentro de archivos ZIP y TAR
+
+Un miembro de un comprimido se indica como ``comprimido!/ruta/del/miembro.pdf``
+(p. ej. ``bundle.zip!/2024/informe.pdf``) y se usa como cualquier otra ruta de
+entrada. Cada miembro se abre cuando la combinación llega a él: los guardados
+sin comprimir se leen directamente del comprimido; los demás se descomprimen
+en ese momento (ver ArchiveMember).
+"""
+import functools
+import mmap
+import os
+import shutil
+import struct
+import tarfile
+import tempfile
+import zipfile
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+MEMBER_SEPARATOR = '!/'
+ZIP_EXTENSIONS = ('.zip',)
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ARCHIVE_EXTENSIONS = ZIP_EXTENSIONS + TAR_EXTENSIONS
+
+# Los miembros comprimidos de hasta este tamaño se descomprimen en memoria; los mayores, a disco
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Cabecera local de un miembro ZIP: firma, versión, flags, método, hora, fecha,
+# CRC, tamaños, longitud del nombre y longitud del campo extra
+_ZIP_LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+_ZIP_LOCAL_SIGNATURE = b'PK\x03\x04'
+
+
+class ArchiveError(Exception):
+    """Comprimido o miembro ilegible"""
+    pass
+
+
+def is_archive(path: str) -> bool:
+    """Si la ruta tiene extensión de comprimido soportado"""
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def member_path(archive: str, member: str) -> str:
+    """Ruta de entrada de un miembro de un comprimido"""
+    return f"{archive}{MEMBER_SEPARATOR}{member}"
+
+
+def split_member_path(path) -> Optional[Tuple[str, str]]:
+    """(comprimido, miembro) de una ruta de miembro, o None si es una ruta normal"""
+    if not isinstance(path, str):
+        return None
+    index = path.find(MEMBER_SEPARATOR)
+    while index != -1:
+        if is_archive(path[:index]):
+            return path[:index], path[index + len(MEMBER_SEPARATOR):]
+        index = path.find(MEMBER_SEPARATOR, index + 1)
+    return None
+
+
+def is_member_path(path) -> bool:
+    return split_member_path(path) is not None
+
+
+def _open_tar(archive: str) -> tarfile.TarFile:
+    try:
+        return tarfile.open(archive, 'r:*')
+    except (OSError, tarfile.TarError) as e:
+        raise ArchiveError(f"No se pudo abrir {archive}: {e}")
+
+
+def list_pdf_members(archive: str) -> List[str]:
+    """Nombres de los PDFs de un comprimido, en el orden en que están guardados"""
+    try:
+        if archive.lower().endswith(ZIP_EXTENSIONS):
+            with zipfile.ZipFile(archive) as zf:
+                return [info.filename for info in zf.infolist()
+                        if not info.is_dir() and info.filename.lower().endswith('.pdf')]
+        with _open_tar(archive) as tf:
+            return [info.name for info in tf if info.isfile() and info.name.lower().endswith('.pdf')]
+    except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+        raise ArchiveError(f"No se pudo leer {archive}: {e}")
+
+
+def expand_archives(paths: List[str]) -> List[str]:
+    """
+    Sustituir cada comprimido por sus PDFs
+
+    Un comprimido se indica como ``bundle.zip``, ``bundle.zip!/`` o, para una
+    sola carpeta, ``bundle.zip!/carpeta/``. Los PDFs se ordenan por el título extraído del nombre del miembro, como
+    los de un directorio; el resto de rutas se mantienen.
+    """
+    from utils.text_processor import TextProcessor
+
+    expanded = []
+    for path in paths:
+        if is_archive(path) and os.path.isfile(path):
+            parts = (path, '')
+        else:
+            parts = split_member_path(path)
+        if parts is None or (parts[1] and not parts[1].endswith('/')):
+            expanded.append(path)
+            continue
+        archive, prefix = parts
+        members = [m for m in list_pdf_members(archive) if m.startswith(prefix)]
+        members.sort(key=lambda m: TextProcessor.extract_title(os.path.basename(m)).lower())
+        expanded.extend(member_path(archive, m) for m in members)
+    return expanded
+
+
+def member_exists(path: str) -> bool:
+    """Si la ruta es un miembro existente de un comprimido"""
+    parts = split_member_path(path)
+    if parts is None or not os.path.isfile(parts[0]):
+        return False
+    try:
+        return parts[1] in list_pdf_members(parts[0])
+    except ArchiveError:
+        return False
+
+
+def _map_file(archive: str) -> mmap.mmap:
+    with open(archive, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _spool(source: BinaryIO, max_size: Optional[int]) -> BinaryIO:
+    """Copiar un miembro descomprimido a un temporal: en memoria hasta ``max_size``, con None siempre en disco"""
+    spool = tempfile.TemporaryFile() if max_size is None else tempfile.SpooledTemporaryFile(max_size=max_size)
+    try:
+        shutil.copyfileobj(source, spool, COPY_CHUNK_SIZE)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+class ArchiveMember:
+    """
+    Miembro de un comprimido que se abre cuando la combinación llega a él
+
+    ``open()`` devuelve un miembro guardado sin comprimir (ZIP "stored" o TAR
+    sin comprimir) como vista del comprimido mapeado en memoria, sin copiarlo.
+    Los demás se descomprimen al abrirlos en un temporal, en memoria hasta
+    SPOOL_MAX_SIZE y en disco por encima; quien lo abre lo cierra en cuanto ha
+    añadido el documento, así que nunca hay más de un miembro descomprimido en
+    memoria. Los de un TAR comprimido se descomprimen a disco (ver _CompressedTar).
+    """
+
+    def __init__(self, archive: str, member: str, opener):
+        self.archive = archive
+        self.member = member
+        self.name = member_path(archive, member)
+        self._opener = opener
+
+    def open(self) -> Union[memoryview, BinaryIO]:
+        """
+        Abrir el miembro: vista del comprimido o archivo temporal, que cierra quien lo abre
+
+        Raises:
+            ArchiveError: Si el miembro no se puede leer
+        """
+        try:
+            return self._opener()
+        except ArchiveError:
+            raise
+        except (OSError, KeyError, zipfile.BadZipFile, tarfile.TarError, RuntimeError) as e:
+            raise ArchiveError(f"No se pudo leer {self.name}: {e}")
+
+    def __repr__(self):
+        return f"ArchiveMember({self.name!r})"
+
+
+def _zip_members(archive: str, members: List[str]) -> Dict[str, ArchiveMember]:
+    with zipfile.ZipFile(archive) as zf:
+        infos = {member: zf.getinfo(member) for member in members}
+    return {member: ArchiveMember(archive, member, functools.partial(_open_zip_member, archive, info))
+            for member, info in infos.items()}
+
+
+def _open_zip_member(archive: str, info: zipfile.ZipInfo) -> Union[memoryview, BinaryIO]:
+    encrypted = info.flag_bits & 0x1
+    if info.compress_type != zipfile.ZIP_STORED or encrypted or not info.file_size:
+        with zipfile.ZipFile(archive) as zf, zf.open(info) as member:
+            return _spool(member, SPOOL_MAX_SIZE)
+    mapped = _map_file(archive)
+    (signature, *_, name_length, extra_length) = _ZIP_LOCAL_HEADER.unpack_from(mapped, info.header_offset)
+    if signature != _ZIP_LOCAL_SIGNATURE:
+        raise zipfile.BadZipFile(f"Cabecera local no válida en {info.filename}")
+    start = info.header_offset + _ZIP_LOCAL_HEADER.size + name_length + extra_length
+    return memoryview(mapped)[start:start + info.file_size]
+
+
+def _tar_members(archive: str, members: List[str]) -> Dict[str, ArchiveMember]:
+    """Un TAR sin comprimir se recorre aquí (sólo cabeceras); uno comprimido, al abrir el primer miembro"""
+    try:
+        tf = tarfile.open(archive, 'r:')
+    except tarfile.ReadError:
+        extraction = _CompressedTar(archive, members)
+        return {member: ArchiveMember(archive, member, functools.partial(extraction.open, member))
+                for member in members}
+
+    wanted = set(members)
+    infos = {}
+    with tf:
+        for info in tf:
+            if info.name not in wanted or info.name in infos:
+                continue
+            if not info.isfile():
+                raise ArchiveError(f"{info.name} no es un archivo")
+            infos[info.name] = info
+            if len(infos) == len(wanted):
+                # El resto del comprimido no hace falta
+                break
+    _check_missing(wanted, infos)
+    return {member: ArchiveMember(archive, member, functools.partial(_open_tar_member, archive, info))
+            for member, info in infos.items()}
+
+
+def _open_tar_member(archive: str, info: tarfile.TarInfo) -> Union[memoryview, BinaryIO]:
+    if info.sparse is not None or not info.size:
+        with tarfile.open(archive, 'r:') as tf:
+            return _spool(tf.extractfile(info), SPOOL_MAX_SIZE)
+    return memoryview(_map_file(archive))[info.offset_data:info.offset_data + info.size]
+
+
+class _CompressedTar:
+    """
+    Miembros de un TAR comprimido, que sólo se puede leer en orden
+
+    Al abrir el primero se descomprime el TAR en una sola pasada secuencial
+    y cada miembro pedido se copia a un temporal en disco (no a memoria),
+    sea cual sea el orden en que se pidan después.
+    """
+
+    def __init__(self, archive: str, members: List[str]):
+        self.archive = archive
+        self.members = members
+        self.files: Optional[Dict[str, BinaryIO]] = None
+
+    def open(self, member: str) -> BinaryIO:
+        if self.files is None:
+            self.files = self._extract()
+        file = self.files[member]
+        file.seek(0)
+        # Un archivo propio por apertura: el mismo miembro puede usarse varias veces
+        return os.fdopen(os.dup(file.fileno()), 'rb')
+
+    def _extract(self) -> Dict[str, BinaryIO]:
+        wanted = set(self.members)
+        files = {}
+        try:
+            with _open_tar(self.archive) as tf:
+                for info in tf:
+                    if info.name not in wanted or info.name in files:
+                        continue
+                    if not info.isfile():
+                        raise ArchiveError(f"{info.name} no es un archivo")
+                    files[info.name] = _spool(tf.extractfile(info), max_size=None)
+                    if len(files) == len(wanted):
+                        break
+            _check_missing(wanted, files)
+        except BaseException:
+            for file in files.values():
+                file.close()
+            raise
+        return files
+
+
+def _check_missing(wanted, found) -> None:
+    missing = wanted - found.keys()
+    if missing:
+        raise KeyError(f"no hay ningún miembro llamado {sorted(missing)[0]!r}")
+
+
+def open_members(paths: List[str]) -> Dict[str, ArchiveMember]:
+    """
+    Miembros de comprimidos listos para abrirse cuando se usen
+
+    Cada comprimido se abre aquí una sola vez para localizar sus miembros
+    (en un TAR comprimido, sin descomprimirlo: se comprueba al abrir el
+    primero). El contenido no se lee hasta ``ArchiveMember.open``.
+
+    Returns:
+        {ruta del miembro: ArchiveMember}
+
+    Raises:
+        ArchiveError: Si un comprimido no se puede leer o falta un miembro
+    """
+    by_archive: Dict[str, List[str]] = {}
+    for path in dict.fromkeys(paths):
+        archive, member = split_member_path(path)
+        by_archive.setdefault(archive, []).append(member)
+
+    opened = {}
+    for archive, members in by_archive.items():
+        try:
+            if archive.lower().endswith(ZIP_EXTENSIONS):
+                found = _zip_members(archive, members)
+            else:
+                found = _tar_members(archive, members)
+        except ArchiveError:
+            raise
+        except (OSError, KeyError, zipfile.BadZipFile, tarfile.TarError) as e:
+            raise ArchiveError(f"No se pudo leer {archive}: {e}")
+        opened.update((member_path(archive, m), found[m]) for m in members)
+    return opened
@@ -0,0 +1,112 @@
+"""
+API asyncio del servicio de combinación de PDFs
+"""
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from config.settings import AppConfig
+from core.metadata_cache import MetadataCache, get_metadata_cache
+from core.pdf_combiner import PDFCombinerService
+
+
+class AsyncPDFCombinerService:
+    """
+    Servicio de combinación para aplicaciones asyncio
+
+    La lectura de las entradas, el análisis y la escritura se ejecutan en un
+    executor, de modo que el bucle de eventos nunca se bloquea. Un semáforo
+    limita las combinaciones simultáneas.
+
+    Los eventos de progreso (pdf_utils.MergeProgress) se entregan en el hilo
+    del bucle. Cancelar la tarea que espera una combinación cancela su token,
+    espera a que el trabajo se detenga y elimine la salida parcial, y después
+    propaga asyncio.CancelledError.
+
+    El executor debe ser de hilos: el token de cancelación y la función de
+    progreso se comparten con el trabajo en memoria.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_concurrency: Optional[int] = None,
+                 metadata_cache: Optional[MetadataCache] = None):
+        if max_concurrency is None:
+            max_concurrency = AppConfig.ASYNC_MAX_CONCURRENCY
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+
+        self.max_concurrency = max_concurrency
+        self.metadata_cache = metadata_cache or get_metadata_cache()
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_concurrency,
+                                                        thread_name_prefix='pdfcombiner')
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def combine(self, files: List[str], output_path: str, create_index: bool = True,
+                      titles: List[str] = None, progress_callback: Optional[Callable] = None,
+                      cancel_token=None, **options) -> str:
+        """
+        Combinar archivos PDF sin bloquear el bucle de eventos
+
+        Acepta los mismos argumentos que PDFCombinerService.combine.
+
+        Returns:
+            Ruta del archivo creado
+
+        Raises:
+            PDFCombinerCancelled: Si se canceló el token o se agotó su tiempo límite
+            PDFCombinerError: Si hay error en la combinación
+            asyncio.CancelledError: Si se canceló la tarea
+        """
+        return await self._run('combine', progress_callback, cancel_token,
+                               files=files, output_path=output_path, create_index=create_index,
+                               titles=titles, **options)
+
+    async def append(self, combined_path: str, files: List[str], titles: List[str] = None,
+                     progress_callback: Optional[Callable] = None, cancel_token=None) -> str:
+        """
+        Añadir PDFs a un PDF combinado existente sin bloquear el bucle de eventos
+
+        Equivalente asíncrono de PDFCombinerService.append.
+        """
+        return await self._run('append', progress_callback, cancel_token,
+                               combined_path=combined_path, files=files, titles=titles)
+
+    async def _run(self, method: str, progress_callback, cancel_token, **kwargs) -> str:
+        from pdf_utils import CancellationToken
+
+        token = cancel_token or CancellationToken()
+        loop = asyncio.get_running_loop()
+
+        callback = None
+        if progress_callback is not None:
+            def callback(event):
+                loop.call_soon_threadsafe(progress_callback, event)
+
+        async with self._semaphore:
+            # Un servicio por trabajo: last_report no se comparte entre combinaciones simultáneas
+            service = PDFCombinerService(self.metadata_cache)
+            call = functools.partial(getattr(service, method), progress_callback=callback,
+                                     cancel_token=token, **kwargs)
+            future = loop.run_in_executor(self._executor, call)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                token.cancel()
+                # El trabajo se detiene en el siguiente punto de control y limpia su salida
+                await asyncio.wait([future])
+                if not future.cancelled():
+                    future.exception()  # Ya se informa con CancelledError
+                raise
+
+    async def close(self) -> None:
+        """Esperar a los trabajos en curso y liberar el executor propio"""
+        if self._owns_executor:
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self._executor.shutdown, wait=True))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
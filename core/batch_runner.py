@@ -0,0 +1,215 @@
+"""
+Ejecución por lotes de combinaciones descritas en un manifiesto
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional
+
+from config.settings import AppConfig
+from core.archives import ArchiveError, expand_archives
+from core.pdf_combiner import PDFCombinerError
+
+# Separador de listas (archivos, títulos) en las columnas de un manifiesto CSV
+CSV_LIST_SEPARATOR = ';'
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'si', 'sí', 'on')
+_FALSE_VALUES = ('0', 'false', 'no', 'off', '')
+
+
+class BatchJob(NamedTuple):
+    """Una combinación del manifiesto"""
+    job_id: str
+    files: List[str]
+    output_path: str
+    titles: Optional[List[str]] = None
+    create_index: bool = True
+
+
+class BatchResult(NamedTuple):
+    """Resultado de una combinación del lote"""
+    job_id: str
+    output_path: str
+    status: str  # "ok" o "error"
+    seconds: float
+    error: Optional[str] = None
+    report: Optional[Dict] = None
+
+
+def load_manifest(path: str) -> List[BatchJob]:
+    """
+    Cargar un manifiesto JSON o CSV
+
+    JSON: lista de trabajos (o un objeto con clave "jobs") con las claves
+    "files", "output" y opcionalmente "titles", "index" e "id".
+    CSV: cabecera con las columnas output, files, titles, index e id; las
+    listas se separan con ";".
+
+    Las rutas relativas se resuelven respecto al directorio del manifiesto.
+
+    Raises:
+        PDFCombinerError: Si el manifiesto no es válido
+    """
+    try:
+        with open(path, newline='', encoding='utf-8') as file:
+            if path.lower().endswith('.csv'):
+                entries = list(csv.DictReader(file))
+            else:
+                entries = json.load(file)
+    except (OSError, ValueError) as e:
+        raise PDFCombinerError(f"No se pudo leer el manifiesto {path}: {e}")
+
+    if isinstance(entries, dict):
+        entries = entries.get('jobs')
+    if not isinstance(entries, list):
+        raise PDFCombinerError(f"El manifiesto {path} debe contener una lista de trabajos")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = [_parse_job(entry, number, base_dir) for number, entry in enumerate(entries, 1)]
+
+    # Dos trabajos no pueden escribir el mismo archivo en paralelo
+    outputs = set()
+    for job in jobs:
+        output = os.path.normcase(os.path.abspath(job.output_path))
+        if output in outputs:
+            raise PDFCombinerError(f"Trabajo {job.job_id}: salida repetida {job.output_path}")
+        outputs.add(output)
+    return jobs
+
+
+def _parse_job(entry, number: int, base_dir: str) -> BatchJob:
+    if not isinstance(entry, dict):
+        raise PDFCombinerError(f"Trabajo {number}: formato no válido")
+
+    files = _as_list(entry.get('files'))
+    output = entry.get('output')
+    if not files or not output:
+        raise PDFCombinerError(f"Trabajo {number}: faltan 'files' u 'output'")
+
+    # Un comprimido (bundle.zip, bundle.zip!/carpeta/) aporta todos sus PDFs, como en "combine"
+    try:
+        files = expand_archives([os.path.join(base_dir, f) for f in files])
+    except ArchiveError as e:
+        raise PDFCombinerError(f"Trabajo {number}: {e}")
+    if not files:
+        raise PDFCombinerError(f"Trabajo {number}: no hay archivos para combinar")
+
+    titles = _as_list(entry.get('titles')) or None
+    if titles is not None and len(titles) != len(files):
+        raise PDFCombinerError(f"Trabajo {number}: debe haber un título por archivo")
+
+    return BatchJob(
+        job_id=str(entry.get('id') or number),
+        files=files,
+        output_path=os.path.join(base_dir, output),
+        titles=titles,
+        create_index=_as_bool(entry.get('index', True), number),
+    )
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+    return [str(item) for item in value]
+
+
+def _as_bool(value, number: int) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise PDFCombinerError(f"Trabajo {number}: valor de 'index' no válido: {value}")
+
+
+def run_job(job: BatchJob, options: Optional[Dict] = None) -> BatchResult:
+    """
+    Ejecutar una combinación con PDFCombinerService
+
+    Se ejecuta en los procesos del pool, por lo que debe ser una función de
+    módulo y no lanza excepciones: los errores quedan en el resultado.
+    """
+    from core.pdf_combiner import PDFCombinerService
+
+    start = time.perf_counter()
+    try:
+        service = PDFCombinerService()
+        service.combine(job.files, job.output_path, create_index=job.create_index,
+                        titles=job.titles, **(options or {}))
+        return BatchResult(job.job_id, job.output_path, 'ok', time.perf_counter() - start,
+                           report=service.last_report)
+    except Exception as e:
+        return BatchResult(job.job_id, job.output_path, 'error', time.perf_counter() - start, str(e))
+
+
+def run_batch(jobs: List[BatchJob], workers: Optional[int] = None, options: Optional[Dict] = None,
+              on_result=None) -> List[BatchResult]:
+    """
+    Ejecutar los trabajos repartidos en un ProcessPoolExecutor
+
+    Args:
+        jobs: Trabajos a ejecutar
+        workers: Número de procesos (0 = uno por CPU); por defecto AppConfig.BATCH_WORKERS
+        options: Argumentos adicionales para PDFCombinerService.combine (backend, dedup...)
+        on_result: Función llamada con cada BatchResult al terminar
+
+    Returns:
+        Resultados en el mismo orden que ``jobs``
+    """
+    workers = resolve_workers(workers, len(jobs))
+    # Cada trabajo ya ocupa un proceso: sin pre-análisis ni árbol en paralelo salvo que se pida
+    options = dict(options or {})
+    options.setdefault('preparse_workers', 0)
+    options.setdefault('tree_workers', 1)
+
+    results = [None] * len(jobs)
+    if workers == 1:
+        for position, job in enumerate(jobs):
+            results[position] = run_job(job, options)
+            if on_result:
+                on_result(results[position])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_job, job, options): position for position, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if on_result:
+                    on_result(results[futures[future]])
+    return results
+
+
+def resolve_workers(workers: Optional[int], job_count: int) -> int:
+    """Número efectivo de procesos del lote (None = AppConfig.BATCH_WORKERS, 0 = uno por CPU)"""
+    if workers is None:
+        workers = AppConfig.BATCH_WORKERS
+    return max(1, min(workers or os.cpu_count() or 1, job_count or 1))
+
+
+def write_results(path: str, results: List[BatchResult], seconds: float, workers: int) -> None:
+    """Guardar los resultados del lote en JSON"""
+    summary = {
+        'jobs': len(results),
+        'succeeded': sum(1 for r in results if r.status == 'ok'),
+        'failed': sum(1 for r in results if r.status != 'ok'),
+        'workers': workers,
+        'seconds': round(seconds, 3),
+        'results': [
+            {
+                'id': r.job_id,
+                'output': r.output_path,
+                'status': r.status,
+                'seconds': round(r.seconds, 3),
+                'error': r.error,
+                'report': r.report,
+            }
+            for r in results
+        ],
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,75 @@
+"""
+Detección de PDFs con el mismo contenido
+"""
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config.settings import AppConfig
+from core.metadata_cache import MetadataCache, compute_sha256
+
+
+def find_duplicates(files: List[str], metadata_cache: Optional[MetadataCache] = None,
+                    workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Buscar archivos cuyo contenido es igual al de otro anterior de la lista
+
+    Sólo se calcula el SHA-256 de los archivos cuyo tamaño coincide con el de
+    otro, y los enlaces duros (mismo dispositivo e inodo) se reconocen sin
+    leerlos. Los hashes se calculan por bloques en un pool de hilos (hashlib
+    libera el GIL) y se guardan en la caché de metadatos, indexada por ruta,
+    tamaño y mtime, así que volver a comprobar los mismos archivos es
+    inmediato. Una ruta repetida en la lista no cuenta como duplicado.
+
+    Args:
+        files: Rutas a comprobar, en orden
+        metadata_cache: Caché donde leer y guardar los hashes (None = sin caché)
+        workers: Hilos para calcular los hashes; por defecto AppConfig.DUPLICATE_HASH_WORKERS
+
+    Returns:
+        {ruta duplicada: primera ruta con el mismo contenido}; los archivos
+        ilegibles se ignoran
+    """
+    by_size = defaultdict(list)
+    for path in dict.fromkeys(files):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        by_size[st.st_size].append((path, (st.st_dev, st.st_ino)))
+
+    # Identidad de cada candidato: el inodo o, si hace falta, el hash
+    identities = {}
+    to_hash = {}  # Ruta a leer por inodo -> rutas que comparten ese inodo
+    for group in by_size.values():
+        if len(group) < 2:
+            continue
+        inodes = defaultdict(list)
+        for path, inode in group:
+            inodes[inode].append(path)
+        if len(inodes) == 1:
+            for path, inode in group:
+                identities[path] = inode
+        else:
+            to_hash.update((paths[0], paths) for paths in inodes.values())
+
+    if to_hash:
+        hash_file = metadata_cache.get_sha256 if metadata_cache else compute_sha256
+        if workers is None:
+            workers = AppConfig.DUPLICATE_HASH_WORKERS
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(to_hash)))) as pool:
+            for paths, digest in zip(to_hash.values(), pool.map(hash_file, to_hash)):
+                if digest is not None:
+                    identities.update(dict.fromkeys(paths, digest))
+
+    duplicates = {}
+    first_seen = {}
+    for path in dict.fromkeys(files):
+        identity = identities.get(path)
+        if identity is None:
+            continue
+        original = first_seen.setdefault(identity, path)
+        if original != path:
+            duplicates[path] = original
+    return duplicates
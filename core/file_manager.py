@@ -4,6 +4,8 @@ Gestión de archivos y operaciones de sistema
 import os
 from typing import List, Dict, Tuple, Optional, NamedTuple
 from pathlib import Path
+from core.archives import ArchiveError, is_archive, list_pdf_members, member_path
+from core.metadata_cache import FileMetadata, MetadataCache, get_metadata_cache
 
 class FileManagerError(Exception):
     """Excepción personalizada para errores de gestión de archivos"""
@@ -19,9 +21,10 @@ class DirectoryEntry(NamedTuple):
 class FileManager:
     """Gestor de archivos PDF con navegación de directorios"""
 
-    def __init__(self, start_directory: str = "."):
+    def __init__(self, start_directory: str = ".", metadata_cache: Optional[MetadataCache] = None):
         """Inicializar con directorio de inicio"""
         self.current_directory = os.path.abspath(start_directory)
+        self.metadata_cache = metadata_cache if metadata_cache is not None else get_metadata_cache()
 
     def get_current_directory(self) -> str:
         """Obtener directorio actual"""
@@ -84,8 +87,7 @@ class FileManager:
                 elif item.lower().endswith('.pdf') and os.path.isfile(item_path):
                     # Usar TextProcessor para obtener título si está disponible
                     try:
-                        from utils.text_processor import TextProcessor
-                        title = TextProcessor.extract_title(item)
+                        title = self._get_title(item_path)
                         display_name = f"📄 {title}"
                     except ImportError:
                         display_name = f"📄 {os.path.splitext(item)[0]}"
@@ -110,6 +112,41 @@ class FileManager:
 
         return entries
 
+    def get_archive_entries(self, archive_path: str) -> List[DirectoryEntry]:
+        """Obtener los PDFs de un comprimido ZIP o TAR, ordenados por título como los de un directorio"""
+        try:
+            members = list_pdf_members(archive_path)
+        except ArchiveError as e:
+            raise FileManagerError(str(e))
+
+        entries = []
+        for member in members:
+            path = member_path(archive_path, member)
+            entries.append(DirectoryEntry(
+                name=member,
+                path=path,
+                is_directory=False,
+                display_name=f"📄 {self._get_title(path)}"
+            ))
+        entries.sort(key=lambda x: x.display_name.lower())
+        return entries
+
+    @staticmethod
+    def is_archive_file(path: str) -> bool:
+        """Verificar si una ruta es un comprimido ZIP o TAR con PDFs"""
+        return is_archive(path) and os.path.isfile(path)
+
+    def _get_title(self, file_path: str) -> str:
+        """Obtener título de un archivo a partir de su nombre"""
+        from utils.text_processor import TextProcessor
+        return TextProcessor.extract_title(os.path.basename(file_path))
+
+    def get_cached_metadata(self, file_path: str) -> Optional[FileMetadata]:
+        """Obtener metadatos ya cacheados de un archivo (sin leer el PDF)"""
+        if self.metadata_cache:
+            return self.metadata_cache.get(file_path)
+        return None
+
     def get_pdf_files_in_current_dir(self) -> List[str]:
         """Obtener solo archivos PDF del directorio actual"""
         try:
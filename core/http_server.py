@@ -0,0 +1,624 @@
+"""
+Servidor HTTP local de combinación de PDFs
+
+Endpoints:
+    GET    /health             Estado del servidor
+    POST   /jobs               Crear un trabajo (JSON con rutas del servidor o multipart con archivos);
+                               con ?wait=1 responde directamente con el PDF combinado
+    GET    /jobs               Listar trabajos
+    GET    /jobs/<id>          Estado y progreso de un trabajo
+    GET    /jobs/<id>/result   Descargar el PDF combinado
+    DELETE /jobs/<id>          Cancelar un trabajo y eliminar sus archivos temporales
+
+El cuerpo de cada petición se copia a un temporal (en memoria hasta
+SPOOL_MAX_SIZE, en disco por encima) y cada PDF subido, a otro temporal del
+directorio del trabajo, de modo que las subidas grandes no ocupan memoria.
+
+Sólo se atienden peticiones locales: las cabeceras Host y Origin deben
+indicar este equipo, para que una página web no pueda usar el servidor.
+El PDF combinado se escribe en el directorio del trabajo; un cliente sólo
+puede elegir la ruta de salida ('output') dentro de AppConfig.SERVER_OUTPUT_DIR.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+from email.parser import BytesParser
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from config.settings import AppConfig
+from core.archives import ArchiveError, expand_archives
+from core.metadata_cache import get_metadata_cache
+from core.pdf_combiner import PDFCombinerService, PDFCombinerError, PDFCombinerCancelled
+from utils.text_processor import TextProcessor
+
+CHUNK_SIZE = 1024 * 1024
+
+# Cuerpos y PDFs subidos de hasta este tamaño se guardan en memoria; los mayores, en disco
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Límites de las partes multipart que no son archivos
+MAX_PART_HEADER_LINES = 32
+MAX_FIELD_SIZE = 1024 * 1024
+
+# Opciones de PDFCombinerService.combine aceptadas en las peticiones
+ENGINE_OPTIONS = {
+    'backend': str,
+    'dedup': bool,
+    'output_profile': str,
+    'compression_level': int,
+    'repair': bool,
+    'preparse_workers': int,
+    'skip_duplicates': bool,
+    'tree_batch_size': int,
+    'tree_workers': int,
+}
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'si', 'sí', 'on')
+
+# Nombres de este equipo aceptados en las cabeceras Host y Origin
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+
+class RequestError(Exception):
+    """Petición no válida (respuesta 4xx)"""
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+class CombineJob:
+    """Trabajo de combinación del servidor"""
+
+    def __init__(self, job_id: str, files: List[Union[str, BinaryIO]], output_path: str, work_dir: str,
+                 titles: Optional[List[str]] = None, create_index: bool = True,
+                 options: Optional[Dict] = None):
+        from pdf_utils import CancellationToken
+
+        self.job_id = job_id
+        self.files = files
+        self.file_count = len(files)
+        self.output_path = output_path
+        self.work_dir = work_dir
+        self.titles = titles
+        self.create_index = create_index
+        self.options = options or {}
+        self.status = 'queued'  # queued, running, done, error, cancelled
+        self.progress = None
+        self.report = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_token = CancellationToken()
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict:
+        progress = self.progress._asdict() if self.progress else None
+        return {
+            'id': self.job_id,
+            'status': self.status,
+            'files': self.file_count,
+            'progress': progress,
+            'report': self.report,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'result': f"/jobs/{self.job_id}/result" if self.status == 'done' else None,
+        }
+
+
+class CombineServer:
+    """
+    Demonio HTTP con las librerías PDF ya cargadas y un pool de hilos de trabajo
+
+    Los trabajos comparten el proceso y la combinación es sobre todo código
+    Python: por el GIL, los trabajos simultáneos se reparten un solo núcleo.
+    ``workers`` limita cuántos avanzan a la vez, no los núcleos usados. Un
+    trabajo con rutas puede repartirse entre núcleos con 'tree_batch_size' y
+    'tree_workers' (pool de procesos de core.tree_merge).
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 workers: Optional[int] = None, work_dir: Optional[str] = None,
+                 job_ttl: Optional[float] = None, quiet: bool = False,
+                 output_dir: Optional[str] = None):
+        self.workers = workers or AppConfig.SERVER_WORKERS
+        self.job_ttl = AppConfig.SERVER_JOB_TTL if job_ttl is None else job_ttl
+        self.max_upload_bytes = AppConfig.SERVER_MAX_UPLOAD_MB * 1024 * 1024
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='pdfcombiner_server_')
+        os.makedirs(self.work_dir, exist_ok=True)
+        output_dir = output_dir or AppConfig.SERVER_OUTPUT_DIR
+        self.output_dir = os.path.realpath(output_dir) if output_dir else None
+        self.quiet = quiet
+        self.metadata_cache = get_metadata_cache()
+        self.jobs: Dict[str, CombineJob] = {}
+        self._lock = threading.Lock()
+
+        self._warm_up()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pdfcombiner')
+        self.httpd = ThreadingHTTPServer((host or AppConfig.SERVER_HOST,
+                                          AppConfig.SERVER_PORT if port is None else port),
+                                         CombineRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.combine_server = self
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def local_hosts(self) -> Tuple[str, ...]:
+        """Nombres de host aceptados: los de este equipo y la dirección de escucha"""
+        host = self.httpd.server_address[0]
+        if host in ('', '0.0.0.0', '::'):
+            return LOCAL_HOSTS
+        return LOCAL_HOSTS + (host,)
+
+    def resolve_output(self, output: Optional[str]) -> Optional[str]:
+        """
+        Ruta de salida pedida por el cliente, que debe quedar dentro de output_dir
+
+        Raises:
+            RequestError: Si el servidor no acepta rutas de salida o la ruta sale del directorio
+        """
+        if not output:
+            return None
+        if self.output_dir is None:
+            raise RequestError("El servidor no acepta rutas de salida ('output'); "
+                               "descargue el resultado desde /jobs/<id>/result", HTTPStatus.FORBIDDEN)
+        if not isinstance(output, str):
+            raise RequestError(f"Valor no válido para 'output': {output}")
+        path = os.path.realpath(os.path.join(self.output_dir, output))
+        if path == self.output_dir or os.path.commonpath([path, self.output_dir]) != self.output_dir:
+            raise RequestError(f"La ruta de salida debe estar dentro de {self.output_dir}",
+                               HTTPStatus.FORBIDDEN)
+        if os.path.isdir(path):
+            raise RequestError(f"La ruta de salida es un directorio: {output}")
+        return path
+
+    @staticmethod
+    def _warm_up() -> None:
+        """Cargar las librerías PDF al arrancar y no en la primera petición"""
+        import pdf_utils
+        pdf_utils._get_pypdf2()
+        pdf_utils._get_reportlab()
+        try:
+            pdf_utils._get_fitz()
+        except ImportError:
+            pass
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def close(self) -> None:
+        """Detener el servidor, cancelar los trabajos en curso y eliminar los temporales"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        with self._lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            job.cancel_token.cancel()
+        self.executor.shutdown(wait=True)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def new_work_dir(self) -> str:
+        return tempfile.mkdtemp(prefix='job_', dir=self.work_dir)
+
+    def submit(self, files: List[Union[str, BinaryIO]], work_dir: str, output_path: Optional[str] = None,
+               titles: Optional[List[str]] = None, create_index: bool = True,
+               options: Optional[Dict] = None) -> CombineJob:
+        """Encolar una combinación"""
+        self._purge_expired()
+        job_id = os.path.basename(work_dir)[len('job_'):] or uuid.uuid4().hex
+        job = CombineJob(job_id, files, output_path or os.path.join(work_dir, 'result.pdf'),
+                         work_dir, titles, create_index, options)
+        with self._lock:
+            self.jobs[job_id] = job
+        self.executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: CombineJob) -> None:
+        if job.cancel_token.cancelled:
+            self._finish(job, 'cancelled', error="Operación cancelada")
+            return
+
+        job.status = 'running'
+        job.started = time.time()
+        service = PDFCombinerService(self.metadata_cache)
+        try:
+            service.combine(job.files, job.output_path, create_index=job.create_index,
+                            titles=job.titles, progress_callback=self._progress_setter(job),
+                            cancel_token=job.cancel_token, **job.options)
+            job.report = service.last_report
+            self._finish(job, 'done')
+        except PDFCombinerCancelled as e:
+            self._finish(job, 'cancelled', error=str(e))
+        except PDFCombinerError as e:
+            self._finish(job, 'error', error=str(e))
+        except Exception as e:
+            self._finish(job, 'error', error=f"Error inesperado: {e}")
+        finally:
+            # No retener los PDFs subidos hasta que caduque el trabajo
+            _close_uploads(job.files)
+            job.files = None
+
+    @staticmethod
+    def _progress_setter(job: CombineJob):
+        def set_progress(event):
+            job.progress = event
+        return set_progress
+
+    def _finish(self, job: CombineJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished = time.time()
+        job.done.set()
+
+    def get_job(self, job_id: str) -> CombineJob:
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            raise RequestError(f"Trabajo no encontrado: {job_id}", HTTPStatus.NOT_FOUND)
+        return job
+
+    def list_jobs(self) -> List[CombineJob]:
+        with self._lock:
+            return list(self.jobs.values())
+
+    def remove_job(self, job_id: str) -> CombineJob:
+        """Cancelar un trabajo; sus temporales se eliminan cuando termina"""
+        job = self.get_job(job_id)
+        job.cancel_token.cancel()
+        with self._lock:
+            self.jobs.pop(job_id, None)
+        threading.Thread(target=self._remove_work_dir, args=(job,), daemon=True).start()
+        return job
+
+    @staticmethod
+    def _remove_work_dir(job: CombineJob) -> None:
+        job.done.wait()
+        shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def _purge_expired(self) -> None:
+        """Eliminar los trabajos terminados hace más de job_ttl segundos"""
+        limit = time.time() - self.job_ttl
+        with self._lock:
+            expired = [job for job in self.jobs.values() if job.finished and job.finished < limit]
+            for job in expired:
+                del self.jobs[job.job_id]
+        for job in expired:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+
+
+class CombineRequestHandler(BaseHTTPRequestHandler):
+    """Rutas HTTP del servidor de combinación"""
+
+    server_version = "PDFCombinerPro"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def combine_server(self) -> CombineServer:
+        return self.server.combine_server
+
+    def log_message(self, format, *args):
+        if not self.combine_server.quiet:
+            super().log_message(format, *args)
+
+    # ------------------------------------------------------------------ rutas
+
+    def do_GET(self):
+        self._dispatch(self._route_get)
+
+    def do_POST(self):
+        self._dispatch(self._route_post)
+
+    def do_DELETE(self):
+        self._dispatch(self._route_delete)
+
+    def _dispatch(self, route):
+        try:
+            self._check_local_request()
+            url = urlsplit(self.path)
+            route([part for part in url.path.split('/') if part], parse_qs(url.query))
+        except RequestError as e:
+            self._send_json({'error': str(e)}, e.status)
+        except Exception as e:
+            self._send_json({'error': f"Error inesperado: {e}"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def _route_get(self, parts, query):
+        if parts == ['health']:
+            jobs = self.combine_server.list_jobs()
+            self._send_json({
+                'status': 'ok',
+                'workers': self.combine_server.workers,
+                'jobs': len(jobs),
+                'running': sum(1 for job in jobs if job.status == 'running'),
+            })
+        elif parts == ['jobs']:
+            self._send_json({'jobs': [job.to_dict() for job in self.combine_server.list_jobs()]})
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            self._send_json(self.combine_server.get_job(parts[1]).to_dict())
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'result':
+            self._send_result(self.combine_server.get_job(parts[1]))
+        else:
+            raise RequestError("Ruta no encontrada", HTTPStatus.NOT_FOUND)
+
+    def _route_post(self, parts, query):
+        if parts != ['jobs']:
+            raise RequestError("Ruta no encontrada", HTTPStatus.NOT_FOUND)
+
+        work_dir = self.combine_server.new_work_dir()
+        try:
+            job = self.combine_server.submit(work_dir=work_dir, **self._read_job_request(work_dir))
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        if _as_bool(query.get('wait', ['0'])[-1]):
+            job.done.wait()
+            self._send_result(job)
+        else:
+            self._send_json(job.to_dict(), HTTPStatus.ACCEPTED, location=f"/jobs/{job.job_id}")
+
+    def _route_delete(self, parts, query):
+        if len(parts) != 2 or parts[0] != 'jobs':
+            raise RequestError("Ruta no encontrada", HTTPStatus.NOT_FOUND)
+        job = self.combine_server.remove_job(parts[1])
+        self._send_json({'id': job.job_id, 'status': 'deleted'})
+
+    # -------------------------------------------------------------- peticiones
+
+    def _check_local_request(self) -> None:
+        """
+        Rechazar las peticiones que no vienen de este equipo
+
+        Un navegador envía POST multipart a otros orígenes sin consulta previa
+        (preflight): la cabecera Origin delata a las páginas web y la cabecera
+        Host, a los ataques de DNS rebinding.
+        """
+        allowed = self.combine_server.local_hosts
+        host = self.headers.get('Host')
+        if host is not None and _host_name(host) not in allowed:
+            raise RequestError(f"Host no permitido: {host}", HTTPStatus.FORBIDDEN)
+        origin = self.headers.get('Origin')
+        if origin is not None and _host_name(urlsplit(origin).netloc) not in allowed:
+            raise RequestError(f"Origen no permitido: {origin}", HTTPStatus.FORBIDDEN)
+
+    def _spool_body(self, work_dir: str) -> BinaryIO:
+        """Copiar el cuerpo de la petición a un temporal, por bloques"""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            raise RequestError("Content-Length no válido")
+        if length > self.combine_server.max_upload_bytes:
+            raise RequestError("Petición demasiado grande", HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, dir=work_dir)
+        try:
+            while length > 0:
+                chunk = self.rfile.read(min(length, CHUNK_SIZE))
+                if not chunk:
+                    raise RequestError("Cuerpo incompleto")
+                body.write(chunk)
+                length -= len(chunk)
+            body.seek(0)
+        except BaseException:
+            body.close()
+            raise
+        return body
+
+    def _read_job_request(self, work_dir: str) -> Dict:
+        content_type = self.headers.get('Content-Type', '')
+        with self._spool_body(work_dir) as body:
+            if content_type.startswith('multipart/form-data'):
+                fields, files, upload_titles = self._parse_multipart(body, content_type, work_dir)
+            elif content_type.startswith('application/json') or not content_type:
+                fields, files = self._parse_json(body.read())
+                upload_titles = None
+            else:
+                raise RequestError(f"Tipo de contenido no soportado: {content_type}",
+                                   HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+
+        try:
+            if not files:
+                raise RequestError("No hay archivos para combinar")
+
+            titles = fields.get('titles') or upload_titles
+            if titles is not None and len(titles) != len(files):
+                raise RequestError("Debe haber un título por archivo")
+
+            return {
+                'files': files,
+                'titles': titles,
+                'output_path': self.combine_server.resolve_output(fields.get('output')),
+                'create_index': _as_bool(fields.get('index', True)),
+                'options': _engine_options(fields),
+            }
+        except BaseException:
+            _close_uploads(files)
+            raise
+
+    @staticmethod
+    def _parse_json(body: bytes):
+        """Devolver (campos, rutas de entrada con los comprimidos expandidos)"""
+        try:
+            fields = json.loads(body or b'{}')
+        except ValueError as e:
+            raise RequestError(f"JSON no válido: {e}")
+        if not isinstance(fields, dict):
+            raise RequestError("Se esperaba un objeto JSON")
+        files = fields.get('files') or []
+        if not isinstance(files, list) or not all(isinstance(f, str) for f in files):
+            raise RequestError("No hay archivos para combinar")
+        try:
+            return fields, expand_archives(files)
+        except ArchiveError as e:
+            raise RequestError(str(e))
+
+    @classmethod
+    def _parse_multipart(cls, body: BinaryIO, content_type: str, work_dir: str):
+        """
+        Devolver (campos, PDFs subidos, títulos) leyendo las partes del cuerpo por líneas
+
+        Cada PDF subido se copia a un temporal del directorio del trabajo; los
+        campos de texto no pueden superar MAX_FIELD_SIZE.
+        """
+        boundary = _parse_headers(f"Content-Type: {content_type}\r\n".encode('latin-1')).get_boundary()
+        if not boundary:
+            raise RequestError("Cuerpo multipart no válido")
+        delimiter = b'--' + boundary.encode('latin-1')
+
+        fields: Dict[str, object] = {}
+        files, titles = [], []
+        try:
+            # Preámbulo hasta el primer delimitador
+            finished = cls._copy_part(body, delimiter, None)
+            while not finished:
+                headers = cls._read_part_headers(body)
+                name = headers.get_param('name', header='content-disposition')
+                filename = headers.get_filename()
+                if filename:
+                    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, dir=work_dir)
+                    files.append(upload)
+                    titles.append(TextProcessor.extract_title(os.path.basename(filename)))
+                    finished = cls._copy_part(body, delimiter, upload)
+                    upload.seek(0)
+                    continue
+                value = io.BytesIO()
+                finished = cls._copy_part(body, delimiter, value, MAX_FIELD_SIZE)
+                if name == 'titles':
+                    fields.setdefault('titles', []).append(value.getvalue().decode('utf-8'))
+                elif name:
+                    fields[name] = value.getvalue().decode('utf-8')
+        except BaseException:
+            _close_uploads(files)
+            raise
+        return fields, files, titles
+
+    @staticmethod
+    def _read_part_headers(body: BinaryIO):
+        """Cabeceras de una parte multipart, hasta la línea en blanco"""
+        lines = []
+        while True:
+            line = body.readline(CHUNK_SIZE)
+            if not line:
+                raise RequestError("Cuerpo multipart no válido")
+            if line in (b'\r\n', b'\n'):
+                return _parse_headers(b''.join(lines))
+            lines.append(line)
+            if len(lines) > MAX_PART_HEADER_LINES:
+                raise RequestError("Cabeceras multipart no válidas")
+
+    @staticmethod
+    def _copy_part(body: BinaryIO, delimiter: bytes, target: Optional[BinaryIO],
+                   limit: Optional[int] = None) -> bool:
+        """
+        Copiar el contenido de una parte a ``target`` (None lo descarta) hasta el siguiente delimitador
+
+        El salto de línea que precede al delimitador no forma parte del
+        contenido, así que se retiene hasta saber qué línea sigue. Devuelve
+        True si el delimitador es el de cierre.
+        """
+        newline = b''
+        line_start = True
+        size = 0
+        while True:
+            line = body.readline(CHUNK_SIZE)
+            if not line:
+                raise RequestError("Cuerpo multipart no válido")
+            # Un delimitador sólo cuenta al principio de una línea (readline corta las muy largas)
+            if line_start and line.startswith(delimiter):
+                rest = line[len(delimiter):].rstrip(b' \t\r\n')
+                if rest in (b'', b'--'):
+                    return rest == b'--'
+            end = len(line) - (2 if line.endswith(b'\r\n') else 1 if line.endswith(b'\n') else 0)
+            if target is not None:
+                target.write(newline)
+                target.write(line[:end])
+            size += len(newline) + end
+            if limit is not None and size > limit:
+                raise RequestError("Campo multipart demasiado grande")
+            newline = line[end:]
+            line_start = bool(newline)
+
+    # -------------------------------------------------------------- respuestas
+
+    def _send_json(self, data: Dict, status: HTTPStatus = HTTPStatus.OK, location: Optional[str] = None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if location:
+            self.send_header('Location', location)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_result(self, job: CombineJob):
+        """Enviar el PDF combinado por bloques"""
+        if job.status != 'done':
+            status = HTTPStatus.CONFLICT if job.status in ('queued', 'running') else HTTPStatus.UNPROCESSABLE_ENTITY
+            self._send_json(job.to_dict(), status)
+            return
+
+        size = os.path.getsize(job.output_path)
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(size))
+        self.send_header('Content-Disposition', f'attachment; filename="{job.job_id}.pdf"')
+        self.send_header('X-Job-Id', job.job_id)
+        self.end_headers()
+        with open(job.output_path, 'rb') as file:
+            shutil.copyfileobj(file, self.wfile, CHUNK_SIZE)
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUE_VALUES
+
+
+def _parse_headers(data: bytes):
+    """Cabeceras MIME (email.message.EmailMessage) de un bloque de líneas de cabecera"""
+    return BytesParser(policy=policy.HTTP).parsebytes(data + b'\r\n', headersonly=True)
+
+
+def _close_uploads(files) -> None:
+    """Cerrar los PDFs subidos (temporales); las rutas se ignoran"""
+    for file in files or ():
+        if not isinstance(file, str):
+            file.close()
+
+
+def _host_name(netloc: str) -> Optional[str]:
+    """Nombre de host, sin puerto ni corchetes, de una cabecera Host u Origin"""
+    try:
+        return urlsplit(f"//{netloc}").hostname
+    except ValueError:
+        return None
+
+
+def _engine_options(fields: Dict) -> Dict:
+    """Opciones de combinación presentes en la petición, con su tipo"""
+    options = {}
+    for name, kind in ENGINE_OPTIONS.items():
+        if fields.get(name) in (None, ''):
+            continue
+        value = fields[name]
+        try:
+            options[name] = _as_bool(value) if kind is bool else kind(value)
+        except (TypeError, ValueError):
+            raise RequestError(f"Valor no válido para '{name}': {value}")
+    return options
@@ -0,0 +1,403 @@
+"""
+Cola persistente de combinaciones con reintentos y recuperación tras caídas
+
+Los trabajos se guardan en un archivo SQLite local. Un proceso que toma un
+trabajo obtiene una concesión (lease) que renueva mientras lo ejecuta; si el
+proceso muere, la concesión caduca y otro proceso (o el mismo tras reiniciar)
+vuelve a ejecutar el trabajo. La ejecución es por tanto "al menos una vez":
+un trabajo interrumpido se repite desde el principio y sobrescribe su salida.
+"""
+import json
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from config.settings import AppConfig
+from core.batch_runner import BatchJob, BatchResult, run_job
+from core.metadata_cache import default_cache_dir
+from core.pdf_combiner import PDFCombinerError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT    PRIMARY KEY,
+    files         TEXT    NOT NULL,
+    output_path   TEXT    NOT NULL,
+    titles        TEXT,
+    create_index  INTEGER NOT NULL,
+    options       TEXT    NOT NULL,
+    status        TEXT    NOT NULL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    available_at  REAL    NOT NULL,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    error         TEXT,
+    report        TEXT,
+    created       REAL    NOT NULL,
+    finished      REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+"""
+
+# Estados de un trabajo
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+JOB_STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+
+class QueuedJob(NamedTuple):
+    """Trabajo tomado de la cola"""
+    job: BatchJob
+    options: Dict
+    attempts: int  # Incluye el intento actual
+
+
+class JobQueue:
+    """Cola de trabajos SQLite con concesiones, reintentos con espera exponencial y recuperación"""
+
+    def __init__(self, db_path: Optional[str] = None, lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None, retry_delay: Optional[float] = None,
+                 retry_max_delay: Optional[float] = None):
+        if db_path is None:
+            db_path = AppConfig.QUEUE_DB_PATH or os.path.join(default_cache_dir(), 'jobs.sqlite3')
+        self.db_path = db_path
+        self.lease_seconds = AppConfig.QUEUE_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.max_attempts = max_attempts or AppConfig.QUEUE_MAX_ATTEMPTS
+        self.retry_delay = AppConfig.QUEUE_RETRY_DELAY if retry_delay is None else retry_delay
+        self.retry_max_delay = AppConfig.QUEUE_RETRY_MAX_DELAY if retry_max_delay is None else retry_max_delay
+        # Identifica a este proceso en las concesiones: host:pid:aleatorio
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            # Las transacciones se abren explícitamente con BEGIN IMMEDIATE
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False,
+                                         isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise PDFCombinerError(f"No se pudo abrir la cola de trabajos {db_path}: {e}")
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    def enqueue(self, jobs: List[BatchJob], options: Optional[Dict] = None) -> int:
+        """
+        Añadir trabajos a la cola
+
+        Los identificadores ya presentes se ignoran, de modo que volver a
+        encolar el mismo manifiesto tras un reinicio no duplica trabajos.
+
+        Returns:
+            Número de trabajos añadidos
+        """
+        now = time.time()
+        options_json = json.dumps(options or {})
+        added = 0
+        with self._transaction() as conn:
+            for job in jobs:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (job_id, files, output_path, titles, create_index, options, "
+                    "status, max_attempts, available_at, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job.job_id, json.dumps(job.files), job.output_path,
+                     json.dumps(job.titles) if job.titles is not None else None,
+                     int(job.create_index), options_json, PENDING, self.max_attempts, now, now))
+                added += cursor.rowcount
+        return added
+
+    def claim(self, limit: int = 1) -> List[QueuedJob]:
+        """Tomar hasta ``limit`` trabajos listos (pendientes o con la concesión caducada)"""
+        now = time.time()
+        with self._transaction() as conn:
+            # Una concesión caducada en el último intento agota el trabajo
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished = ?, lease_owner = NULL "
+                "WHERE status = ? AND lease_expires <= ? AND attempts >= max_attempts",
+                (FAILED, "El proceso que ejecutaba el trabajo terminó inesperadamente", now, RUNNING, now))
+            rows = conn.execute(
+                "SELECT job_id, files, output_path, titles, create_index, options, attempts FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?) "
+                "ORDER BY available_at, created LIMIT ?",
+                (PENDING, now, RUNNING, now, limit)).fetchall()
+            for row in rows:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                    "WHERE job_id = ?", (RUNNING, self.owner, now + self.lease_seconds, row[0]))
+
+        return [QueuedJob(BatchJob(job_id, json.loads(files), output_path,
+                                   json.loads(titles) if titles is not None else None, bool(create_index)),
+                          json.loads(options), attempts + 1)
+                for job_id, files, output_path, titles, create_index, options, attempts in rows]
+
+    def renew(self, job_ids: List[str]) -> None:
+        """Prolongar las concesiones de los trabajos en curso de este proceso"""
+        if not job_ids:
+            return
+        expires = time.time() + self.lease_seconds
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                [(expires, job_id, self.owner, RUNNING) for job_id in job_ids])
+
+    def complete(self, job_id: str, report: Optional[Dict] = None) -> None:
+        """Marcar un trabajo como terminado"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, report = ?, error = NULL, finished = ?, lease_owner = NULL "
+                "WHERE job_id = ? AND lease_owner = ?",
+                (DONE, json.dumps(report) if report is not None else None, time.time(), job_id, self.owner))
+
+    def fail(self, job_id: str, error: str) -> str:
+        """
+        Registrar un intento fallido
+
+        Returns:
+            PENDING si el trabajo se reintentará, FAILED si agotó los intentos
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE job_id = ? AND lease_owner = ?",
+                               (job_id, self.owner)).fetchone()
+            if row is None:
+                # Otro proceso recuperó el trabajo al caducar la concesión
+                return RUNNING
+            attempts, max_attempts = row
+            if attempts >= max_attempts:
+                conn.execute("UPDATE jobs SET status = ?, error = ?, finished = ?, lease_owner = NULL "
+                             "WHERE job_id = ?", (FAILED, error, now, job_id))
+                return FAILED
+            conn.execute("UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_owner = NULL "
+                         "WHERE job_id = ?", (PENDING, error, now + self.retry_after(attempts), job_id))
+            return PENDING
+
+    def retry_after(self, attempts: int) -> float:
+        """Espera antes del siguiente intento tras ``attempts`` fallos (exponencial con tope)"""
+        return min(self.retry_delay * 2 ** max(attempts - 1, 0), self.retry_max_delay)
+
+    def recover(self) -> List[str]:
+        """
+        Recuperar los trabajos de procesos terminados y limpiar sus salidas a medias
+
+        Se llama al arrancar un ejecutor. Los trabajos en curso de procesos de
+        este equipo que ya no existen (o con la concesión caducada) vuelven a
+        quedar pendientes de inmediato, y se eliminan los temporales y la
+        salida incompleta que dejaron.
+
+        Returns:
+            Identificadores de los trabajos recuperados
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT job_id, output_path, lease_owner, lease_expires FROM jobs WHERE status = ?",
+                (RUNNING,)).fetchall()
+            orphans = [(job_id, output_path) for job_id, output_path, owner, expires in rows
+                       if expires <= now or not _owner_alive(owner, self.owner)]
+            for job_id, _ in orphans:
+                conn.execute("UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL "
+                             "WHERE job_id = ?", (PENDING, now, job_id))
+
+        for _, output_path in orphans:
+            _remove_partial_output(output_path)
+        return [job_id for job_id, _ in orphans]
+
+    def next_available(self) -> Optional[float]:
+        """Momento en que estará listo el siguiente trabajo pendiente (None si no hay)"""
+        with self._lock:
+            (available_at,) = self._conn.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE status = ?", (PENDING,)).fetchone()
+        return available_at
+
+    def counts(self) -> Dict[str, int]:
+        """Número de trabajos por estado"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict]:
+        """Estado de los trabajos (opcionalmente solo los de un estado)"""
+        query = "SELECT job_id, output_path, status, attempts, error, available_at, finished FROM jobs"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created, job_id", params).fetchall()
+        keys = ('id', 'output', 'status', 'attempts', 'error', 'available_at', 'finished')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def close(self) -> None:
+        """Cerrar la base de datos"""
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    """Transacción de escritura (BEGIN IMMEDIATE) serializada entre hilos y procesos"""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()
+
+
+def _owner_alive(owner: Optional[str], current_owner: str) -> bool:
+    """Si el proceso dueño de una concesión sigue vivo (en otro equipo se confía en la concesión)"""
+    if not owner:
+        return False
+    if owner == current_owner:
+        return True
+    try:
+        host, pid, _ = owner.rsplit(':', 2)
+        pid = int(pid)
+    except ValueError:
+        return False
+    # En Windows os.kill(pid, 0) terminaría el proceso
+    if host != socket.gethostname() or pid == os.getpid() or sys.platform == 'win32':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _remove_partial_output(output_path: str) -> None:
+    from pdf_utils import AdvancedPDFCombiner
+
+    for path in [output_path] + AdvancedPDFCombiner.temp_outputs(output_path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _init_worker() -> None:
+    """
+    Señales de los procesos del pool
+
+    No heredan los manejadores del proceso principal: SIGTERM debe poder
+    terminarlos (el pool lo usa al romperse) y Ctrl+C, que llega a todo el
+    grupo de procesos, no interrumpe los trabajos en curso.
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def run_queue(queue: JobQueue, workers: Optional[int] = None, follow: bool = False,
+              on_result: Optional[Callable[[BatchResult, str], None]] = None,
+              stop_event: Optional[threading.Event] = None,
+              poll_interval: Optional[float] = None) -> Dict[str, int]:
+    """
+    Ejecutar los trabajos de la cola en un ProcessPoolExecutor
+
+    Recupera primero los trabajos huérfanos. Mientras hay trabajos en curso
+    renueva sus concesiones; los fallos se reintentan con espera exponencial
+    hasta QUEUE_MAX_ATTEMPTS intentos.
+
+    Args:
+        queue: Cola de trabajos
+        workers: Procesos en paralelo (0 = uno por CPU); por defecto AppConfig.QUEUE_WORKERS
+        follow: Seguir esperando trabajos nuevos cuando la cola se vacía
+        on_result: Función llamada con (BatchResult, estado en la cola) al terminar cada intento
+        stop_event: Al activarse no se toman más trabajos y se espera a los que están en curso
+        poll_interval: Segundos entre consultas a la cola
+
+    Returns:
+        Número de intentos terminados por estado (done, pending = se reintentará, failed)
+    """
+    if workers is None:
+        workers = AppConfig.QUEUE_WORKERS
+    workers = max(1, workers or os.cpu_count() or 1)
+    poll_interval = poll_interval or AppConfig.QUEUE_POLL_INTERVAL
+    stop_event = stop_event or threading.Event()
+    # Renovar bastante antes de que caduque la concesión
+    heartbeat = max(0.05, min(poll_interval, queue.lease_seconds / 3))
+
+    queue.recover()
+    summary = {DONE: 0, PENDING: 0, FAILED: 0}
+    in_flight = {}
+    pool = _new_pool(workers)
+    try:
+        while True:
+            if not stop_event.is_set() and len(in_flight) < workers:
+                for queued in queue.claim(workers - len(in_flight)):
+                    options = dict(queued.options)
+                    # Cada trabajo ya ocupa un proceso: sin pre-análisis ni árbol en paralelo salvo que se pida
+                    options.setdefault('preparse_workers', 0)
+                    options.setdefault('tree_workers', 1)
+                    in_flight[pool.submit(run_job, queued.job, options)] = queued
+
+            if not in_flight:
+                if stop_event.is_set():
+                    break
+                next_at = queue.next_available()
+                if next_at is None and not follow:
+                    break
+                delay = poll_interval if next_at is None else next_at - time.time()
+                stop_event.wait(min(max(delay, 0), poll_interval))
+                continue
+
+            done, _ = wait(in_flight, timeout=heartbeat, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                queued = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    # El proceso muerto no pudo eliminar su salida a medias
+                    _remove_partial_output(queued.job.output_path)
+                    result = BatchResult(queued.job.job_id, queued.job.output_path, 'error', 0.0,
+                                         f"El proceso de trabajo terminó inesperadamente: {e}")
+
+                if result.status == 'ok':
+                    queue.complete(result.job_id, result.report)
+                    status = DONE
+                else:
+                    status = queue.fail(result.job_id, result.error)
+                summary[status] = summary.get(status, 0) + 1
+                if on_result:
+                    on_result(result, status)
+
+            queue.renew([queued.job.job_id for queued in in_flight.values()])
+            if broken:
+                # Un proceso muerto invalida el pool: los trabajos restantes fallan igualmente
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = _new_pool(workers)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return summary
@@ -0,0 +1,257 @@
+"""
+Caché persistente de metadatos de archivos PDF
+
+Sólo se guarda lo que cuesta leer del PDF (recuento de páginas, SHA-256): el
+título se obtiene del nombre del archivo y es más barato calcularlo que
+buscarlo. Las lecturas no escriben en la base de datos; la hora del último
+acceso se guarda por lotes junto con la siguiente escritura.
+"""
+import atexit
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from config.settings import AppConfig
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Accesos pendientes de guardar a partir de los cuales se escriben aunque no haya otra escritura
+TOUCH_FLUSH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    path        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    page_count  INTEGER,
+    sha256      TEXT,
+    last_access REAL    NOT NULL,
+    PRIMARY KEY (path, size, mtime_ns)
+);
+CREATE INDEX IF NOT EXISTS metadata_last_access ON metadata (last_access);
+"""
+
+
+class FileMetadata(NamedTuple):
+    """Metadatos cacheados de un archivo"""
+    path: str
+    size: int
+    mtime_ns: int
+    page_count: Optional[int]
+    sha256: Optional[str]
+
+
+def default_cache_dir() -> str:
+    """Directorio de caché del usuario según la plataforma"""
+    override = os.environ.get('PDFCOMBINER_CACHE_DIR')
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'PDFCombinerPro')
+
+
+class MetadataCache:
+    """Caché SQLite de metadatos indexada por (ruta absoluta, tamaño, mtime_ns) con expulsión LRU"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = AppConfig.METADATA_CACHE_MAX_ENTRIES):
+        if db_path is None:
+            db_path = os.path.join(default_cache_dir(), 'metadata.sqlite3')
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Hora del último acceso de las entradas leídas, pendiente de guardar
+        self._touched: Dict[Tuple[str, int, int], float] = {}
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock:
+            if db_path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+            # Contador de filas: la expulsión sólo hace falta cuando supera el límite
+            (self._rows,) = self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()
+
+    @staticmethod
+    def file_key(path: str) -> Optional[Tuple[str, int, int]]:
+        """Clave de caché de un archivo, o None si no se puede acceder"""
+        try:
+            abs_path = os.path.abspath(path)
+            st = os.stat(abs_path)
+            return abs_path, st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, path: str) -> Optional[FileMetadata]:
+        """Obtener metadatos cacheados (None si no hay entrada vigente)"""
+        key = self.file_key(path)
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime_ns, page_count, sha256 FROM metadata "
+                "WHERE path = ? AND size = ? AND mtime_ns = ?", key).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self._write_touched()
+                self._conn.commit()
+        return FileMetadata(*row)
+
+    def update(self, path: str, **fields) -> None:
+        """Guardar campos (page_count, sha256) para la versión actual del archivo"""
+        self.update_many({path: fields})
+
+    def update_many(self, entries: Dict[str, Dict]) -> None:
+        """Guardar los campos de varios archivos en una sola transacción"""
+        keyed = [(key, fields) for key, fields in
+                 ((self.file_key(path), fields) for path, fields in entries.items()) if key]
+        if not keyed:
+            return
+        with self._lock:
+            now = time.time()
+            for key, fields in keyed:
+                self._upsert(key, fields, now)
+            self._write_touched()
+            if self._rows > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _upsert(self, key: Tuple[str, int, int], fields: Dict, now: float) -> None:
+        # Las versiones anteriores del mismo archivo ya no son válidas
+        deleted = self._conn.execute(
+            "DELETE FROM metadata WHERE path = ? AND NOT (size = ? AND mtime_ns = ?)", key).rowcount
+        inserted = self._conn.execute(
+            "INSERT OR IGNORE INTO metadata (path, size, mtime_ns, last_access) VALUES (?, ?, ?, ?)",
+            key + (now,)).rowcount
+        self._rows += inserted - deleted
+        names = [name for name in ('page_count', 'sha256') if name in fields]
+        assignments = ''.join(f", {name} = ?" for name in names)
+        self._conn.execute(
+            f"UPDATE metadata SET last_access = ?{assignments} WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (now,) + tuple(fields[name] for name in names) + key)
+        self._touched.pop(key, None)
+
+    def _write_touched(self) -> None:
+        """Guardar la hora de los accesos pendientes (sin confirmar la transacción)"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE metadata SET last_access = ? WHERE path = ? AND size = ? AND mtime_ns = ?",
+                [(accessed,) + key for key, accessed in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        """Eliminar las entradas menos usadas recientemente por encima del límite"""
+        excess = self._rows - self.max_entries
+        if excess > 0:
+            self._rows -= self._conn.execute(
+                "DELETE FROM metadata WHERE rowid IN "
+                "(SELECT rowid FROM metadata ORDER BY last_access LIMIT ?)", (excess,)).rowcount
+
+    def _get_or_compute(self, path: str, field: str, compute: Callable[[str], object]):
+        cached = self.get(path)
+        if cached is not None and getattr(cached, field) is not None:
+            return getattr(cached, field)
+        value = compute(path)
+        if value is not None:
+            self.update(path, **{field: value})
+        return value
+
+    def get_page_count(self, path: str, compute: Optional[Callable[[str], int]] = None) -> int:
+        """Número de páginas (cacheado)"""
+        if compute is None:
+            from pdf_utils import PDFUtils
+            compute = PDFUtils.get_page_count
+        # Un recuento de 0 indica un PDF ilegible: no se cachea
+        return self._get_or_compute(path, 'page_count', lambda p: compute(p) or None) or 0
+
+    def get_sha256(self, path: str) -> Optional[str]:
+        """Hash SHA-256 del contenido (cacheado)"""
+        return self._get_or_compute(path, 'sha256', compute_sha256)
+
+    def record_page_counts(self, page_counts: Dict[str, int]) -> None:
+        """Guardar recuentos de páginas obtenidos durante una combinación"""
+        self.update_many({path: {'page_count': count} for path, count in page_counts.items() if count})
+
+    def flush(self) -> None:
+        """Guardar los accesos pendientes"""
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Vaciar la caché"""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM metadata")
+            self._conn.commit()
+            self._rows = 0
+
+    def close(self) -> None:
+        """Guardar los accesos pendientes y cerrar la base de datos"""
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+def compute_sha256(path: str) -> Optional[str]:
+    """Calcular el SHA-256 de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+_shared_cache: Optional[MetadataCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_metadata_cache() -> Optional[MetadataCache]:
+    """Instancia compartida de la caché (None si está desactivada o no disponible)"""
+    global _shared_cache
+    if not AppConfig.METADATA_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = MetadataCache(AppConfig.METADATA_CACHE_PATH)
+            except (OSError, sqlite3.Error):
+                return None
+            atexit.register(_flush_shared_cache)
+        return _shared_cache
+
+
+def _flush_shared_cache() -> None:
+    """Guardar los accesos pendientes de la instancia compartida al salir"""
+    if _shared_cache is not None:
+        try:
+            _shared_cache.flush()
+        except sqlite3.Error:
+            pass
+
+
+def _reset_after_fork() -> None:
+    """Los procesos hijos no deben reutilizar la conexión SQLite del padre"""
+    global _shared_cache, _shared_lock
+    _shared_cache = None
+    _shared_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,53 +1,153 @@
 """
 Servicio de combinación de PDFs
 """
-from typing import List
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
 from utils.text_processor import TextProcessor
-
-# Mantener compatibilidad con pdf_utils.py existente
-try:
-    from pdf_utils import AdvancedPDFCombiner
-except ImportError:
-    # Fallback en caso de que no se pueda importar
-    AdvancedPDFCombiner = None
+from config.settings import AppConfig
+from core.archives import ArchiveError, is_member_path, member_exists, open_members
+from core.metadata_cache import MetadataCache, get_metadata_cache
 
 class PDFCombinerError(Exception):
     """Excepción para errores de combinación de PDFs"""
     pass
 
+class PDFCombinerCancelled(PDFCombinerError):
+    """La combinación se canceló antes de terminar"""
+    pass
+
+def _get_combiner_class():
+    """Importar pdf_utils sólo cuando se combina (mantiene rápido el arranque de la CLI)"""
+    try:
+        from pdf_utils import AdvancedPDFCombiner
+    except ImportError as e:
+        raise PDFCombinerError(f"No se pudo cargar el combinador de PDFs: {e}")
+    return AdvancedPDFCombiner
+
+def _is_path(source) -> bool:
+    """Entrada en disco (las demás son bytes o archivos abiertos en memoria)"""
+    return isinstance(source, (str, os.PathLike))
+
+# Entrada de combine(): ruta, PDF en memoria o archivo binario con seek
+PDFInput = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
 class PDFCombinerService:
     """Servicio para combinar archivos PDF"""
 
-    def __init__(self):
-        if AdvancedPDFCombiner is None:
-            raise PDFCombinerError("No se pudo cargar el combinador de PDFs")
+    def __init__(self, metadata_cache: Optional[MetadataCache] = None):
+        self.metadata_cache = metadata_cache or get_metadata_cache()
+        self.last_report = {}
 
-    def combine(self, files: List[str], output_path: str, create_index: bool = True, titles: List[str] = None) -> str:
+    def combine(self, files: List[PDFInput], output_path: Union[str, BinaryIO], create_index: bool = True,
+                titles: List[str] = None, backend: Optional[str] = None, preparse_workers: Optional[int] = None,
+                repair: Optional[bool] = None, dedup: Optional[bool] = None,
+                output_profile: Optional[str] = None, compression_level: Optional[int] = None,
+                page_ranges: Optional[List[Optional[str]]] = None, skip_duplicates: Optional[bool] = None,
+                tree_batch_size: Optional[int] = None, tree_workers: Optional[int] = None,
+                progress_callback: Optional[Callable] = None, cancel_token=None) -> str:
         """
         Combinar archivos PDF
 
         Args:
-            files: Lista de archivos PDF a combinar
-            output_path: Ruta del archivo de salida
+            files: PDFs a combinar: rutas, PDFs en memoria (bytes, bytearray, memoryview) o
+                archivos binarios con seek. Los datos en memoria se leen sin copiarlos a
+                disco; en ese caso ``titles`` es obligatorio. Las rutas pueden ser miembros
+                de un ZIP o TAR (``bundle.zip!/carpeta/doc.pdf``): cada uno se abre cuando se
+                usa (ver core.archives.ArchiveMember)
+            output_path: Ruta del archivo de salida, o un objeto binario escribible
+                (sys.stdout.buffer, un socket, BytesIO...) al que se escribe en bloques
+                grandes sin pasar por disco; no se cierra al terminar
             create_index: Si crear índice interactivo
+            backend: Motor de combinación ("pypdf2", "pymupdf" o "stream"); por defecto AppConfig.MERGE_BACKEND
+            preparse_workers: Procesos para validar los PDFs en paralelo antes de combinar
+                (0 = desactivado); por defecto AppConfig.PREPARSE_WORKERS. Cada entrada
+                se vuelve a leer al combinar, así que sólo adelanta los errores
+            repair: Si normalizar los PDFs dañados durante el pre-análisis
+            dedup: Si escribir una sola vez los recursos repetidos entre PDFs (fuentes, imágenes...);
+                por defecto AppConfig.DEDUP_RESOURCES. El informe queda en ``last_report``
+            output_profile: "classic" o "compact" (object streams, xref stream y objetos
+                no referenciados eliminados); por defecto AppConfig.OUTPUT_PROFILE
+            compression_level: Nivel zlib (0-9) del perfil compacto; por defecto AppConfig.COMPRESSION_LEVEL
+            page_ranges: Páginas a incluir de cada archivo, en el mismo orden que ``files``
+                (p. ej. "1-3,10,-1"; None = todas). Sólo se leen los nodos del árbol de
+                páginas necesarios, y el índice y los marcadores siguen la selección
+            skip_duplicates: Si omitir los archivos con el mismo contenido (SHA-256) y rango de
+                páginas que otro anterior; por defecto AppConfig.SKIP_DUPLICATE_INPUTS. Los
+                omitidos quedan en ``last_report['skipped_duplicates']`` como pares
+                (ruta omitida, ruta conservada)
+            tree_batch_size: Con más entradas que este número, combinar en árbol: lotes de este
+                tamaño se combinan en paralelo en documentos intermedios, que se combinan
+                entre sí hasta la pasada final; el índice y los marcadores son los mismos que
+                en la combinación secuencial. 0 = secuencial; por defecto
+                AppConfig.TREE_MERGE_BATCH_SIZE. Sólo con entradas en disco
+            tree_workers: Procesos de la combinación en árbol (0 = uno por CPU); por defecto
+                AppConfig.TREE_MERGE_WORKERS
+            progress_callback: Función que recibe eventos pdf_utils.MergeProgress (etapa, índice
+                de archivo, páginas procesadas, bytes escritos, tiempo transcurrido)
+            cancel_token: pdf_utils.CancellationToken; al cancelarlo (o agotarse su tiempo
+                límite) se detiene la combinación y se elimina la salida parcial
 
         Returns:
-            Ruta del archivo creado
+            Ruta del archivo creado (o el objeto escribible recibido)
 
         Raises:
+            PDFCombinerCancelled: Si se canceló la combinación
             PDFCombinerError: Si hay error en la combinación
         """
         if not files:
             raise PDFCombinerError("No hay archivos para combinar")
 
+        if preparse_workers is None:
+            preparse_workers = AppConfig.PREPARSE_WORKERS
+        if repair is None:
+            repair = AppConfig.REPAIR_INPUTS
+        if dedup is None:
+            dedup = AppConfig.DEDUP_RESOURCES
+        if output_profile is None:
+            output_profile = AppConfig.OUTPUT_PROFILE
+        if compression_level is None:
+            compression_level = AppConfig.COMPRESSION_LEVEL
+        if skip_duplicates is None:
+            skip_duplicates = AppConfig.SKIP_DUPLICATE_INPUTS
+        if tree_batch_size is None:
+            tree_batch_size = AppConfig.TREE_MERGE_BATCH_SIZE
+        if page_ranges is not None and len(page_ranges) != len(files):
+            raise PDFCombinerError("Debe indicarse un rango de páginas por cada archivo")
+
+        repair_dir = None
+        tree_dir = None
         try:
-            import os
-            # Usar títulos editados si se proporcionan, si no, extraerlos automáticamente
-            if titles is None:
-                titles = [TextProcessor.extract_title(os.path.basename(f)) for f in files]
+            skipped = []
+            if skip_duplicates:
+                files, titles, page_ranges, skipped = self._drop_duplicates(files, titles, page_ranges)
+
+            titles = self._resolve_titles(files, titles)
+            # Los procesos de la combinación en árbol leen ellos mismos los comprimidos
+            tree = tree_batch_size and len(files) > tree_batch_size and all(_is_path(f) for f in files)
+            merge_files = files if tree else self._open_archive_members(files)
+
+            # Validar (y opcionalmente reparar) en paralelo; aquí sólo queda el ensamblado
+            if preparse_workers:
+                repair_dir = tempfile.mkdtemp(prefix='pdfcombiner_') if repair else None
+                merge_files = self.preparse(merge_files, preparse_workers, repair, repair_dir)
+
+            inputs, tree_result = merge_files, None
+            if tree:
+                tree_dir = tempfile.mkdtemp(prefix='pdfcombiner_tree_')
+                tree_result = self._tree_merge(merge_files, page_ranges, tree_dir, tree_batch_size,
+                                               tree_workers, cancel_token)
+                merge_files, page_ranges = tree_result.files, None
 
             # Crear combinador
-            combiner = AdvancedPDFCombiner(files, titles)
+            combiner = _get_combiner_class()(merge_files, titles, backend=backend or AppConfig.MERGE_BACKEND,
+                                             dedup=dedup, output_profile=output_profile,
+                                             compression_level=compression_level,
+                                             page_ranges=page_ranges,
+                                             document_pages=tree_result.document_pages if tree else None,
+                                             progress_callback=progress_callback,
+                                             cancel_token=cancel_token)
 
             # Combinar con o sin índice
             if create_index:
@@ -55,24 +155,263 @@ class PDFCombinerService:
             else:
                 result_path = combiner.combine_simple(output_path)
 
+            self.last_report = combiner.report
+            if skip_duplicates:
+                self.last_report['skipped_duplicates'] = skipped
+            page_counts = combiner.page_counts
+            if tree:
+                page_counts = tree_result.page_counts
+                self.last_report['files'] = len(files)
+                self.last_report['tree'] = {'batch_size': tree_batch_size, 'levels': tree_result.levels,
+                                            'intermediates': len(tree_result.files)}
+
+            # Guardar los recuentos de páginas obtenidos al combinar (no se conocen si hay rango)
+            if self.metadata_cache:
+                self.metadata_cache.record_page_counts(
+                    {f: page_counts.get(m) for f, m in zip(files, inputs) if _is_path(m)})
+
             return result_path
 
+        except PDFCombinerError:
+            raise
         except Exception as e:
+            self._raise_if_cancelled(cancel_token)
             raise PDFCombinerError(f"Error al combinar PDFs: {e}")
+        finally:
+            if repair_dir:
+                shutil.rmtree(repair_dir, ignore_errors=True)
+            if tree_dir:
+                shutil.rmtree(tree_dir, ignore_errors=True)
+
+    def append(self, combined_path: str, files: List[str], titles: List[str] = None,
+               progress_callback: Optional[Callable] = None, cancel_token=None) -> str:
+        """
+        Añadir PDFs al final de un PDF combinado existente
+
+        Se usa una actualización incremental: sólo se escriben las páginas nuevas,
+        el índice regenerado con sus enlaces y los marcadores ampliados, por lo que
+        el coste depende de los archivos nuevos y no del tamaño del PDF existente.
+        ``progress_callback`` y ``cancel_token`` funcionan como en combine(); al
+        cancelar, el PDF existente queda intacto.
+
+        Returns:
+            Ruta del archivo actualizado
+
+        Raises:
+            PDFCombinerCancelled: Si se canceló la operación
+            PDFCombinerError: Si hay error al añadir
+        """
+        if not files:
+            raise PDFCombinerError("No hay archivos para añadir")
+        if not os.path.isfile(combined_path):
+            raise PDFCombinerError(f"No se encontró el PDF combinado: {combined_path}")
+
+        try:
+            titles = self._resolve_titles(files, titles)
+            combiner = _get_combiner_class()(self._open_archive_members(files), titles, progress_callback=progress_callback,
+                                             cancel_token=cancel_token)
+            result_path = combiner.append_to(combined_path)
+            self.last_report = combiner.report
+
+            if self.metadata_cache:
+                self.metadata_cache.record_page_counts(combiner.page_counts)
+
+            return result_path
+
+        except PDFCombinerError:
+            raise
+        except Exception as e:
+            self._raise_if_cancelled(cancel_token)
+            raise PDFCombinerError(f"Error al añadir PDFs: {e}")
+
+    def split(self, source: str, output_dir: str, page_ranges: Optional[List[str]] = None,
+              titles: Optional[List[str]] = None, workers: Optional[int] = None,
+              output_profile: Optional[str] = None, compression_level: Optional[int] = None) -> List[str]:
+        """
+        Dividir un PDF en varios (la operación inversa de combine)
 
-    def validate_files(self, files: List[str]) -> List[str]:
+        Sin ``page_ranges`` se escribe un PDF por cada documento del índice de
+        un PDF combinado, según sus marcadores "📄 N: título". El original se
+        analiza una sola vez y las partes se escriben en paralelo en un pool
+        de procesos (ver core.splitter.split_pdf).
+
+        Args:
+            source: PDF a dividir
+            output_dir: Directorio donde se escriben las partes
+            page_ranges: Páginas de cada parte (p. ej. ["1-3", "4-"])
+            titles: Título de cada parte; da nombre a los archivos
+            workers: Procesos (0 = uno por CPU); por defecto AppConfig.SPLIT_WORKERS
+            output_profile: "classic" o "compact"; por defecto AppConfig.OUTPUT_PROFILE
+            compression_level: Nivel zlib (0-9) del perfil compacto; por defecto AppConfig.COMPRESSION_LEVEL
+
+        Returns:
+            Rutas de las partes escritas, en orden
+
+        Raises:
+            PDFCombinerError: Si no se puede dividir
+        """
+        from core.splitter import split_pdf
+
+        if not os.path.isfile(source):
+            raise PDFCombinerError(f"No se encontró el PDF: {source}")
+        options = {
+            'output_profile': output_profile or AppConfig.OUTPUT_PROFILE,
+            'compression_level': AppConfig.COMPRESSION_LEVEL if compression_level is None else compression_level,
+        }
+        try:
+            parts = split_pdf(source, output_dir, page_ranges, titles, workers, options)
+        except Exception as e:
+            raise PDFCombinerError(f"Error al dividir {source}: {e}")
+        self.last_report = {
+            'source': source,
+            'parts': [part._asdict() for part in parts],
+        }
+        return [part.output_path for part in parts]
+
+    @staticmethod
+    def _raise_if_cancelled(cancel_token) -> None:
+        """Convertir la interrupción de una operación cancelada en PDFCombinerCancelled"""
+        if cancel_token is not None and cancel_token.cancelled:
+            if cancel_token.timed_out:
+                raise PDFCombinerCancelled("Tiempo límite agotado")
+            raise PDFCombinerCancelled("Operación cancelada")
+
+    def find_duplicates(self, files: List[str]) -> Dict[str, str]:
+        """
+        Archivos con el mismo contenido que otro anterior de la lista
+
+        Returns:
+            {ruta duplicada: primera ruta con el mismo contenido}
+        """
+        from core.duplicates import find_duplicates
+        return find_duplicates(files, self.metadata_cache)
+
+    def _drop_duplicates(self, files, titles, page_ranges):
+        """Quitar los archivos repetidos junto con su título y rango de páginas"""
+        duplicates = self.find_duplicates([f for f in files if _is_path(f)])
+        ranges = page_ranges or [None] * len(files)
+        kept, skipped, seen = [], [], set()
+        for i, (path, pages) in enumerate(zip(files, ranges)):
+            if not _is_path(path):
+                # Las entradas en memoria no se comparan
+                kept.append(i)
+                continue
+            # El mismo contenido con otras páginas no es un duplicado
+            key = (duplicates.get(path, path), (pages or '').replace(' ', ''))
+            if key in seen:
+                skipped.append((path, key[0]))
+            else:
+                seen.add(key)
+                kept.append(i)
+        if not skipped:
+            return files, titles, page_ranges, skipped
+        return ([files[i] for i in kept],
+                [titles[i] for i in kept] if titles is not None else None,
+                [page_ranges[i] for i in kept] if page_ranges is not None else None,
+                skipped)
+
+    @staticmethod
+    def _tree_merge(files: List[str], page_ranges, work_dir: str, batch_size: int,
+                    workers: Optional[int], cancel_token):
+        """Reducir las entradas a documentos intermedios (ver core.tree_merge)"""
+        from core.tree_merge import tree_merge
+
+        if workers is None:
+            workers = AppConfig.TREE_MERGE_WORKERS
+        batches = -(-len(files) // batch_size)
+        workers = max(1, min(workers or os.cpu_count() or 1, batches))
+        try:
+            return tree_merge(files, page_ranges, work_dir, batch_size, workers, cancel_token)
+        except ArchiveError as e:
+            raise PDFCombinerError(str(e))
+
+    @staticmethod
+    def _open_archive_members(files: List[PDFInput]) -> List[PDFInput]:
+        """Sustituir las rutas de miembros de comprimidos por miembros que se abren al usarlos"""
+        members = [f for f in files if is_member_path(f)]
+        if not members:
+            return files
+        try:
+            opened = open_members(members)
+        except ArchiveError as e:
+            raise PDFCombinerError(str(e))
+        return [opened[f] if is_member_path(f) else f for f in files]
+
+    def _resolve_titles(self, files: List[str], titles: Optional[List[str]]) -> List[str]:
+        """Usar títulos editados si se proporcionan, si no, extraerlos automáticamente"""
+        if titles is not None:
+            return titles
+        if not all(_is_path(f) for f in files):
+            raise PDFCombinerError("Hay que indicar los títulos cuando hay PDFs en memoria")
+        return [TextProcessor.extract_title(os.path.basename(f)) for f in files]
+
+    def preparse(self, files: List[str], workers: int, repair: bool = False,
+                 repair_dir: Optional[str] = None) -> List[str]:
+        """
+        Validar los PDFs en un pool de procesos
+
+        Los archivos con recuento de páginas en caché ya se validaron antes y
+        no se vuelven a analizar (salvo que se pida reparación). Las entradas
+        en memoria no se pre-analizan.
+
+        Returns:
+            Rutas a usar al combinar, en el mismo orden
+
+        Raises:
+            PDFCombinerError: Si algún archivo está cifrado o dañado
+        """
+        pending = [f for f in files if _is_path(f) and not is_member_path(f)]
+        if self.metadata_cache and not repair:
+            pending = [f for f in pending if not self._has_cached_page_count(f)]
+        if not pending:
+            return list(files)
+
+        from core.preparse import preparse_inputs
+
+        reports = {r.path: r for r in preparse_inputs(pending, workers, repair, repair_dir)}
+        errors = [f"{r.path}: {r.error}" for r in reports.values() if not r.ok]
+        if errors:
+            raise PDFCombinerError("Archivos no válidos:\n" + "\n".join(errors))
+
+        if self.metadata_cache:
+            self.metadata_cache.record_page_counts({r.path: r.page_count for r in reports.values()})
+        return [reports[f].merge_path if _is_path(f) and f in reports else f for f in files]
+
+    def _has_cached_page_count(self, file: str) -> bool:
+        metadata = self.metadata_cache.get(file)
+        return bool(metadata and metadata.page_count)
+
+    def get_page_count(self, file: str) -> int:
+        """Obtener número de páginas, usando la caché de metadatos si está disponible"""
+        if self.metadata_cache:
+            return self.metadata_cache.get_page_count(file)
+        from pdf_utils import PDFUtils
+        return PDFUtils.get_page_count(file)
+
+    def validate_files(self, files: List[PDFInput]) -> List[str]:
         """
         Validar que los archivos existen y son PDFs válidos
 
+        Las entradas en memoria deben empezar por la cabecera %PDF, y los
+        archivos abiertos deben permitir seek. Los miembros de comprimidos
+        deben existir en el comprimido.
+
         Returns:
             Lista de archivos que no son válidos
         """
         invalid_files = []
 
-        for file in files:
+        for i, file in enumerate(files):
+            if not _is_path(file):
+                error = self._validate_in_memory(file)
+                if error:
+                    invalid_files.append(f"Entrada {i + 1}: {error}")
+                continue
             try:
-                import os
-                if not os.path.isfile(file):
+                if is_member_path(file):
+                    if not member_exists(file):
+                        invalid_files.append(f"{file}: Archivo no encontrado en el comprimido")
+                elif not os.path.isfile(file):
                     invalid_files.append(f"{file}: Archivo no encontrado")
                 elif not file.lower().endswith('.pdf'):
                     invalid_files.append(f"{file}: No es un archivo PDF")
@@ -80,3 +419,21 @@ class PDFCombinerService:
                 invalid_files.append(f"{file}: Error al validar - {e}")
 
         return invalid_files
+
+    @staticmethod
+    def _validate_in_memory(source) -> Optional[str]:
+        """Error de una entrada en memoria o archivo abierto, o None si parece un PDF"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            header = bytes(memoryview(source)[:1024])
+        elif hasattr(source, 'read') and hasattr(source, 'seek'):
+            try:
+                source.seek(0)
+                header = source.read(1024)
+                source.seek(0)
+            except (OSError, ValueError) as e:
+                return f"No se puede leer - {e}"
+        else:
+            return f"Tipo de entrada no soportado: {type(source).__name__}"
+        if b'%PDF-' not in header:
+            return "No es un archivo PDF"
+        return None
@@ -0,0 +1,108 @@
+"""
+Pre-análisis en paralelo de los PDFs de entrada
+"""
+import os
+import tempfile
+from typing import List, NamedTuple, Optional
+
+
+class InputReport(NamedTuple):
+    """Resultado del análisis de un PDF de entrada"""
+    path: str
+    page_count: int
+    encrypted: bool
+    error: Optional[str] = None
+    repaired_path: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def merge_path(self) -> str:
+        """Ruta a usar al combinar (la versión reparada si existe)"""
+        return self.repaired_path or self.path
+
+
+def inspect_pdf(path: str, repair: bool = False, repair_dir: Optional[str] = None) -> InputReport:
+    """
+    Analizar un PDF: recuento de páginas, cifrado y corrupción.
+
+    Se ejecuta en los procesos del pool, por lo que debe ser una función de
+    módulo. Con ``repair`` los archivos que PyMuPDF tuvo que reconstruir se
+    guardan normalizados en ``repair_dir``.
+    """
+    try:
+        import fitz
+    except ImportError:
+        return _inspect_with_pypdf2(path)
+
+    try:
+        doc = fitz.open(path)
+    except Exception as e:
+        return InputReport(path, 0, False, f"No se pudo abrir: {e}")
+
+    try:
+        if doc.needs_pass:
+            return InputReport(path, 0, True, "Protegido con contraseña")
+        page_count = doc.page_count
+        if page_count == 0:
+            return InputReport(path, 0, doc.is_encrypted, "El PDF no tiene páginas")
+
+        repaired_path = None
+        if repair and doc.is_repaired and repair_dir:
+            # Nombre único: puede haber entradas dañadas con el mismo nombre en otras carpetas
+            stem = os.path.splitext(os.path.basename(path))[0]
+            fd, repaired_path = tempfile.mkstemp(suffix='.pdf', prefix=f"{stem}_", dir=repair_dir)
+            os.close(fd)
+            doc.save(repaired_path, garbage=1, clean=True)
+        return InputReport(path, page_count, doc.is_encrypted, None, repaired_path)
+    except Exception as e:
+        return InputReport(path, 0, False, f"PDF dañado: {e}")
+    finally:
+        doc.close()
+
+
+def _inspect_with_pypdf2(path: str) -> InputReport:
+    """Análisis alternativo cuando PyMuPDF no está disponible"""
+    import PyPDF2
+    from pdf_utils import open_input
+    try:
+        with open_input(path) as file:
+            reader = PyPDF2.PdfReader(file)
+            encrypted = reader.is_encrypted
+            if encrypted and not reader.decrypt(''):
+                return InputReport(path, 0, True, "Protegido con contraseña")
+            page_count = len(reader.pages)
+    except Exception as e:
+        return InputReport(path, 0, False, f"PDF dañado: {e}")
+    if page_count == 0:
+        return InputReport(path, 0, encrypted, "El PDF no tiene páginas")
+    return InputReport(path, page_count, encrypted)
+
+
+def _inspect_star(args) -> InputReport:
+    return inspect_pdf(*args)
+
+
+def preparse_inputs(files: List[str], workers: Optional[int] = None, repair: bool = False,
+                    repair_dir: Optional[str] = None) -> List[InputReport]:
+    """
+    Analizar los PDFs en paralelo con un ProcessPoolExecutor.
+
+    Returns:
+        Informes en el mismo orden que ``files``
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(files)))
+    tasks = [(f, repair, repair_dir) for f in files]
+
+    if workers == 1:
+        return [_inspect_star(task) for task in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_inspect_star, tasks, chunksize=chunksize))
@@ -0,0 +1,131 @@
+"""
+División de un PDF en varios documentos (la operación inversa de combinar)
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+from config.settings import AppConfig
+
+# Caracteres no válidos en nombres de archivo (los mismos que FileManager.validate_output_path)
+_INVALID_NAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+# Divisor abierto en este proceso. Se crea antes de lanzar el pool para que
+# los procesos hijos (con fork) hereden el PDF ya analizado
+_splitter = None
+
+
+class SplitPart(NamedTuple):
+    """Una parte escrita por la división"""
+    title: str
+    pages: str  # Rango de páginas del original
+    output_path: str
+    page_count: int = 0
+
+
+def _open_splitter(source: str, options: Dict):
+    """Divisor del proceso actual para ``source``, reutilizando el ya abierto"""
+    global _splitter
+    from pdf_utils import PDFSplitter
+
+    if _splitter is None or _splitter.source != source:
+        if _splitter is not None:
+            _splitter.close()
+        _splitter = PDFSplitter(source, **options)
+    return _splitter
+
+
+def _close_splitter() -> None:
+    global _splitter
+    if _splitter is not None:
+        _splitter.close()
+        _splitter = None
+
+
+def _write_part(source: str, options: Dict, part: SplitPart) -> SplitPart:
+    """Escribir una parte (se ejecuta en los procesos del pool: función de módulo)"""
+    count = _open_splitter(source, options).write(part.pages, part.output_path)
+    return part._replace(page_count=count)
+
+
+def part_file_name(number: int, title: str, total: int) -> str:
+    """Nombre del archivo de una parte: número con ceros a la izquierda y título"""
+    name = _INVALID_NAME_CHARS.sub('_', title).strip(' .') or 'parte'
+    return f"{number:0{len(str(total))}d}_{name}.pdf"
+
+
+def _plan_split(splitter, output_dir: str, page_ranges: Optional[List[str]],
+                titles: Optional[List[str]]) -> List[SplitPart]:
+    """
+    Partes en que se dividirá el PDF abierto en ``splitter``
+
+    Sin ``page_ranges`` se usan las entradas "📄 N: título" del marcador que
+    escribe la combinación con índice; las páginas del índice no se incluyen.
+
+    Raises:
+        ValueError: Si el PDF no tiene esos marcadores o un rango no es válido
+    """
+    from pdf_utils import PageRanges, SplitSection
+
+    if page_ranges is None:
+        sections = splitter.sections()
+        if titles is not None:
+            if len(titles) != len(sections):
+                raise ValueError(f"Hay {len(sections)} secciones y {len(titles)} títulos")
+            sections = [section._replace(title=title) for section, title in zip(sections, titles)]
+    else:
+        if titles is not None and len(titles) != len(page_ranges):
+            raise ValueError("Debe indicarse un título por cada rango de páginas")
+        stem = os.path.splitext(os.path.basename(splitter.source))[0]
+        titles = titles or [f"{stem}_{number}" for number in range(1, len(page_ranges) + 1)]
+        sections = [SplitSection(title, spec) for title, spec in zip(titles, page_ranges)]
+        for section in sections:
+            # Validar todos los rangos antes de escribir nada
+            PageRanges(section.pages).resolve(splitter.page_count)
+
+    return [SplitPart(section.title, section.pages,
+                      os.path.join(output_dir, part_file_name(number, section.title, len(sections))))
+            for number, section in enumerate(sections, 1)]
+
+
+def split_pdf(source: str, output_dir: str, page_ranges: Optional[List[str]] = None,
+              titles: Optional[List[str]] = None, workers: Optional[int] = None,
+              options: Optional[Dict] = None) -> List[SplitPart]:
+    """
+    Dividir un PDF en varios, escribiendo las partes en paralelo
+
+    El PDF se analiza una sola vez en este proceso para planificar la
+    división; los procesos del pool lo heredan ya abierto (fork) o lo abren
+    una vez cada uno al arrancar, y escriben todas sus partes desde esa
+    misma lectura.
+
+    Args:
+        source: PDF a dividir
+        output_dir: Directorio de las partes (se crea si no existe)
+        page_ranges: Páginas de cada parte (p. ej. ["1-3", "4-"]); por defecto,
+            una parte por documento del índice de un PDF combinado
+        titles: Título de cada parte, usado en el nombre del archivo
+        workers: Procesos (0 = uno por CPU); por defecto AppConfig.SPLIT_WORKERS
+        options: output_profile y compression_level de pdf_utils.PDFSplitter
+
+    Returns:
+        Partes escritas, en orden
+    """
+    options = options or {}
+    try:
+        parts = _plan_split(_open_splitter(source, options), output_dir, page_ranges, titles)
+        os.makedirs(output_dir, exist_ok=True)
+
+        if workers is None:
+            workers = AppConfig.SPLIT_WORKERS
+        workers = max(1, min(workers or os.cpu_count() or 1, len(parts)))
+        if workers == 1:
+            return [_write_part(source, options, part) for part in parts]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_splitter,
+                                 initargs=(source, options)) as pool:
+            futures = [pool.submit(_write_part, source, options, part) for part in parts]
+            return [future.result() for future in futures]
+    finally:
+        _close_splitter()
@@ -0,0 +1,119 @@
+"""
+Combinación en árbol: lotes combinados en paralelo y luego combinados entre sí
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from core.archives import is_member_path, open_members
+
+# Motor de los documentos intermedios: escribe cada entrada según la lee
+INTERMEDIATE_BACKEND = 'stream'
+
+
+class TreeMergeResult(NamedTuple):
+    """Documentos intermedios listos para la pasada final"""
+    files: List[str]
+    # Páginas de cada documento original, por intermedio (None si no hizo falta combinar)
+    document_pages: Optional[List[List[int]]]
+    page_counts: Dict[str, int]      # Recuentos de páginas de las entradas completas
+    levels: int
+
+
+def merge_batch(files: List[str], page_ranges: List[Optional[str]],
+                output_path: str) -> Tuple[List[int], Dict[str, int]]:
+    """
+    Combinar un lote sin índice en un documento intermedio
+
+    Se ejecuta en los procesos del pool, por lo que debe ser una función de
+    módulo. Los miembros de comprimidos se abren aquí, en el proceso que los usa,
+    y cada uno sólo mientras se copia.
+
+    Returns:
+        (páginas añadidas por entrada, recuentos de páginas de las entradas completas)
+    """
+    from pdf_utils import AdvancedPDFCombiner
+
+    members = open_members([f for f in files if is_member_path(f)])
+    inputs = [members.get(f, f) for f in files]
+    # Los títulos no se usan sin índice, pero son obligatorios con entradas en memoria
+    combiner = AdvancedPDFCombiner(inputs, [''] * len(files), backend=INTERMEDIATE_BACKEND,
+                                   page_ranges=page_ranges)
+    combiner.combine_simple(output_path)
+    return combiner.content_counts, combiner.page_counts
+
+
+def tree_merge(files: List[str], page_ranges: Optional[List[Optional[str]]], work_dir: str,
+               batch_size: int, workers: int, cancel_token=None) -> TreeMergeResult:
+    """
+    Reducir las entradas a como mucho ``batch_size`` documentos intermedios
+
+    Cada nivel combina lotes de ``batch_size`` documentos en paralelo en un
+    ProcessPoolExecutor; se repite hasta que quedan ``batch_size`` o menos.
+    Se guarda cuántas páginas aporta cada documento original para que la
+    pasada final (AdvancedPDFCombiner con ``document_pages``) genere el
+    mismo índice y los mismos marcadores que una combinación secuencial.
+
+    Args:
+        files: Rutas de entrada (también miembros de comprimidos)
+        page_ranges: Rango de páginas de cada entrada (None = todas)
+        work_dir: Directorio para los documentos intermedios
+        batch_size: Documentos por lote (al menos 2)
+        workers: Procesos del pool
+        cancel_token: pdf_utils.CancellationToken, comprobado entre lotes
+
+    Returns:
+        Documentos intermedios y páginas de los documentos originales que contiene cada uno
+    """
+    if batch_size < 2:
+        raise ValueError("El tamaño de lote debe ser al menos 2")
+    current = list(files)
+    ranges = list(page_ranges) if page_ranges is not None else [None] * len(files)
+    documents = None  # Sin combinar aún, cada entrada es un documento
+    page_counts = {}
+    levels = 0
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while len(current) > batch_size:
+            batches = [list(range(start, min(start + batch_size, len(current))))
+                       for start in range(0, len(current), batch_size)]
+            tasks = []
+            for number, batch in enumerate(batches):
+                if len(batch) == 1 and documents is not None:
+                    # Un intermedio solo no se vuelve a copiar
+                    tasks.append(None)
+                    continue
+                output_path = os.path.join(work_dir, f"nivel{levels}_{number:05d}.pdf")
+                args = ([current[i] for i in batch], [ranges[i] for i in batch], output_path)
+                tasks.append((output_path, pool.submit(merge_batch, *args) if pool else args))
+
+            next_files, next_documents = [], []
+            for batch, task in zip(batches, tasks):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                if task is None:
+                    next_files.append(current[batch[0]])
+                    next_documents.append(documents[batch[0]])
+                    continue
+                output_path, job = task
+                counts, counted = job.result() if pool else merge_batch(*job)
+                page_counts.update(counted)
+                next_files.append(output_path)
+                if documents is None:
+                    next_documents.append(counts)
+                else:
+                    next_documents.append([pages for i in batch for pages in documents[i]])
+
+            if documents is not None:
+                # Los intermedios del nivel anterior ya están copiados
+                for path in set(current) - set(next_files):
+                    os.remove(path)
+            current, documents = next_files, next_documents
+            ranges = [None] * len(current)
+            levels += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return TreeMergeResult(current, documents, page_counts, levels)
@@ -0,0 +1,59 @@
+"""
+Combinación de PDFs en segundo plano
+"""
+from typing import List, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.pdf_combiner import PDFCombinerService, PDFCombinerError, PDFCombinerCancelled
+from pdf_utils import CancellationToken, MergeProgress
+from utils.localization import _
+
+
+class CombineWorker(QObject):
+    """Ejecuta PDFCombinerService.combine en un QThread sin bloquear la interfaz"""
+
+    # Señales
+    progress = pyqtSignal(str, int, int, int)  # Etapa, archivos procesados, total de archivos, páginas
+    finished = pyqtSignal(str)  # Ruta del archivo creado
+    failed = pyqtSignal(str)  # Mensaje de error
+    cancelled = pyqtSignal()  # Cancelada (la salida parcial ya se eliminó)
+
+    def __init__(self, service: PDFCombinerService, files: List[str], output_path: str,
+                 create_index: bool = True, titles: Optional[List[str]] = None,
+                 page_ranges: Optional[List[Optional[str]]] = None):
+        super().__init__()
+        self.service = service
+        self.files = list(files)
+        self.output_path = output_path
+        self.create_index = create_index
+        self.titles = titles
+        self.page_ranges = page_ranges
+        self._cancel_token = CancellationToken()
+
+    def run(self):
+        """Combinar (se ejecuta en el hilo del worker)"""
+        try:
+            result = self.service.combine(
+                files=self.files,
+                output_path=self.output_path,
+                create_index=self.create_index,
+                titles=self.titles,
+                page_ranges=self.page_ranges,
+                progress_callback=self._on_progress,
+                cancel_token=self._cancel_token
+            )
+            self.finished.emit(result)
+        except PDFCombinerCancelled:
+            self.cancelled.emit()
+        except PDFCombinerError as e:
+            self.failed.emit(str(e))
+        except Exception as e:
+            self.failed.emit(_("Error inesperado: {}").format(e))
+
+    def _on_progress(self, event: MergeProgress):
+        self.progress.emit(event.stage, event.file_index + 1, event.total_files, event.pages_done)
+
+    def cancel(self):
+        """Solicitar la cancelación (se puede llamar desde el hilo de la interfaz)"""
+        self._cancel_token.cancel()
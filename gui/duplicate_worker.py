@@ -0,0 +1,29 @@
+"""
+Detección de PDFs duplicados en segundo plano
+"""
+from typing import List
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.duplicates import find_duplicates
+from core.metadata_cache import get_metadata_cache
+
+
+class DuplicateCheckWorker(QObject):
+    """Calcula los hashes de los archivos seleccionados en un QThread sin bloquear la interfaz"""
+
+    # Señales
+    finished = pyqtSignal(dict)  # {ruta duplicada: primera ruta con el mismo contenido}
+
+    def __init__(self, files: List[str]):
+        super().__init__()
+        self.files = list(files)
+
+    def run(self):
+        """Buscar duplicados (se ejecuta en el hilo del worker)"""
+        try:
+            duplicates = find_duplicates(self.files, get_metadata_cache())
+        except Exception:
+            # La comprobación es orientativa: un fallo no debe afectar a la selección
+            duplicates = {}
+        self.finished.emit(duplicates)
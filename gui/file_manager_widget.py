@@ -1,7 +1,7 @@
 """
 Widget de gestión de archivos refactorizado usando widgets especializados
 """
-from typing import List, Set
+from typing import List, Optional, Set
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSplitter
 from PyQt6.QtCore import Qt, pyqtSignal
 from core.file_manager import FileManager
@@ -21,6 +21,7 @@ class FileManagerWidget(QWidget):
     files_selected = pyqtSignal(list)  # Emitida cuando cambian los archivos seleccionados
     current_directory_changed = pyqtSignal(str)  # Emitida cuando cambia el directorio
     combine_requested = pyqtSignal()  # Emitida cuando se solicita combinar PDFs
+    duplicates_found = pyqtSignal(dict)  # Archivos con el mismo contenido que otro seleccionado
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -69,6 +70,7 @@ class FileManagerWidget(QWidget):
         # Conexiones de archivos seleccionados
         self.selected_files.files_changed.connect(self._on_files_changed)
         self.selected_files.selection_changed.connect(self._update_explorer_files_set)
+        self.selected_files.duplicates_found.connect(self.duplicates_found.emit)
 
         # Conexiones de controles
         self.controls_widget.combine_requested.connect(self.combine_requested.emit)
@@ -107,6 +109,14 @@ class FileManagerWidget(QWidget):
         """Obtener los títulos editados de los archivos seleccionados"""
         return self.selected_files.get_selected_titles()
 
+    def stop_background_tasks(self):
+        """Esperar a las tareas en segundo plano (comprobación de duplicados)"""
+        self.selected_files.stop_background_tasks()
+
+    def get_selected_page_ranges(self) -> List[Optional[str]]:
+        """Obtener el rango de páginas de cada archivo seleccionado (None = todas)"""
+        return self.selected_files.get_selected_page_ranges()
+
     def set_current_directory(self, directory: str) -> bool:
         """Establecer directorio actual"""
         if self.file_manager.set_current_directory(directory):
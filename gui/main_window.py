@@ -2,14 +2,16 @@
 Ventana principal de la aplicación
 """
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout,
                             QPushButton, QLabel, QCheckBox, QMessageBox,
-                            QFileDialog, QWidget, QFrame, QListWidgetItem)
-from PyQt6.QtCore import Qt
+                            QFileDialog, QWidget, QFrame, QListWidgetItem,
+                            QProgressDialog)
+from PyQt6.QtCore import Qt, QThread
 
 from .file_manager_widget import FileManagerWidget
+from .combine_worker import CombineWorker
 from .styles import StyleManager, ButtonStyle
 from core.file_manager import FileManager, FileManagerError, DirectoryEntry
 from core.pdf_combiner import PDFCombinerService, PDFCombinerError
@@ -25,6 +27,11 @@ class PDFCombinerGUI(QMainWindow):
         super().__init__()
         self.selected_files: List[str] = []
 
+        # Combinación en segundo plano en curso
+        self._combine_thread = None
+        self._combine_worker = None
+        self._progress_dialog = None
+
         self._setup_services()
         self._init_ui()
         self.setWindowTitle(_("PDF Combiner Pro"))
@@ -105,11 +112,22 @@ class PDFCombinerGUI(QMainWindow):
 
         # Conectar el botón de combinar del file manager widget
         self.file_manager_widget.combine_requested.connect(self._combine_pdfs)
+        self.file_manager_widget.duplicates_found.connect(self._on_duplicates_found)
 
     def _on_files_selected(self, files: List[str]):
         """Manejar cambio en archivos seleccionados"""
         self.selected_files = files.copy()
 
+    def _on_duplicates_found(self, duplicates: Dict[str, str]):
+        """Avisar de los archivos con el mismo contenido que otro ya seleccionado"""
+        lines = "\n".join(f"{os.path.basename(path)} = {os.path.basename(original)}"
+                          for path, original in duplicates.items())
+        if AppConfig.SKIP_DUPLICATE_INPUTS:
+            message = _("Se omitieron archivos con el mismo contenido que otros ya seleccionados:\n{}")
+        else:
+            message = _("Hay archivos con el mismo contenido que otros ya seleccionados:\n{}")
+        QMessageBox.information(self, _("Archivos duplicados"), message.format(lines))
+
     def _on_directory_changed(self, directory: str):
         """Manejar cambio de directorio"""
         # Podemos agregar lógica adicional si es necesario
@@ -149,18 +167,87 @@ class PDFCombinerGUI(QMainWindow):
         # Obtener los títulos editados del listado
         edited_titles = self.file_manager_widget.get_selected_titles()
 
-        try:
-            result = self.pdf_service.combine(
-                files=self.selected_files,
-                output_path=output_file,
-                create_index=self.file_manager_widget.is_create_index_checked(),
-                titles=edited_titles
-            )
-            self._show_success_message(result)
-        except PDFCombinerError as e:
-            self._show_error_message(str(e))
-        except Exception as e:
-            self._show_error_message(_("Error inesperado: {}").format(e))
+        self._start_combine_worker(
+            files=self.selected_files,
+            output_file=output_file,
+            create_index=self.file_manager_widget.is_create_index_checked(),
+            titles=edited_titles,
+            page_ranges=self.file_manager_widget.get_selected_page_ranges()
+        )
+
+    def _start_combine_worker(self, files: List[str], output_file: str, create_index: bool, titles: List[str],
+                              page_ranges: Optional[List[Optional[str]]] = None):
+        """Combinar en un QThread mostrando el progreso en un diálogo con botón Cancelar"""
+        if self._combine_thread is not None:
+            return
+
+        self._progress_dialog = QProgressDialog(_("Combinando PDFs..."), _("Cancelar"), 0, len(files), self)
+        self._progress_dialog.setWindowTitle(_("PDF Combiner Pro"))
+        self._progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self._progress_dialog.setMinimumDuration(0)
+        self._progress_dialog.setAutoClose(False)
+        self._progress_dialog.setAutoReset(False)
+        self._progress_dialog.setValue(0)
+        self._progress_dialog.canceled.connect(self._on_combine_cancel_requested)
+
+        self._combine_thread = QThread(self)
+        self._combine_worker = CombineWorker(self.pdf_service, files, output_file, create_index, titles,
+                                             page_ranges)
+        self._combine_worker.moveToThread(self._combine_thread)
+
+        self._combine_thread.started.connect(self._combine_worker.run)
+        self._combine_worker.progress.connect(self._on_combine_progress)
+        self._combine_worker.finished.connect(self._on_combine_finished)
+        self._combine_worker.failed.connect(self._on_combine_failed)
+        self._combine_worker.cancelled.connect(self._on_combine_cancelled)
+
+        self._combine_thread.start()
+
+    def _on_combine_progress(self, stage: str, files_done: int, total_files: int, pages_done: int):
+        """Actualizar el diálogo de progreso"""
+        if self._progress_dialog is None or self._progress_dialog.wasCanceled():
+            return
+        self._progress_dialog.setMaximum(total_files)
+        self._progress_dialog.setValue(files_done)
+        if stage == 'index':
+            label = _("Generando índice...")
+        elif stage in ('write', 'done'):
+            label = _("Guardando PDF...")
+        else:
+            label = _("Archivo {} de {} · {} páginas").format(files_done, total_files, pages_done)
+        self._progress_dialog.setLabelText(label)
+
+    def _on_combine_cancel_requested(self):
+        """Pedir al worker que se detenga (llamada directa: su hilo está ocupado combinando)"""
+        if self._combine_worker is not None:
+            self._combine_worker.cancel()
+
+    def _on_combine_finished(self, result_path: str):
+        self._stop_combine_worker()
+        self._show_success_message(result_path)
+
+    def _on_combine_failed(self, error_message: str):
+        self._stop_combine_worker()
+        self._show_error_message(error_message)
+
+    def _on_combine_cancelled(self):
+        self._stop_combine_worker()
+        QMessageBox.information(self, _("Combinación cancelada"),
+                                _("Se canceló la combinación; no se ha guardado ningún archivo."))
+
+    def _stop_combine_worker(self):
+        """Cerrar el diálogo de progreso y liberar el hilo del worker"""
+        if self._progress_dialog is not None:
+            self._progress_dialog.close()
+            self._progress_dialog.deleteLater()
+        if self._combine_thread is not None:
+            self._combine_thread.quit()
+            self._combine_thread.wait()
+            self._combine_worker.deleteLater()
+            self._combine_thread.deleteLater()
+        self._combine_thread = None
+        self._combine_worker = None
+        self._progress_dialog = None
 
     def _get_output_file(self) -> str:
         """Obtener archivo de salida"""
@@ -184,6 +271,15 @@ class PDFCombinerGUI(QMainWindow):
         """Mostrar mensaje de error"""
         QMessageBox.critical(self, _("Error"), error_message)
 
+    def closeEvent(self, event):
+        """Cancelar la combinación en curso antes de cerrar la ventana"""
+        if self._combine_worker is not None:
+            self._combine_worker.cancel()
+            self._combine_thread.quit()
+            self._combine_thread.wait()
+        self.file_manager_widget.stop_background_tasks()
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):
         """Manejar eventos de teclado"""
         key = event.key()
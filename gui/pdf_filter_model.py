@@ -1,4 +1,7 @@
-from PyQt6.QtCore import QSortFilterProxyModel, QModelIndex
+from PyQt6.QtCore import QSortFilterProxyModel, QModelIndex, Qt
+from core.archives import is_archive
+from utils.text_processor import TextProcessor
+from utils.localization import _
 
 class PDFFilterModel(QSortFilterProxyModel):
     """Modelo proxy para filtrar solo archivos PDF y directorios, con navegación hacia arriba integrada"""
@@ -28,14 +31,28 @@ class PDFFilterModel(QSortFilterProxyModel):
         self.file_manager = file_manager
 
     def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
-        """Filtrar solo directorios y archivos PDF, y aplicar filtro regex si existe"""
+        """Filtrar solo directorios, archivos PDF y comprimidos, y aplicar filtro regex si existe"""
         source_model = self.sourceModel()
         index = source_model.index(source_row, 0, source_parent)
         if source_model.isDir(index):
             return True
         filename = source_model.fileName(index)
-        if not filename.lower().endswith('.pdf'):
+        if not filename.lower().endswith('.pdf') and not is_archive(filename):
             return False
         if self.regex_filter:
             return bool(self.regex_filter.search(filename))
         return True
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        """Mostrar metadatos cacheados (título, páginas) como tooltip de los PDFs"""
+        if role == Qt.ItemDataRole.ToolTipRole and self.file_manager and index.isValid():
+            source_index = self.mapToSource(index)
+            source_model = self.sourceModel()
+            if not source_model.isDir(source_index):
+                metadata = self.file_manager.get_cached_metadata(source_model.filePath(source_index))
+                if metadata:
+                    title = TextProcessor.extract_title(source_model.fileName(source_index))
+                    if metadata.page_count:
+                        return _("{} ({} páginas)").format(title, metadata.page_count)
+                    return title
+        return super().data(index, role)
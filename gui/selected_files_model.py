@@ -1,8 +1,11 @@
-from typing import List
+from typing import Dict, List, Optional
 from pathlib import Path
 from PyQt6.QtCore import Qt, QModelIndex, pyqtSignal
-from PyQt6.QtGui import QStandardItemModel, QStandardItem, QIcon, QPixmap, QPainter
+from PyQt6.QtGui import QStandardItemModel, QStandardItem, QIcon, QPixmap, QPainter, QColor
 from utils.text_processor import TextProcessor
+from core.archives import split_member_path
+from gui.styles import ColorPalette
+from utils.localization import _
 
 class SelectedFilesModel(QStandardItemModel):
     """Modelo para archivos seleccionados - solo títulos con soporte drag and drop"""
@@ -11,7 +14,7 @@ class SelectedFilesModel(QStandardItemModel):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.selected_files: List[dict] = []  # cada dict: {'path': str, 'title': str}
+        self.selected_files: List[dict] = []  # cada dict: {'path': str, 'title': str, 'pages': str|None, 'duplicate_of': str|None}
         self.drag_source_row = -1
         self.drag_file_path = None
         self.actual_drop_row = -1  # Posición real del drop desde CustomListView
@@ -89,6 +92,7 @@ class SelectedFilesModel(QStandardItemModel):
             title_item.setData(entry['path'], Qt.ItemDataRole.UserRole)
             title_item.setIcon(self._get_pdf_icon())
             title_item.setEditable(True)
+            self._update_item(title_item, entry)
             self.appendRow(title_item)
 
     def _sync_selected_files_from_model(self):
@@ -107,13 +111,13 @@ class SelectedFilesModel(QStandardItemModel):
     def add_file(self, file_path: str) -> bool:
         if any(entry['path'] == file_path for entry in self.selected_files):
             return False
-        path_obj = Path(file_path)
-        title = TextProcessor.extract_title(path_obj.name)
-        entry = {'path': file_path, 'title': title}
+        title = TextProcessor.extract_title(Path(file_path).name)
+        entry = {'path': file_path, 'title': title, 'pages': None, 'duplicate_of': None}
         self.selected_files.append(entry)
         title_item = QStandardItem(title)
         title_item.setData(file_path, Qt.ItemDataRole.UserRole)
         title_item.setIcon(self._get_pdf_icon())
+        self._update_item(title_item, entry)
         self.appendRow(title_item)
         return True
 
@@ -164,6 +168,41 @@ class SelectedFilesModel(QStandardItemModel):
             self.selected_files[row]['title'] = value
         return super().setData(index, value, role)
 
+    def set_page_range(self, row: int, spec: Optional[str]) -> bool:
+        """Fijar las páginas a incluir de un archivo (None o "" = todas)"""
+        if not 0 <= row < len(self.selected_files):
+            return False
+        spec = (spec or '').strip() or None
+        self.selected_files[row]['pages'] = spec
+        self._update_item(self.item(row), self.selected_files[row])
+        return True
+
+    def get_page_ranges(self) -> List[Optional[str]]:
+        return [entry.get('pages') for entry in self.selected_files]
+
+    def set_duplicates(self, duplicates: Dict[str, str]):
+        """Señalar los archivos con el mismo contenido que otro anterior ({duplicado: original})"""
+        for row, entry in enumerate(self.selected_files):
+            entry['duplicate_of'] = duplicates.get(entry['path'])
+            self._update_item(self.item(row), entry)
+
+    def _update_item(self, item: QStandardItem, entry: dict):
+        """Mostrar el rango de páginas y si es un duplicado en el tooltip del elemento"""
+        if item is None:
+            return
+        lines = []
+        archive = split_member_path(entry['path'])
+        if archive:
+            lines.append(_("En: {}").format(Path(archive[0]).name))
+        if entry.get('pages'):
+            lines.append(_("Páginas: {}").format(entry['pages']))
+        if entry.get('duplicate_of'):
+            lines.append(_("Mismo contenido que: {}").format(Path(entry['duplicate_of']).name))
+            item.setForeground(QColor(ColorPalette.GRAY_MEDIUM))
+        else:
+            item.setData(None, Qt.ItemDataRole.ForegroundRole)
+        item.setToolTip("\n".join(lines))
+
     def get_titles(self) -> List[str]:
         for i in range(self.rowCount()):
             item = self.item(i)
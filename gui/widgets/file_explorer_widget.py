@@ -5,12 +5,13 @@ from typing import List, Set
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTreeView, QLabel, QPushButton,
-    QFrame, QLineEdit
+    QFrame, QLineEdit, QMessageBox
 )
 from PyQt6.QtCore import Qt, QModelIndex, pyqtSignal
 from PyQt6.QtGui import QFileSystemModel
 from gui.pdf_filter_model import PDFFilterModel
-from core.file_manager import FileManager
+from core.archives import ARCHIVE_EXTENSIONS
+from core.file_manager import FileManager, FileManagerError
 from gui.styles import FileManagerStyles
 from utils.localization import _
 
@@ -93,7 +94,8 @@ class FileExplorerWidget(QWidget):
         # Modelo del sistema de archivos
         self.fs_model = QFileSystemModel()
         self.fs_model.setRootPath('')
-        self.fs_model.setNameFilters(['*.pdf'])
+        # Los comprimidos ZIP/TAR se muestran para agregar los PDFs que contienen
+        self.fs_model.setNameFilters(['*.pdf'] + [f'*{ext}' for ext in ARCHIVE_EXTENSIONS])
         self.fs_model.setNameFilterDisables(False)
 
         # Modelo proxy para filtrar
@@ -142,7 +144,7 @@ class FileExplorerWidget(QWidget):
                 source_index = self.filter_model.mapToSource(index)
                 if not self.fs_model.isDir(source_index):
                     file_path = self.fs_model.filePath(source_index)
-                    if file_path.lower().endswith('.pdf'):
+                    if file_path.lower().endswith('.pdf') or self.file_manager.is_archive_file(file_path):
                         has_pdf_files = True
                         break
 
@@ -163,10 +165,10 @@ class FileExplorerWidget(QWidget):
             if self.file_manager.set_current_directory(dir_path):
                 self.update_current_directory()
         else:
-            # Emitir archivo PDF para agregar
-            file_path = self.fs_model.filePath(source_index)
-            if file_path.lower().endswith('.pdf'):
-                self.files_ready_to_add.emit([file_path])
+            # Emitir archivo PDF (o los PDFs de un comprimido) para agregar
+            files = self._pdf_files_for(self.fs_model.filePath(source_index))
+            if files:
+                self.files_ready_to_add.emit(files)
 
     def _navigate_to_parent(self):
         """Navegar al directorio padre"""
@@ -182,13 +184,23 @@ class FileExplorerWidget(QWidget):
             if index.column() == 0:  # Solo procesar la primera columna
                 source_index = self.filter_model.mapToSource(index)
                 if not self.fs_model.isDir(source_index):
-                    file_path = self.fs_model.filePath(source_index)
-                    if file_path.lower().endswith('.pdf'):
-                        selected_files.append(file_path)
+                    selected_files.extend(self._pdf_files_for(self.fs_model.filePath(source_index)))
 
         if selected_files:
             self.files_ready_to_add.emit(selected_files)
 
+    def _pdf_files_for(self, file_path: str) -> List[str]:
+        """PDFs a agregar por un archivo: él mismo, o los miembros si es un comprimido"""
+        if file_path.lower().endswith('.pdf'):
+            return [file_path]
+        if not self.file_manager.is_archive_file(file_path):
+            return []
+        try:
+            return [entry.path for entry in self.file_manager.get_archive_entries(file_path)]
+        except FileManagerError as e:
+            QMessageBox.warning(self, _("Advertencia"), str(e))
+            return []
+
     def update_current_directory(self):
         """Actualizar información del directorio actual"""
         current_path = Path(self.file_manager.current_directory)
@@ -1,13 +1,15 @@
 """
 Widget de archivos seleccionados
 """
-from typing import List, Set
+from typing import List, Optional, Set
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QListView, QLabel, QPushButton,
-    QFrame
+    QFrame, QInputDialog, QLineEdit, QMessageBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from config.settings import AppConfig
 from gui.custom_list_view import CustomListView
+from gui.duplicate_worker import DuplicateCheckWorker
 from gui.selected_files_model import SelectedFilesModel
 from gui.styles import FileManagerStyles
 from utils.localization import _
@@ -19,10 +21,15 @@ class SelectedFilesWidget(QWidget):
     # Señales
     files_changed = pyqtSignal(list)  # Lista de archivos cambió
     selection_changed = pyqtSignal()  # Selección cambió
+    duplicates_found = pyqtSignal(dict)  # {ruta duplicada: original}; ya omitidos si SKIP_DUPLICATE_INPUTS
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.selected_files_set: Set[str] = set()
+        self._duplicate_thread = None
+        self._duplicate_worker = None
+        self._duplicate_recheck = False
+        self._reported_duplicates: Set[str] = set()
 
         self._setup_ui()
         self._setup_model()
@@ -60,11 +67,13 @@ class SelectedFilesWidget(QWidget):
 
         self.move_up_button = QPushButton(_("↑ Subir"))
         self.move_down_button = QPushButton(_("↓ Bajar"))
+        self.pages_button = QPushButton(_("📄 Páginas"))
         self.remove_button = QPushButton(_("✕ Eliminar"))
         self.clear_button = QPushButton(_("🗑 Limpiar Todo"))
 
         # Estilos para botones
-        for button in [self.move_up_button, self.move_down_button, self.remove_button, self.clear_button]:
+        for button in [self.move_up_button, self.move_down_button, self.pages_button,
+                       self.remove_button, self.clear_button]:
             button.setStyleSheet(FileManagerStyles.CONTROL_BUTTON_BASE)
             button.setEnabled(False)
 
@@ -73,6 +82,7 @@ class SelectedFilesWidget(QWidget):
 
         buttons_layout.addWidget(self.move_up_button)
         buttons_layout.addWidget(self.move_down_button)
+        buttons_layout.addWidget(self.pages_button)
         buttons_layout.addStretch()
         buttons_layout.addWidget(self.remove_button)
         buttons_layout.addWidget(self.clear_button)
@@ -102,6 +112,7 @@ class SelectedFilesWidget(QWidget):
         # Botones de control de archivos seleccionados
         self.move_up_button.clicked.connect(self._move_selected_up)
         self.move_down_button.clicked.connect(self._move_selected_down)
+        self.pages_button.clicked.connect(self._edit_page_range)
         self.remove_button.clicked.connect(self._remove_selected_files)
         self.clear_button.clicked.connect(self._clear_selected_files)
 
@@ -119,6 +130,8 @@ class SelectedFilesWidget(QWidget):
         self.remove_button.setEnabled(has_selection)
         self.move_up_button.setEnabled(has_selection)
         self.move_down_button.setEnabled(has_selection)
+        # El rango de páginas se edita archivo a archivo
+        self.pages_button.setEnabled(len(self.selected_list.selectionModel().selectedRows()) == 1)
 
     def reload_texts(self):
         """Recarga los textos de la interfaz para el idioma actual."""
@@ -131,6 +144,7 @@ class SelectedFilesWidget(QWidget):
                     break
         self.move_up_button.setText(_("↑ Subir"))
         self.move_down_button.setText(_("↓ Bajar"))
+        self.pages_button.setText(_("📄 Páginas"))
         self.remove_button.setText(_("✕ Eliminar"))
         self.clear_button.setText(_("🗑 Limpiar Todo"))
 
@@ -164,6 +178,30 @@ class SelectedFilesWidget(QWidget):
                     )
                     self._emit_files_changed()
 
+    def _edit_page_range(self):
+        """Pedir el rango de páginas del archivo seleccionado"""
+        selected_rows = self.selected_list.selectionModel().selectedRows()
+        if len(selected_rows) != 1:
+            return
+        row = selected_rows[0].row()
+        current = self.selected_model.selected_files[row].get('pages') or ""
+
+        spec, accepted = QInputDialog.getText(
+            self, _("Rango de páginas"),
+            _("Páginas a incluir (p. ej. 1-3,10,-1; vacío = todas):"),
+            QLineEdit.EchoMode.Normal, current)
+        if not accepted:
+            return
+
+        # Sólo se comprueba la sintaxis: el número de páginas se conoce al combinar
+        from pdf_utils import PageRanges
+        try:
+            PageRanges.parse(spec)
+        except ValueError as e:
+            QMessageBox.warning(self, _("Advertencia"), _("Rango de páginas no válido: {}").format(e))
+            return
+        self.selected_model.set_page_range(row, spec)
+
     def _remove_selected_files(self):
         """Remover archivos seleccionados"""
         selected_rows = sorted([index.row() for index in self.selected_list.selectionModel().selectedRows()],
@@ -171,7 +209,7 @@ class SelectedFilesWidget(QWidget):
 
         for row in selected_rows:
             if 0 <= row < len(self.selected_model.selected_files):
-                file_path = self.selected_model.selected_files[row]
+                file_path = self.selected_model.selected_files[row]['path']
                 self.selected_files_set.discard(file_path)
                 self.selected_model.remove_file(row)
 
@@ -189,6 +227,68 @@ class SelectedFilesWidget(QWidget):
         """Emitir señal de cambio en archivos seleccionados"""
         files = self.selected_model.get_selected_files()
         self.files_changed.emit(files)
+        self._check_duplicates()
+
+    def _check_duplicates(self):
+        """Buscar duplicados por contenido en segundo plano"""
+        if self._duplicate_thread is not None:
+            # Se repite al terminar la comprobación en curso, con la selección de entonces
+            self._duplicate_recheck = True
+            return
+        files = self.selected_model.get_selected_files()
+        if len(files) < 2:
+            self.selected_model.set_duplicates({})
+            return
+
+        self._duplicate_thread = QThread(self)
+        self._duplicate_worker = DuplicateCheckWorker(files)
+        self._duplicate_worker.moveToThread(self._duplicate_thread)
+        self._duplicate_thread.started.connect(self._duplicate_worker.run)
+        self._duplicate_worker.finished.connect(self._on_duplicates_checked)
+        self._duplicate_thread.start()
+
+    def _on_duplicates_checked(self, duplicates: dict):
+        """Señalar u omitir los duplicados encontrados"""
+        self.stop_background_tasks()
+
+        # La selección pudo cambiar mientras se calculaban los hashes
+        current = set(self.selected_model.get_selected_files())
+        duplicates = {path: original for path, original in duplicates.items()
+                      if path in current and original in current}
+
+        if duplicates and AppConfig.SKIP_DUPLICATE_INPUTS:
+            for row in reversed(range(len(self.selected_model.selected_files))):
+                path = self.selected_model.selected_files[row]['path']
+                if path in duplicates:
+                    self.selected_files_set.discard(path)
+                    self.selected_model.remove_file(row)
+            self._update_buttons_state()
+            self.files_changed.emit(self.selected_model.get_selected_files())
+            duplicates_left = {}
+        else:
+            duplicates_left = duplicates
+        self.selected_model.set_duplicates(duplicates_left)
+
+        # Avisar sólo de los duplicados nuevos: la comprobación se repite en cada cambio
+        new_duplicates = {path: original for path, original in duplicates.items()
+                          if path not in self._reported_duplicates}
+        self._reported_duplicates = set(duplicates_left)
+        if new_duplicates:
+            self.duplicates_found.emit(new_duplicates)
+
+        if self._duplicate_recheck:
+            self._duplicate_recheck = False
+            self._check_duplicates()
+
+    def stop_background_tasks(self):
+        """Esperar a la comprobación de duplicados en curso y liberar su hilo"""
+        if self._duplicate_thread is not None:
+            self._duplicate_thread.quit()
+            self._duplicate_thread.wait()
+            self._duplicate_worker.deleteLater()
+            self._duplicate_thread.deleteLater()
+        self._duplicate_thread = None
+        self._duplicate_worker = None
 
     # Métodos públicos
 
@@ -215,6 +315,10 @@ class SelectedFilesWidget(QWidget):
         """Obtener los títulos editados de los archivos seleccionados"""
         return self.selected_model.get_titles()
 
+    def get_selected_page_ranges(self) -> List[Optional[str]]:
+        """Obtener el rango de páginas de cada archivo seleccionado (None = todas)"""
+        return self.selected_model.get_page_ranges()
+
     def clear_selection(self):
         """Limpiar selección de archivos"""
         self._clear_selected_files()
@@ -7,14 +7,30 @@ PDF Utils - Common utilities for PDF processing
 Shared utilities for PDF manipulation, index generation, and link processing.
 """
 
+import functools
+import hashlib
+import io
+import mmap
 import os
 import re
+import select
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from bisect import bisect_right
 from io import BytesIO
+from itertools import accumulate
+from typing import NamedTuple
 
-# Importaciones básicas siempre disponibles
-import PyPDF2
+# Todas las librerías PDF se cargan cuando se necesitan: importar este módulo
+# (por ejemplo desde la línea de comandos) no paga su coste de arranque
+def _get_pypdf2():
+    """Lazy import of PyPDF2."""
+    import PyPDF2
+    return PyPDF2
 
-# Importaciones opcionales que se cargan cuando se necesitan
 def _get_fitz():
     """Lazy import of fitz to avoid startup issues."""
     import fitz
@@ -34,6 +50,26 @@ def _get_reportlab():
 # CONFIGURATION
 # ============================================================================
 
+# Index page geometry (computed once by IndexLayout)
+INDEX_HEADER_OFFSET = 70
+INDEX_TOP_OFFSET = 140
+INDEX_BOTTOM_MARGIN = 50
+INDEX_SIDE_MARGIN = 50
+INDEX_LINE_HEIGHT = 25
+INDEX_TITLE_OFFSET = 70       # From the entry number to its title (single column)
+INDEX_NUMBER_GAP = 10         # Between the widest entry number and the titles (multi-column)
+INDEX_PAGE_LABEL_WIDTH = 60   # Reserved for the right-aligned "p.N" label
+INDEX_COLUMN_GAP = 20
+INDEX_MAX_COLUMNS = 2
+INDEX_FONT = "Helvetica"
+INDEX_FONT_SIZE = 13
+INDEX_ELLIPSIS = "…"
+
+# Bookmarks written by combine_with_index
+INDEX_BOOKMARK = "📋 INDEX"
+CONTENT_BOOKMARK = "📚 CONTENT"
+ENTRY_BOOKMARK_PATTERN = re.compile(r'^📄 (\d+): (.*)$', re.DOTALL)
+
 UUID_PATTERN = r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}_(.+)$'
 
 ACCENT_CORRECTIONS = {
@@ -92,52 +128,168 @@ class PDFUtils:
     def get_page_count(filepath):
         """Get number of pages in PDF."""
         try:
-            with open(filepath, 'rb') as file:
-                return len(PyPDF2.PdfReader(file).pages)
+            with open_input(filepath) as file:
+                return len(_get_pypdf2().PdfReader(file).pages)
         except Exception:
             return 0
 
+    @staticmethod
+    def parse_index_outline(toc):
+        """Recover the index layout of a combined PDF from its outline.
+
+        ``toc`` is a PyMuPDF table of contents ([level, title, page] with
+        1-based pages). Returns (index_pages, [(title, start_page), ...]), or
+        None if the document was not combined with an index.
+        """
+        if not toc or toc[0][1] != INDEX_BOOKMARK:
+            return None
+
+        index_pages = 1
+        entries = []
+        for level, title, page in toc[1:]:
+            if level == 1 and title == CONTENT_BOOKMARK:
+                index_pages = page - 1
+                continue
+            match = ENTRY_BOOKMARK_PATTERN.match(title)
+            if level == 2 and match:
+                entries.append((match.group(2), page))
+        return index_pages, entries
+
 
 # ============================================================================
 # INDEX GENERATION
 # ============================================================================
 
+class IndexLayout:
+    """Geometry of a multi-page, multi-column index.
+
+    The layout depends only on the titles, so it is computed once before the
+    content is assembled. It then drives the drawing, the number of index
+    pages (and therefore every start page) and the link rectangles.
+    """
+
+    def __init__(self, titles, page_size=None, columns=None):
+        canvas, letter, blue, black, colors, stringWidth = _get_reportlab()
+        self._string_width = stringWidth
+        self._char_widths = {}
+        self.width, self.height = page_size or letter
+        self.rows = max(1, int((self.height - INDEX_TOP_OFFSET - INDEX_BOTTOM_MARGIN) // INDEX_LINE_HEIGHT) + 1)
+        # A single column while everything fits on one page
+        if columns is None:
+            columns = 1 if len(titles) <= self.rows else INDEX_MAX_COLUMNS
+        self.columns = columns
+        per_page = self.rows * columns
+        self.page_count = max(1, -(-len(titles) // per_page))
+
+        self.column_width = (self.width - 2 * INDEX_SIDE_MARGIN - (columns - 1) * INDEX_COLUMN_GAP) / columns
+        if columns == 1:
+            self.title_offset = INDEX_TITLE_OFFSET
+        else:
+            self.title_offset = stringWidth(f"{len(titles)}.", INDEX_FONT, INDEX_FONT_SIZE) + INDEX_NUMBER_GAP
+        max_title_width = self.column_width - self.title_offset - INDEX_PAGE_LABEL_WIDTH
+        top = self.height - INDEX_TOP_OFFSET
+
+        # One (page, x, y, text, text_width) tuple per entry; columns fill top to bottom
+        self.entries = []
+        for i, title in enumerate(titles):
+            page, slot = divmod(i, per_page)
+            column, row = divmod(slot, self.rows)
+            x = INDEX_SIDE_MARGIN + column * (self.column_width + INDEX_COLUMN_GAP)
+            text, text_width = self._fit_text(title, max_title_width)
+            self.entries.append((page, x, top - row * INDEX_LINE_HEIGHT, text, text_width))
+
+    def _fit_text(self, text, max_width):
+        """Truncate text with an ellipsis so it fits in max_width. Returns (text, width)."""
+        widths = [self._char_width(char) for char in text]
+        width = sum(widths)
+        if width <= max_width:
+            return text, width
+
+        # Standard fonts have no kerning, so the width is the sum of the glyph widths
+        offsets = list(accumulate(widths))
+        cut = bisect_right(offsets, max_width - self._char_width(INDEX_ELLIPSIS))
+        fitted = text[:cut].rstrip()
+        return fitted + INDEX_ELLIPSIS, sum(widths[:len(fitted)]) + self._char_width(INDEX_ELLIPSIS)
+
+    def text_width(self, text):
+        """Width of text in the index font."""
+        return sum(self._char_width(char) for char in text)
+
+    def _char_width(self, char):
+        width = self._char_widths.get(char)
+        if width is None:
+            width = self._char_widths[char] = self._string_width(char, INDEX_FONT, INDEX_FONT_SIZE)
+        return width
+
+    def start_pages(self, page_counts):
+        """1-based start page of each document placed after the index."""
+        start_pages = []
+        current_page = self.page_count + 1
+        for count in page_counts:
+            start_pages.append(current_page)
+            current_page += count
+        return start_pages
+
+    def link_rects(self):
+        """Clickable area of each entry title as (index page, rect) in PDF user space (origin bottom-left)."""
+        return [(page, (x + self.title_offset, y - 2, x + self.title_offset + text_width, y + 15))
+                for page, x, y, text, text_width in self.entries]
+
+
 class IndexGenerator:
     """Generate clickable PDF index."""
 
     @staticmethod
-    def create_index(start_pages, titles):
-        """Create index page with clickable links."""
+    def create_index(start_pages, titles, layout=None):
+        """Create the index pages (links are added separately from the same layout)."""
         canvas, letter, blue, black, colors, stringWidth = _get_reportlab()
+        layout = layout or IndexLayout(titles)
 
         buffer = BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
+        c = canvas.Canvas(buffer, pagesize=(layout.width, layout.height))
+        entries = list(zip(layout.entries, start_pages))
+        per_page = layout.rows * layout.columns
 
-        # Header
-        c.setFont("Helvetica-Bold", 20)
-        title = "📋 Índice"
-        c.drawString((width - c.stringWidth(title, "Helvetica-Bold", 20)) / 2,
-                    height - 70, title)
+        for page in range(layout.page_count):
+            # Header
+            c.setFont("Helvetica-Bold", 20)
+            title = "📋 Índice"
+            c.drawString((layout.width - c.stringWidth(title, "Helvetica-Bold", 20)) / 2,
+                        layout.height - INDEX_HEADER_OFFSET, title)
 
-        # Index entries
-        c.setFont("Helvetica", 13)
-        y_pos = height - 140
+            # Index entries, one text object per color
+            first = page * per_page
+            page_entries = entries[first:first + per_page]
 
-        for i, (title, start_page) in enumerate(zip(titles, start_pages)):
             # Section number
-            c.setFillColor(colors.darkblue)
-            c.drawString(50, y_pos, f"{i+1:2d}.")
+            text = c.beginText()
+            text.setFont(INDEX_FONT, INDEX_FONT_SIZE)
+            text.setFillColor(colors.darkblue)
+            for i, ((_, x, y, _, _), _) in enumerate(page_entries, first):
+                text.setTextOrigin(x, y)
+                text.textOut(f"{i+1:2d}.")
+            c.drawText(text)
 
             # Title (clickable)
-            c.setFillColor(blue)
-            c.drawString(120, y_pos, title)
+            text = c.beginText()
+            text.setFont(INDEX_FONT, INDEX_FONT_SIZE)
+            text.setFillColor(blue)
+            for (_, x, y, title, _), _ in page_entries:
+                text.setTextOrigin(x + layout.title_offset, y)
+                text.textOut(title)
+            c.drawText(text)
 
-            # Page number
-            c.setFillColor(black)
-            c.drawString(width - 80, y_pos, f"p.{start_page}")
+            # Page number, right-aligned on the column edge
+            text = c.beginText()
+            text.setFont(INDEX_FONT, INDEX_FONT_SIZE)
+            text.setFillColor(black)
+            for (_, x, y, _, _), start_page in page_entries:
+                label = f"p.{start_page}"
+                text.setTextOrigin(x + layout.column_width - layout.text_width(label), y)
+                text.textOut(label)
+            c.drawText(text)
 
-            y_pos -= 25
+            c.showPage()
 
         c.save()
         buffer.seek(0)
@@ -148,29 +300,17 @@ class LinkProcessor:
     """Add clickable links to PDF index."""
 
     @staticmethod
-    def add_links(pdf_file, start_pages, titles):
-        """Add clickable links to index page."""
+    def add_links(pdf_file, start_pages, titles, layout=None):
+        """Add clickable links to the index pages."""
         fitz = _get_fitz()
-        canvas, letter, blue, black, colors, stringWidth = _get_reportlab()
+        layout = layout or IndexLayout(titles)
 
         doc = fitz.open(pdf_file)
-        page = doc[0]
-        page_height = page.rect.height
-
-        # Index positioning constants
-        y_start = page_height - 140
-        y_step = 25
-        x_start = 120
-
-        for i, (title, start_page) in enumerate(zip(titles, start_pages)):
-            text_width = stringWidth(title, 'Helvetica', 13)
-            y_pos = y_start - (i * y_step)
-
-            # Convert canvas coordinates to PDF coordinates
-            y_bottom = page_height - y_pos - 15
-            y_top = page_height - y_pos + 2
-
-            rect = fitz.Rect(x_start, y_bottom, x_start + text_width, y_top)
+        for (page_index, (x0, y0, x1, y1)), start_page in zip(layout.link_rects(), start_pages):
+            page = doc[page_index]
+            page_height = page.rect.height
+            # Convert PDF coordinates to fitz (top-left origin) coordinates
+            rect = fitz.Rect(x0, page_height - y1, x1, page_height - y0)
             page.insert_link({
                 "kind": fitz.LINK_GOTO,
                 "from": rect,
@@ -178,88 +318,1788 @@ class LinkProcessor:
             })
 
         # Save with links
-        output_file = pdf_file.replace('.pdf', '_LINKED.pdf')
+        output_file = LinkProcessor.linked_path(pdf_file)
         doc.save(output_file)
         doc.close()
         return output_file
 
+    @staticmethod
+    def linked_path(pdf_file):
+        """Path ``add_links`` saves the linked copy of ``pdf_file`` to."""
+        return os.path.splitext(pdf_file)[0] + '_LINKED.pdf'
+
+
+# ============================================================================
+# INPUT FILES
+# ============================================================================
+
+# Map input PDFs into memory instead of reading them through buffered file I/O
+MMAP_INPUTS = True
+
+# Stream data PyPDF2 parses itself (object and xref streams) must stay bytes
+_PARSED_STREAM_TYPES = (b'/ObjStm', b'/XRef')
+_OBJECT_HEADER_PATTERN = re.compile(rb'\d+\s+\d+\s+obj\b')
+
+
+class BufferInput:
+    """Input PDF held in memory (bytes, bytearray, memoryview) with the file API PdfReader uses.
+
+    Parsing seeks constantly: here a seek only moves an offset. With
+    ``zero_copy`` set, stream data of at least ``ZERO_COPY_MIN`` bytes is
+    returned as memoryview slices of the buffer, so large image and content
+    streams reach the output without being copied into Python objects. Only
+    StreamingPDFWriter copies stream data without looking at it; the rest
+    of PyPDF2 (text extraction, content parsing, PdfWriter) expects bytes,
+    so ``zero_copy`` is off unless ``open_reader`` is asked for it. The
+    buffer must not change while the input is open.
+    """
+
+    ZERO_COPY_MIN = 64 * 1024
+
+    # How far back to look for the dictionary of a stream being read
+    HEADER_LOOKBEHIND = 4096
+
+    def __init__(self, data, name=None):
+        self._view = memoryview(data).cast('B')
+        self._size = len(self._view)
+        self._pos = 0
+        self.name = name
+        self.zero_copy = False
+        self.zero_copy_bytes = 0
+
+    def read(self, size=-1):
+        start = self._pos
+        end = self._size if size is None or size < 0 else min(self._size, start + size)
+        self._pos = end
+        if (self.zero_copy and size is not None and end - start >= self.ZERO_COPY_MIN
+                and self._is_stream_data(start, end)):
+            self.zero_copy_bytes += end - start
+            return self._view[start:end]
+        return self._view[start:end].tobytes()
+
+    def _is_stream_data(self, start, end):
+        """Whether [start, end) is the data of a stream PyPDF2 only passes through."""
+        # PyPDF2 reads exactly /Length bytes and then expects the endstream keyword
+        if not self._view[end:end + 32].tobytes().lstrip(b' \t\r\n\x00\x0c').startswith(b'endstream'):
+            return False
+        window = self._view[max(0, start - self.HEADER_LOOKBEHIND):start].tobytes()
+        headers = list(_OBJECT_HEADER_PATTERN.finditer(window))
+        if not headers:
+            return False
+        dictionary = window[headers[-1].end():]
+        return not any(stream_type in dictionary for stream_type in _PARSED_STREAM_TYPES)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise OSError("negative seek position")
+        self._pos = offset
+        return offset
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._view.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MappedInput(BufferInput):
+    """Read-only memory map of an input PDF file.
+
+    No read system calls are made once the file is mapped; see BufferInput
+    for the zero-copy stream data.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        super().__init__(self._map, name=path)
+
+    def close(self):
+        super().close()
+        try:
+            self._map.close()
+        except BufferError:
+            # Zero-copy slices are still referenced; the mapping goes away with them
+            pass
+
+
+def is_input_path(source):
+    """Whether an input is a file path rather than in-memory data or a file object."""
+    return isinstance(source, (str, os.PathLike))
+
+
+def is_input_buffer(source):
+    """Whether an input is in-memory PDF data (bytes, bytearray, memoryview)."""
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def is_lazy_input(source):
+    """Whether an input is opened only when the merge reaches it: an object whose
+    ``open()`` returns in-memory PDF data or a seekable binary file (such as
+    core.archives.ArchiveMember)."""
+    return (not is_input_path(source) and not hasattr(source, 'read')
+            and callable(getattr(source, 'open', None)))
+
+
+class _CallerFile:
+    """A caller's file object used as an input: rewound on entry and left open."""
+
+    def __init__(self, file):
+        if not (hasattr(file, 'read') and hasattr(file, 'seek')):
+            raise TypeError(f"Input must be a path, bytes or a seekable binary file, "
+                            f"not {type(file).__name__}")
+        self.file = file
+
+    def __enter__(self):
+        self.file.seek(0)
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+def open_input(source):
+    """Open an input PDF for PdfReader.
+
+    Paths are memory-mapped when possible and in-memory data is read in
+    place; both are closed by the caller. Lazy inputs are opened now and
+    closed by the caller too, so each is released once it has been added.
+    File objects are returned as they are (they must be seekable and belong
+    to the caller).
+    """
+    if is_input_buffer(source):
+        return BufferInput(source)
+    if is_lazy_input(source):
+        opened = source.open()
+        return BufferInput(opened, name=getattr(source, 'name', None)) if is_input_buffer(opened) else opened
+    if not is_input_path(source):
+        return _CallerFile(source)
+    if MMAP_INPUTS:
+        try:
+            return MappedInput(source)
+        except (OSError, ValueError):
+            # Empty and special files cannot be mapped
+            pass
+    return open(source, 'rb')
+
+
+def open_reader(PyPDF2, file, zero_copy=False):
+    """PdfReader over an input opened with ``open_input``.
+
+    ``zero_copy`` lets large stream data of in-memory and mapped inputs
+    stay memoryviews (see BufferInput). Only pass it when the reader's
+    streams are copied by StreamingPDFWriter and nothing else.
+    """
+    reader = PyPDF2.PdfReader(file)
+    if isinstance(file, BufferInput):
+        # Decryption replaces stream data in place: keep it as bytes
+        file.zero_copy = zero_copy and not reader.is_encrypted
+    return reader
+
+
+# ============================================================================
+# PAGE SELECTION
+# ============================================================================
+
+_PAGE_RANGE_ITEM = re.compile(r'^(-?\d+)(?:(-)(-?\d+)?)?$')
+
+
+class PageRanges:
+    """Page selection such as ``"1-3,10,-1"``.
+
+    Items are 1-based pages or inclusive ranges separated by commas.
+    Negative numbers count from the end (``-1`` is the last page), a range
+    without an end (``5-``) runs to the last page and a range written
+    backwards (``10-5``) is taken in reverse order.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec.strip()
+        self.items = []
+        for item in self.spec.split(','):
+            match = _PAGE_RANGE_ITEM.match(item.replace(' ', ''))
+            if not match:
+                raise ValueError(f"Invalid page range: {spec!r}")
+            first = int(match.group(1))
+            if not match.group(2):
+                last = first
+            else:
+                last = int(match.group(3)) if match.group(3) else -1
+            if first == 0 or last == 0:
+                raise ValueError(f"Invalid page range: {spec!r} (pages start at 1)")
+            self.items.append((first, last))
+
+    @classmethod
+    def parse(cls, spec):
+        """PageRanges for ``spec``; None (all pages) for None or a blank spec."""
+        if spec is None or isinstance(spec, cls):
+            return spec
+        return cls(spec) if spec.strip() else None
+
+    def resolve(self, page_count):
+        """0-based indices of the selected pages of a ``page_count``-page document."""
+        indices = []
+        for first, last in self.items:
+            start, end = self._index(first, page_count), self._index(last, page_count)
+            step = 1 if end >= start else -1
+            indices.extend(range(start, end + step, step))
+        return indices
+
+    def _index(self, number, page_count):
+        index = number - 1 if number > 0 else page_count + number
+        if not 0 <= index < page_count:
+            raise ValueError(f"Page {number} of {self.spec!r} is out of range "
+                             f"(the document has {page_count} pages)")
+        return index
+
+    def __str__(self):
+        return self.spec
+
+
+class PageTree:
+    """Page access for a PdfReader that resolves only the page-tree nodes it needs.
+
+    ``reader.pages`` flattens the whole tree on first use, parsing every
+    page dictionary. Here each page is found by descending from the root
+    and skipping subtrees by their /Count, so taking a few pages of a large
+    document only touches the nodes on their paths.
+    """
+
+    INHERITABLE_KEYS = ('/Resources', '/MediaBox', '/CropBox', '/Rotate')
+
+    def __init__(self, reader):
+        self.PyPDF2 = _get_pypdf2()
+        self.reader = reader
+        self.root = reader.trailer['/Root'].get_object()['/Pages'].get_object()
+        # id(node) -> (node, every kid is a page), checked once per node
+        self._flat_nodes = {}
+
+    def __len__(self):
+        count = self.root.get('/Count')
+        return int(count) if count is not None else len(self.reader.pages)
+
+    def page(self, index):
+        """Page ``index`` (0-based) as a PageObject, with inherited attributes applied."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Page index {index} out of range")
+        node = self.root
+        inherited = {}
+        while True:
+            for key in self.INHERITABLE_KEYS:
+                if key in node:
+                    inherited[key] = node[key]
+            kids = node['/Kids'].get_object()
+
+            # Flat node (as written by most simple producers): every kid is a
+            # page, so go straight to it. A matching /Count alone is not
+            # enough: empty /Pages kids can sit next to a larger subtree
+            if self._is_flat(node, kids):
+                ref = kids[index]
+                return self._page_object(ref, ref.get_object(), inherited)
+
+            for ref in kids:
+                kid = ref.get_object()
+                if self._is_page(kid):
+                    if index == 0:
+                        return self._page_object(ref, kid, inherited)
+                    index -= 1
+                    continue
+                count = int(kid.get('/Count', 0))
+                if index < count:
+                    node = kid
+                    break
+                index -= count
+            else:
+                raise ValueError("Page tree /Count does not match its pages")
+
+    def _is_flat(self, node, kids):
+        if node.get('/Count') != len(kids):
+            return False
+        cached = self._flat_nodes.get(id(node))
+        if cached is None:
+            cached = self._flat_nodes[id(node)] = (
+                node, all(self._is_page(ref.get_object()) for ref in kids))
+        return cached[1]
+
+    @staticmethod
+    def _is_page(node):
+        return node.get('/Type') == '/Page' or '/Kids' not in node
+
+    def _page_object(self, ref, node, inherited):
+        generic = self.PyPDF2.generic
+        reference = ref if isinstance(ref, generic.IndirectObject) else None
+        page = self.PyPDF2.PageObject(self.reader, reference)
+        page.update(node)
+        for key, value in inherited.items():
+            if key not in page:
+                page[generic.NameObject(key)] = value
+        return page
+
+
+def select_pages(reader, pages=None):
+    """Pages of ``reader`` chosen by a PageRanges (every page when None)."""
+    if pages is None:
+        return list(reader.pages)
+    tree = PageTree(reader)
+    return [tree.page(index) for index in pages.resolve(len(tree))]
+
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+# Writes are gathered into chunks of this size before they reach the output
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Seconds to wait for a full non-blocking output to accept data again
+OUTPUT_WRITE_TIMEOUT = 60.0
+
+
+def is_output_path(output):
+    """Whether ``output`` is a file path rather than a binary writable."""
+    return isinstance(output, (str, os.PathLike))
+
+
+class OutputSink:
+    """Buffered, position-counting writer over a path or any binary writable.
+
+    PDF writers record object offsets with ``tell()``, which pipes, sockets
+    and stdout do not support; the sink counts the bytes itself, so the
+    output can be anything with a ``write`` method (or a socket, through
+    ``sendall``). Small writes are gathered into ``buffer_size`` chunks and
+    larger ones are passed through without a copy. A path is opened and
+    closed by the sink; a caller's writable is only flushed.
+
+    ``on_flush`` is called with the bytes sent so far each time a chunk
+    reaches the output; an exception it raises stops the write.
+    """
+
+    def __init__(self, output, buffer_size=OUTPUT_BUFFER_SIZE, on_flush=None):
+        self._owned = is_output_path(output)
+        self.raw = open(output, 'wb', buffering=0) if self._owned else output
+        self._raw_write = getattr(self.raw, 'write', None) or getattr(self.raw, 'sendall', None)
+        if self._raw_write is None:
+            raise TypeError(f"Output must be a path or a binary writable, not {type(output).__name__}")
+        # An unbuffered writer returns None when a non-blocking write would block
+        self._none_means_blocked = isinstance(self.raw, io.RawIOBase)
+        self.buffer_size = buffer_size
+        self.on_flush = on_flush
+        self._buffer = bytearray()
+        self.position = 0
+        self.sent = 0
+        self.closed = False
+
+    def write(self, data):
+        view = memoryview(data).cast('B')
+        size = len(view)
+        if len(self._buffer) + size >= self.buffer_size:
+            self._drain()
+        if size >= self.buffer_size:
+            self._send(view)
+        else:
+            self._buffer += view
+        self.position += size
+        return size
+
+    def _drain(self):
+        if self._buffer:
+            self._send(self._buffer)
+            self._buffer = bytearray()
+
+    def _send(self, data):
+        view = memoryview(data)
+        while view:
+            written = self._raw_write(view)
+            # sendall() and buffered writers return None or the whole size
+            if written is None and not self._none_means_blocked:
+                break
+            if not written:
+                # A full non-blocking pipe or socket: wait until it drains
+                self._wait_writable()
+                continue
+            view = view[written:]
+        self.sent += len(data)
+        if self.on_flush is not None:
+            self.on_flush(self.sent)
+
+    def _wait_writable(self):
+        try:
+            fd = self.raw.fileno()
+        except (AttributeError, OSError, ValueError):
+            raise OSError("Output accepted no data and cannot be waited on")
+        _, ready, _ = select.select([], [fd], [], OUTPUT_WRITE_TIMEOUT)
+        if not ready:
+            raise OSError(f"Output accepted no data for {OUTPUT_WRITE_TIMEOUT:.0f} seconds")
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # Only "seeking" to the current position is possible on a stream
+        target = offset + (self.position if whence == os.SEEK_CUR else 0)
+        if whence == os.SEEK_END or target != self.position:
+            raise io.UnsupportedOperation("PDF output is written sequentially")
+        return self.position
+
+    def seekable(self):
+        return False
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        self._drain()
+        if hasattr(self.raw, 'flush'):
+            self.raw.flush()
+
+    def close(self):
+        """Write out the buffer and release the output."""
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._release()
+
+    def abort(self):
+        """Release the output without writing the buffer (the merge failed)."""
+        if not self.closed:
+            self._buffer = bytearray()
+            self._release()
+
+    def _release(self):
+        self.closed = True
+        if self._owned:
+            self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ============================================================================
+# STREAMING PDF WRITER
+# ============================================================================
+
+class StreamingPDFWriter:
+    """Minimal PDF writer that serializes objects as soon as they are imported.
+
+    Each input's objects are renumbered and written to the output while the
+    input is being read, then released, so memory depends on the largest
+    single input instead of the whole merge. Only the page list, outline and
+    xref offsets are kept until ``close``.
+
+    With ``dedup`` shared resources (streams such as fonts, images, ICC
+    profiles and form XObjects, and font/graphics-state dictionaries) are
+    fingerprinted across all inputs and each unique resource is written once.
+
+    With ``compact`` non-stream objects are packed into object streams, the
+    cross-reference table is written as a compressed xref stream (PDF 1.5)
+    and unfiltered streams are Flate-compressed at ``compression_level``.
+    Only objects reachable from the imported pages are ever written.
+
+    ``cancel_check`` is called before each object is copied; an exception it
+    raises (MergeCancelled) stops the import.
+    """
+
+    # Objects packed per object stream in compact mode
+    OBJECT_STREAM_SIZE = 200
+
+    # Dictionary types that are deduplicated besides streams
+    DEDUP_DICT_TYPES = ('/Font', '/FontDescriptor', '/ExtGState', '/Pattern', '/Shading')
+
+    # Page keys that must not be copied (the page tree is rebuilt)
+    SKIPPED_PAGE_KEYS = ('/Parent', '/B')
+
+    def __init__(self, stream, dedup=False, compact=False, compression_level=6, cancel_check=None):
+        from PyPDF2 import generic
+        self.generic = generic
+        self.stream = stream
+        self.cancel_check = cancel_check
+        self.dedup = dedup
+        self.compact = compact
+        self.compression_level = compression_level
+        self.compressed = {}
+        self.pending_objects = []
+        self.dedup_index = {}
+        self.dedup_stats = {'seen': 0, 'written': 0, 'bytes_saved': 0}
+        self.bytes_written = 0
+        self.offsets = {}
+        self.next_id = 1
+        self.pages_id = self.alloc()
+        self.page_ids = []
+        self.held_pages = {}
+        self.outline = []
+        self._write(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+
+    def alloc(self):
+        """Reserve a new object number."""
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def ref(self, obj_id):
+        """Indirect reference to an object of the output document."""
+        return self.generic.IndirectObject(obj_id, 0, None)
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.bytes_written += len(data)
+
+    def write_object(self, obj_id, obj):
+        """Serialize an indirect object immediately."""
+        generic = self.generic
+        if self.compact:
+            if not isinstance(obj, generic.StreamObject):
+                self._add_to_object_stream(obj_id, obj)
+                return
+            if '/Filter' not in obj:
+                obj._data = zlib.compress(obj._data, self.compression_level)
+                obj[generic.NameObject('/Filter')] = generic.NameObject('/FlateDecode')
+
+        buffer = BytesIO()
+        buffer.write(f'{obj_id} 0 obj\n'.encode('ascii'))
+        self.offsets[obj_id] = self.bytes_written
+        if isinstance(obj, generic.StreamObject):
+            # Same bytes as StreamObject.write_to_stream, but the (possibly
+            # memory-mapped) data goes to the output without an extra copy
+            data = obj._data
+            obj[generic.NameObject('/Length')] = generic.NumberObject(len(data))
+            generic.DictionaryObject.write_to_stream(obj, buffer, None)
+            del obj['/Length']
+            buffer.write(b'\nstream\n')
+            self._write(buffer.getvalue())
+            self._write(data)
+            self._write(b'\nendstream\nendobj\n')
+            return
+        obj.write_to_stream(buffer, None)
+        buffer.write(b'\nendobj\n')
+        self._write(buffer.getvalue())
+
+    def _add_to_object_stream(self, obj_id, obj):
+        buffer = BytesIO()
+        obj.write_to_stream(buffer, None)
+        self.pending_objects.append((obj_id, buffer.getvalue()))
+        if len(self.pending_objects) >= self.OBJECT_STREAM_SIZE:
+            self._flush_object_stream()
+
+    def _flush_object_stream(self):
+        """Write the pending objects as one compressed object stream."""
+        if not self.pending_objects:
+            return
+        generic = self.generic
+        stream_id = self.alloc()
+        header = []
+        body = BytesIO()
+        for index, (obj_id, data) in enumerate(self.pending_objects):
+            header.append(f'{obj_id} {body.tell()}')
+            body.write(data)
+            body.write(b'\n')
+            self.compressed[obj_id] = (stream_id, index)
+        header = (' '.join(header) + '\n').encode('ascii')
+
+        obj_stream = generic.EncodedStreamObject()
+        obj_stream._data = zlib.compress(header + body.getvalue(), self.compression_level)
+        obj_stream.update({
+            generic.NameObject('/Type'): generic.NameObject('/ObjStm'),
+            generic.NameObject('/N'): generic.NumberObject(len(self.pending_objects)),
+            generic.NameObject('/First'): generic.NumberObject(len(header)),
+            generic.NameObject('/Filter'): generic.NameObject('/FlateDecode'),
+        })
+        self.pending_objects = []
+        self.write_object(stream_id, obj_stream)
+
+    def import_reader(self, reader, at=None, hold=False, pages=None, page_added=None):
+        """Copy the pages of a PdfReader into the output. Returns pages added.
+
+        ``pages`` (a PageRanges) selects the pages to copy; by default all
+        are. Pages are inserted before output page index ``at`` when given.
+        With ``hold`` the page dictionaries stay in memory until ``close`` so
+        that annotations can still be added to them. ``page_added`` is called
+        with the number of pages copied so far after each page.
+        """
+        generic = self.generic
+        if reader.is_encrypted:
+            reader.decrypt('')
+
+        pages = select_pages(reader, pages)
+        mapping = {}
+        new_ids = []
+        for page in pages:
+            new_id = self.alloc()
+            new_ids.append(new_id)
+            src = page.indirect_reference
+            if src is not None:
+                # A page selected twice: references to it point to the first copy
+                mapping.setdefault((src.idnum, src.generation), new_id)
+
+        self._fingerprints = {}
+        queue = []
+        for copied, (page, new_id) in enumerate(zip(pages, new_ids), 1):
+            copy = generic.DictionaryObject()
+            for key, value in page.items():
+                if key not in self.SKIPPED_PAGE_KEYS:
+                    copy[generic.NameObject(key)] = self._copy(value, mapping, queue, reader)
+            copy[generic.NameObject('/Parent')] = self.ref(self.pages_id)
+            if hold:
+                self.held_pages[new_id] = copy
+            else:
+                self.write_object(new_id, copy)
+            self._drain(queue, mapping, reader)
+            if page_added is not None:
+                page_added(copied)
+
+        position = len(self.page_ids) if at is None else at
+        self.page_ids[position:position] = new_ids
+        self._fingerprints = {}
+        return len(pages)
+
+    def _drain(self, queue, mapping, reader):
+        """Write every object referenced so far and not yet written."""
+        while queue:
+            if self.cancel_check is not None:
+                self.cancel_check()
+            src, new_id = queue.pop()
+            obj = src.get_object()
+            self.write_object(new_id, self._copy(obj, mapping, queue, reader))
+
+    def _copy(self, obj, mapping, queue, reader):
+        """Copy an object, renumbering indirect references into the output."""
+        generic = self.generic
+        if isinstance(obj, generic.IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key not in mapping:
+                target = obj.get_object()
+                if isinstance(target, generic.DictionaryObject) and target.get('/Type') in ('/Page', '/Pages'):
+                    # References to pages that are not being imported
+                    mapping[key] = None
+                else:
+                    fingerprint = self._fingerprint(obj) if self._is_dedupable(target) else None
+                    if fingerprint in self.dedup_index:
+                        mapping[key] = self.dedup_index[fingerprint]
+                        self.dedup_stats['seen'] += 1
+                        if isinstance(target, generic.StreamObject):
+                            self.dedup_stats['bytes_saved'] += len(target._data)
+                    else:
+                        mapping[key] = self.alloc()
+                        queue.append((obj, mapping[key]))
+                        if fingerprint:
+                            self.dedup_index[fingerprint] = mapping[key]
+                            self.dedup_stats['seen'] += 1
+                            self.dedup_stats['written'] += 1
+            new_id = mapping[key]
+            return self.ref(new_id) if new_id else generic.NullObject()
+        if isinstance(obj, generic.StreamObject):
+            if isinstance(obj, generic.EncodedStreamObject):
+                copy = generic.EncodedStreamObject()
+            else:
+                copy = generic.DecodedStreamObject()
+            copy._data = obj._data
+            for key, value in obj.items():
+                if key != '/Length':
+                    copy[generic.NameObject(key)] = self._copy(value, mapping, queue, reader)
+            return copy
+        if isinstance(obj, generic.DictionaryObject):
+            copy = generic.DictionaryObject()
+            for key, value in obj.items():
+                copy[generic.NameObject(key)] = self._copy(value, mapping, queue, reader)
+            return copy
+        if isinstance(obj, generic.ArrayObject):
+            return generic.ArrayObject(self._copy(value, mapping, queue, reader) for value in obj)
+        return obj
+
+    def _is_dedupable(self, obj):
+        generic = self.generic
+        if not self.dedup:
+            return False
+        if isinstance(obj, generic.StreamObject):
+            return True
+        return isinstance(obj, generic.DictionaryObject) and obj.get('/Type') in self.DEDUP_DICT_TYPES
+
+    def _fingerprint(self, obj, stack=()):
+        """Content hash of an object and everything it references.
+
+        Returns None for objects that cannot be shared (those referring to
+        pages, or reference cycles).
+        """
+        generic = self.generic
+        if isinstance(obj, generic.IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key in self._fingerprints:
+                return self._fingerprints[key]
+            if key in stack:
+                return None
+            target = obj.get_object()
+            if isinstance(target, generic.DictionaryObject) and target.get('/Type') in ('/Page', '/Pages'):
+                fingerprint = None
+            else:
+                fingerprint = self._fingerprint(target, stack + (key,))
+            self._fingerprints[key] = fingerprint
+            return fingerprint
+
+        digest = hashlib.sha256()
+        if isinstance(obj, generic.DictionaryObject):
+            digest.update(b'S' if isinstance(obj, generic.StreamObject) else b'D')
+            for key, item in sorted(obj.items()):
+                if key == '/Length' and isinstance(obj, generic.StreamObject):
+                    continue
+                value = self._fingerprint(item, stack)
+                if value is None:
+                    return None
+                digest.update(key.encode('utf-8') + b'\0' + value.encode('ascii'))
+            if isinstance(obj, generic.StreamObject):
+                digest.update(obj._data)
+        elif isinstance(obj, generic.ArrayObject):
+            digest.update(b'A')
+            for item in obj:
+                value = self._fingerprint(item, stack)
+                if value is None:
+                    return None
+                digest.update(value.encode('ascii'))
+        else:
+            buffer = BytesIO()
+            obj.write_to_stream(buffer, None)
+            digest.update(b'V' + buffer.getvalue())
+        return digest.hexdigest()
+
+    def add_link(self, page_index, rect, target_page_index):
+        """Add a link annotation to a held page."""
+        generic = self.generic
+        page_id = self.page_ids[page_index]
+        if page_id not in self.held_pages:
+            raise ValueError(f"Page {page_index} has already been written")
+        page = self.held_pages[page_id]
+        annots = page.setdefault(generic.NameObject('/Annots'), generic.ArrayObject())
+        annots.append(generic.DictionaryObject({
+            generic.NameObject('/Type'): generic.NameObject('/Annot'),
+            generic.NameObject('/Subtype'): generic.NameObject('/Link'),
+            generic.NameObject('/Rect'): generic.ArrayObject([generic.FloatObject(v) for v in rect]),
+            generic.NameObject('/Border'): generic.ArrayObject([generic.NumberObject(0)] * 3),
+            generic.NameObject('/Dest'): generic.ArrayObject([
+                self.ref(self.page_ids[target_page_index]), generic.NameObject('/Fit')]),
+        }))
+
+    def add_outline_item(self, title, page_index, parent=None):
+        """Register a bookmark. Returns its handle."""
+        self.outline.append({'title': title, 'page': page_index, 'parent': parent, 'children': []})
+        handle = len(self.outline) - 1
+        if parent is not None:
+            self.outline[parent]['children'].append(handle)
+        return handle
+
+    def _write_outline(self):
+        """Write the outline tree. Returns the /Outlines object id or None."""
+        if not self.outline:
+            return None
+        generic = self.generic
+        root_id = self.alloc()
+        ids = [self.alloc() for _ in self.outline]
+        roots = [h for h, item in enumerate(self.outline) if item['parent'] is None]
+
+        def siblings(handles, parent_id):
+            for pos, handle in enumerate(handles):
+                item = self.outline[handle]
+                node = generic.DictionaryObject({
+                    generic.NameObject('/Title'): generic.create_string_object(item['title']),
+                    generic.NameObject('/Parent'): self.ref(parent_id),
+                    generic.NameObject('/Dest'): generic.ArrayObject([
+                        self.ref(self.page_ids[item['page']]), generic.NameObject('/Fit')]),
+                })
+                if pos > 0:
+                    node[generic.NameObject('/Prev')] = self.ref(ids[handles[pos - 1]])
+                if pos < len(handles) - 1:
+                    node[generic.NameObject('/Next')] = self.ref(ids[handles[pos + 1]])
+                children = item['children']
+                if children:
+                    node[generic.NameObject('/First')] = self.ref(ids[children[0]])
+                    node[generic.NameObject('/Last')] = self.ref(ids[children[-1]])
+                    node[generic.NameObject('/Count')] = generic.NumberObject(len(children))
+                    siblings(children, ids[handle])
+                self.write_object(ids[handle], node)
+
+        siblings(roots, root_id)
+        self.write_object(root_id, generic.DictionaryObject({
+            generic.NameObject('/Type'): generic.NameObject('/Outlines'),
+            generic.NameObject('/First'): self.ref(ids[roots[0]]),
+            generic.NameObject('/Last'): self.ref(ids[roots[-1]]),
+            generic.NameObject('/Count'): generic.NumberObject(len(self.outline)),
+        }))
+        return root_id
+
+    def close(self):
+        """Write held pages, page tree, outline, catalog, xref and trailer."""
+        generic = self.generic
+        for page_id, page in self.held_pages.items():
+            if '/Annots' in page:
+                annots = generic.ArrayObject()
+                for annot in page['/Annots']:
+                    if isinstance(annot, generic.DictionaryObject):
+                        annot_id = self.alloc()
+                        annot[generic.NameObject('/P')] = self.ref(page_id)
+                        self.write_object(annot_id, annot)
+                        annot = self.ref(annot_id)
+                    annots.append(annot)
+                page[generic.NameObject('/Annots')] = annots
+            self.write_object(page_id, page)
+        self.held_pages = {}
+
+        self.write_object(self.pages_id, generic.DictionaryObject({
+            generic.NameObject('/Type'): generic.NameObject('/Pages'),
+            generic.NameObject('/Kids'): generic.ArrayObject(self.ref(i) for i in self.page_ids),
+            generic.NameObject('/Count'): generic.NumberObject(len(self.page_ids)),
+        }))
+
+        catalog = generic.DictionaryObject({
+            generic.NameObject('/Type'): generic.NameObject('/Catalog'),
+            generic.NameObject('/Pages'): self.ref(self.pages_id),
+        })
+        outline_id = self._write_outline()
+        if outline_id:
+            catalog[generic.NameObject('/Outlines')] = self.ref(outline_id)
+            catalog[generic.NameObject('/PageMode')] = generic.NameObject('/UseOutlines')
+        catalog_id = self.alloc()
+        self.write_object(catalog_id, catalog)
+
+        if self.compact:
+            self._flush_object_stream()
+            self._write_xref_stream(catalog_id)
+        else:
+            self._write_xref(catalog_id)
+
+    def _write_xref_stream(self, catalog_id):
+        """Write a compressed cross-reference stream (PDF 1.5) with the trailer."""
+        generic = self.generic
+        xref_id = self.alloc()
+        xref_offset = self.bytes_written
+        size = self.next_id
+        self.offsets[xref_id] = xref_offset
+
+        largest = max([xref_offset, size] + list(self.offsets.values()))
+        width = max(1, (largest.bit_length() + 7) // 8)
+        rows = [b'\x00' + bytes(width) + b'\xff\xff']
+        for obj_id in range(1, size):
+            if obj_id in self.offsets:
+                rows.append(b'\x01' + self.offsets[obj_id].to_bytes(width, 'big') + b'\x00\x00')
+            elif obj_id in self.compressed:
+                stream_id, index = self.compressed[obj_id]
+                rows.append(b'\x02' + stream_id.to_bytes(width, 'big') + index.to_bytes(2, 'big'))
+            else:
+                rows.append(b'\x00' + bytes(width) + b'\x00\x00')
+
+        xref = generic.EncodedStreamObject()
+        xref._data = zlib.compress(b''.join(rows), self.compression_level)
+        xref.update({
+            generic.NameObject('/Type'): generic.NameObject('/XRef'),
+            generic.NameObject('/Size'): generic.NumberObject(size),
+            generic.NameObject('/W'): generic.ArrayObject(
+                [generic.NumberObject(1), generic.NumberObject(width), generic.NumberObject(2)]),
+            generic.NameObject('/Root'): self.ref(catalog_id),
+            generic.NameObject('/Filter'): generic.NameObject('/FlateDecode'),
+        })
+        buffer = BytesIO()
+        buffer.write(f'{xref_id} 0 obj\n'.encode('ascii'))
+        xref.write_to_stream(buffer, None)
+        buffer.write(f'\nendobj\nstartxref\n{xref_offset}\n%%EOF\n'.encode('ascii'))
+        self._write(buffer.getvalue())
+
+    def _write_xref(self, catalog_id):
+        xref_offset = self.bytes_written
+        size = self.next_id
+        lines = [f'xref\n0 {size}\n', '0000000000 65535 f \n']
+        for obj_id in range(1, size):
+            offset = self.offsets.get(obj_id)
+            if offset is None:
+                lines.append('0000000000 65535 f \n')
+            else:
+                lines.append(f'{offset:010d} 00000 n \n')
+        lines.append(f'trailer\n<< /Size {size} /Root {catalog_id} 0 R >>\n'
+                     f'startxref\n{xref_offset}\n%%EOF\n')
+        self._write(''.join(lines).encode('ascii'))
+
+
+# ============================================================================
+# MERGE BACKENDS
+# ============================================================================
+
+# Output profiles: "classic" (xref table, loose objects) or "compact"
+# (object streams, xref stream, pruned objects, Flate at the given zlib level)
+OUTPUT_PROFILES = ('classic', 'compact')
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+class MergeBackend:
+    """Engine that assembles a merged document.
+
+    A backend instance represents one output document. Page indexes are
+    0-based; link rectangles are given in PDF user space (origin bottom-left).
+
+    AdvancedPDFCombiner sets two hooks. ``cancel_check()`` raises
+    MergeCancelled once the merge is cancelled. ``report_progress(pages)``
+    reports the pages of the current input added so far, or a chunk
+    written to the output when ``pages`` is None. The PyPDF2 and stream
+    backends call them per page, per object copied and per chunk written.
+    PyMuPDF copies a whole document in one call and saves in one call, so
+    its backend is only checked between inputs and before writing.
+    """
+
+    name = None
+    cancel_check = None
+    report_progress = None
+
+    def begin(self, output):
+        """Called before any document is added (streaming backends open the output here).
+
+        ``output`` is a file path or a binary writable (see OutputSink).
+        """
+
+    def add_document(self, source, at=None, pages=None):
+        """Append the pages of a PDF (any input ``open_input`` accepts), or insert
+        them before page index ``at``. ``pages`` (a PageRanges) selects the pages
+        to add; by default all are. Returns pages added."""
+        raise NotImplementedError
+
+    def add_outline_item(self, title, page_index, parent=None):
+        """Add a bookmark. Returns a handle usable as ``parent``."""
+        raise NotImplementedError
+
+    def add_link(self, page_index, rect, target_page_index):
+        """Add a clickable link on a page pointing to another page."""
+        raise NotImplementedError
+
+    def write(self, output):
+        """Write the assembled document to a file path or a binary writable."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Statistics of the last write (bytes written, deduplication)."""
+        return {}
+
+    def _poll(self):
+        if self.cancel_check is not None:
+            self.cancel_check()
+
+    def _page_added(self, pages):
+        """Poll the token and report ``pages`` of the current input added."""
+        self._poll()
+        if self.report_progress is not None:
+            self.report_progress(pages)
+
+    def _chunk_written(self, sent=None):
+        """Poll the token and report a chunk written to the output."""
+        self._poll()
+        if self.report_progress is not None:
+            self.report_progress(None)
+
+    def close(self):
+        """Release resources held by the backend."""
+
+
+class PyPDF2Backend(MergeBackend):
+    """Pure Python backend based on PyPDF2.PdfWriter."""
+
+    name = 'pypdf2'
+
+    def __init__(self, dedup=False, output_profile='classic', compression_level=DEFAULT_COMPRESSION_LEVEL):
+        if dedup:
+            raise ValueError("Resource deduplication is not supported by the pypdf2 backend "
+                             "(use 'stream' or 'pymupdf')")
+        if output_profile != 'classic':
+            raise ValueError(f"Output profile '{output_profile}' is not supported by the pypdf2 backend "
+                             "(use 'stream' or 'pymupdf')")
+        self.PyPDF2 = _get_pypdf2()
+        self.writer = self.PyPDF2.PdfWriter()
+        self.bytes_written = 0
+
+    def add_document(self, source, at=None, pages=None):
+        with open_input(source) as file:
+            return self._add_reader(open_reader(self.PyPDF2, file), at, pages)
+
+    def _add_reader(self, reader, at=None, pages=None):
+        count = 0
+        for page in select_pages(reader, pages):
+            if at is None:
+                self.writer.add_page(page)
+            else:
+                self.writer.insert_page(page, at + count)
+            count += 1
+            self._page_added(count)
+        # PdfWriter keys its clone table by id(reader); once this reader is
+        # freed its id can be reused by the next one, which would then get
+        # this document's pages
+        self.writer.reset_translation(reader)
+        return count
+
+    def add_outline_item(self, title, page_index, parent=None):
+        return self.writer.add_outline_item(title, page_index, parent)
+
+    def add_link(self, page_index, rect, target_page_index):
+        from PyPDF2.generic import (ArrayObject, DictionaryObject, FloatObject,
+                                    NameObject, NumberObject)
+
+        page = self.writer.pages[page_index]
+        annots = page.get('/Annots')
+        if annots is None:
+            annots = ArrayObject()
+            page[NameObject('/Annots')] = annots
+
+        target = self.writer.pages[target_page_index].indirect_reference
+        link = DictionaryObject({
+            NameObject('/Type'): NameObject('/Annot'),
+            NameObject('/Subtype'): NameObject('/Link'),
+            NameObject('/Rect'): ArrayObject([FloatObject(v) for v in rect]),
+            NameObject('/Border'): ArrayObject([NumberObject(0)] * 3),
+            NameObject('/Dest'): ArrayObject([target, NameObject('/Fit')]),
+        })
+        annots.append(self.writer._add_object(link))
+
+    def write(self, output):
+        with OutputSink(output, on_flush=self._flushed) as sink:
+            self.writer.write(sink)
+        self.bytes_written = sink.position
+
+    def _flushed(self, sent):
+        self.bytes_written = sent
+        self._chunk_written()
+
+    def stats(self):
+        return {'bytes_written': self.bytes_written}
+
+
+class PyMuPDFBackend(MergeBackend):
+    """Native backend based on PyMuPDF (fitz) ``insert_pdf``."""
+
+    name = 'pymupdf'
+
+    def __init__(self, dedup=False, output_profile='classic', compression_level=DEFAULT_COMPRESSION_LEVEL,
+                 document=None):
+        self.fitz = _get_fitz()
+        # An existing document can be passed in to be updated in place
+        self.doc = document if document is not None else self.fitz.open()
+        self.toc = []
+        self.dedup = dedup
+        self.compact = output_profile == 'compact'
+        self.compression_level = compression_level
+        self._stats = {}
+
+    def _open(self, source):
+        """Open an input (path, in-memory data or file object) as a fitz Document."""
+        if is_input_path(source):
+            return self.fitz.open(source)
+        if is_input_buffer(source):
+            return self.fitz.open(stream=source, filetype='pdf')
+        with open_input(source) as file:
+            return self.fitz.open(stream=file.read(), filetype='pdf')
+
+    def add_document(self, source, at=None, pages=None):
+        src = self._open(source)
+        try:
+            if pages is None:
+                self.doc.insert_pdf(src, start_at=-1 if at is None else at)
+                return src.page_count
+            indices = pages.resolve(src.page_count)
+            position = self.doc.page_count if at is None else at
+            # One insert per run of consecutive pages (MuPDF loads only those)
+            for first, last in self._runs(indices):
+                self.doc.insert_pdf(src, from_page=first, to_page=last, start_at=position)
+                position += abs(last - first) + 1
+            return len(indices)
+        finally:
+            src.close()
+
+    @staticmethod
+    def _runs(indices):
+        """Split page indices into (first, last) runs of consecutive pages."""
+        runs = []
+        for index in indices:
+            if runs:
+                first, last = runs[-1]
+                step = 1 if last >= first else -1
+                if index == last + step or (first == last and abs(index - last) == 1):
+                    runs[-1] = (first, index)
+                    continue
+            runs.append((index, index))
+        return runs
+
+    def add_outline_item(self, title, page_index, parent=None):
+        # fitz builds the outline from a flat TOC list; the handle is the level
+        level = 1 if parent is None else parent + 1
+        self.toc.append([level, title, page_index + 1])
+        return level
+
+    def add_link(self, page_index, rect, target_page_index):
+        page = self.doc[page_index]
+        page_height = page.rect.height
+        x0, y0, x1, y1 = rect
+        page.insert_link({
+            "kind": self.fitz.LINK_GOTO,
+            "from": self.fitz.Rect(x0, page_height - y1, x1, page_height - y0),
+            "page": target_page_index
+        })
+
+    def write(self, output):
+        if self.toc:
+            self.doc.set_toc(self.toc)
+        objects = self.doc.xref_length() - 1
+        # garbage=1 prunes unreferenced objects, garbage=4 also merges duplicate objects and streams
+        options = {'garbage': 4 if self.dedup else (1 if self.compact else 0)}
+        if self.compact:
+            options.update(deflate=True, use_objstms=1,
+                           compression_effort=round(self.compression_level * 100 / 9))
+        if not is_output_path(output):
+            with OutputSink(output) as sink:
+                self.doc.save(sink, **options)
+            # The written object count can only be read back from a file
+            self._stats = {'bytes_written': sink.position}
+            return
+
+        self.doc.save(output, **options)
+        self._stats = {'bytes_written': os.path.getsize(output)}
+        if self.dedup:
+            with self.fitz.open(output) as written:
+                unique = written.xref_length() - 1
+            self._stats['dedup'] = {'seen': objects, 'written': unique,
+                                    'ratio': objects / unique if unique else 1.0}
+
+    def write_incremental(self, output_path):
+        """Save only the changes as an incremental update of the opened file."""
+        if self.toc:
+            self.doc.set_toc(self.toc)
+        before = os.path.getsize(output_path)
+        self.doc.save(output_path, incremental=True, encryption=self.fitz.PDF_ENCRYPT_KEEP)
+        self._stats = {'bytes_written': os.path.getsize(output_path) - before}
+
+    def stats(self):
+        return self._stats
+
+    def close(self):
+        self.doc.close()
+
+
+class StreamingBackend(MergeBackend):
+    """Bounded-memory backend that streams each input to the output file."""
+
+    name = 'stream'
+
+    def __init__(self, dedup=False, output_profile='classic', compression_level=DEFAULT_COMPRESSION_LEVEL):
+        self.PyPDF2 = _get_pypdf2()
+        self.dedup = dedup
+        self.compact = output_profile == 'compact'
+        self.compression_level = compression_level
+        self.file = None
+        self.writer = None
+
+    def begin(self, output):
+        self.file = OutputSink(output, on_flush=self._chunk_written)
+        self.writer = StreamingPDFWriter(self.file, dedup=self.dedup, compact=self.compact,
+                                         compression_level=self.compression_level,
+                                         cancel_check=self._poll)
+
+    def add_document(self, source, at=None, pages=None):
+        # Inserted documents (the index) are held until close so links can be added
+        hold = at is not None
+        with open_input(source) as file:
+            return self.writer.import_reader(open_reader(self.PyPDF2, file, zero_copy=True), at, hold, pages,
+                                             page_added=self._page_added)
+
+    def add_outline_item(self, title, page_index, parent=None):
+        return self.writer.add_outline_item(title, page_index, parent)
+
+    def add_link(self, page_index, rect, target_page_index):
+        self.writer.add_link(page_index, rect, target_page_index)
+
+    def write(self, output):
+        self.writer.close()
+        self.file.close()
+
+    def stats(self):
+        stats = {'bytes_written': self.writer.bytes_written}
+        if self.dedup:
+            dedup = dict(self.writer.dedup_stats)
+            dedup['ratio'] = dedup['seen'] / dedup['written'] if dedup['written'] else 1.0
+            stats['dedup'] = dedup
+        return stats
+
+    def close(self):
+        if self.file and not self.file.closed:
+            self.file.abort()
+
+
+MERGE_BACKENDS = {
+    PyPDF2Backend.name: PyPDF2Backend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+    StreamingBackend.name: StreamingBackend,
+}
+
+DEFAULT_BACKEND = PyPDF2Backend.name
+
+
+def get_merge_backend(name=None, **options):
+    """Create a merge backend by name (default: PyPDF2)."""
+    name = (name or DEFAULT_BACKEND).lower()
+    if name == 'fitz':
+        name = PyMuPDFBackend.name
+    try:
+        backend_class = MERGE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown merge backend: {name} "
+                         f"(available: {', '.join(sorted(MERGE_BACKENDS))})")
+    return backend_class(**options)
+
 
 # ============================================================================
 # ADVANCED PDF COMBINER
 # ============================================================================
 
+# Stages reported through MergeProgress, in order
+MERGE_STAGES = ('start', 'content', 'index', 'write', 'done')
+
+
+class MergeCancelled(Exception):
+    """Raised when a merge is stopped through its CancellationToken."""
+
+
+class MergeProgress(NamedTuple):
+    """Progress event passed to ``progress_callback``."""
+    stage: str          # One of MERGE_STAGES ('content' and 'write' repeat)
+    file_index: int     # 0-based index of the last input fully added (-1 before the first)
+    total_files: int
+    pages_done: int     # Pages added to the output so far (content and index)
+    bytes_written: int  # Bytes written to the output so far
+    elapsed: float      # Seconds since the merge started
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag with an optional timeout.
+
+    The controller calls ``cancel()`` from any thread; the merge polls the
+    token after every page added and every chunk written (see MergeBackend
+    for the PyMuPDF exception). With ``timeout`` the token also counts as
+    cancelled once that many seconds have passed since it was created.
+    """
+
+    def __init__(self, timeout=None):
+        self._event = threading.Event()
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def timed_out(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self):
+        return self._event.is_set() or self.timed_out
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise MergeCancelled("Merge cancelled")
+        if self.timed_out:
+            raise MergeCancelled("Merge timed out")
+
+
 class AdvancedPDFCombiner:
-    """Advanced PDF combination with index and bookmarks."""
+    """Advanced PDF combination with index and bookmarks.
+
+    ``files`` are paths, in-memory PDFs (bytes, bytearray, memoryview),
+    seekable binary file objects or lazy inputs (see ``is_lazy_input``),
+    which are opened when the merge reaches them and closed right after;
+    in-memory data is parsed in place, never written to a temporary file.
+    ``titles`` are required unless every input is a path.
 
-    def __init__(self, files, titles=None):
+    ``progress_callback`` receives a MergeProgress event at the start, a
+    'content' event after each page and each input, one after the index is
+    built, a 'write' event when writing starts and after each chunk written,
+    and one when done. ``cancel_token`` (a CancellationToken) is checked at
+    the same points and between the objects the stream backend copies;
+    cancelling aborts the merge with MergeCancelled and removes any partial
+    output. The PyMuPDF backend only reports and checks between inputs and
+    before writing.
+
+    ``page_ranges`` holds one page-range spec (``"1-3,10,-1"``, see
+    PageRanges) or None per input; index start pages and bookmarks follow
+    the selected pages.
+
+    ``document_pages`` is for inputs that are themselves merges of several
+    documents (the intermediates of a tree-reduction merge): one list per
+    input with the page counts of the documents it holds, in order.
+    ``titles`` then has one entry per document, and the index and bookmarks
+    are the same as if the original documents had been merged directly.
+    """
+
+    def __init__(self, files, titles=None, backend=None, dedup=False,
+                 output_profile='classic', compression_level=DEFAULT_COMPRESSION_LEVEL,
+                 progress_callback=None, cancel_token=None, page_ranges=None, document_pages=None):
+        if page_ranges is not None and len(page_ranges) != len(files):
+            raise ValueError("page_ranges must have one entry per file")
+        if document_pages is not None:
+            if len(document_pages) != len(files) or page_ranges is not None:
+                raise ValueError("document_pages must have one entry per file and no page_ranges")
+            if titles is None or len(titles) != sum(len(counts) for counts in document_pages):
+                raise ValueError("document_pages requires one title per document")
+        if titles is None and not all(is_input_path(f) for f in files):
+            raise ValueError("titles are required when inputs are not file paths")
+        if output_profile not in OUTPUT_PROFILES:
+            raise ValueError(f"Unknown output profile: {output_profile}")
+        if not 0 <= compression_level <= 9:
+            raise ValueError(f"Compression level must be between 0 and 9: {compression_level}")
         self.files = files
         self.titles = titles or [TextProcessor.extract_title(f) for f in files]
+        self.backend_name = backend or DEFAULT_BACKEND
+        self.dedup = dedup
+        self.output_profile = output_profile
+        self.compression_level = compression_level
+        self.progress_callback = progress_callback
+        self.cancel_token = cancel_token
+        self.page_ranges = [PageRanges.parse(spec) for spec in page_ranges or [None] * len(files)]
+        self.document_pages = document_pages
+        self._started = 0.0
+        self._pages_done = 0
+        self._file_index = -1
+        self._stage = None
+        self._pages_base = None
         self.start_pages = []
+        self.page_counts = {}
+        self.content_counts = []
+        self.layout = None
+        self.report = {}
 
-    def combine_with_index(self, output_path):
-        """Combine PDFs with interactive index and bookmarks."""
-        # Calculate page positions
-        current_page = 2  # After index
-        self.start_pages = []
+    def _new_backend(self):
+        return self._attach(get_merge_backend(self.backend_name, dedup=self.dedup,
+                                              output_profile=self.output_profile,
+                                              compression_level=self.compression_level))
+
+    def _attach(self, backend):
+        """Let the backend poll the token and report progress while it works."""
+        backend.cancel_check = self._check_cancelled
+        backend.report_progress = functools.partial(self._backend_progress, backend)
+        return backend
+
+    def _backend_progress(self, backend, pages):
+        """Progress reported by the backend: pages of the current input or a chunk written."""
+        if pages is not None and self._pages_base is not None:
+            self._pages_done = self._pages_base + pages
+            self._emit('content', backend)
+        elif pages is None and self._stage == 'write':
+            self._emit('write', backend)
+
+    def _update_report(self, backend, index_pages=0):
+        """Summarize the last merge (pages, bytes written, deduplication)."""
+        self.report = {
+            'backend': backend.name,
+            'files': len(self.files),
+            'pages': index_pages + sum(self.content_counts),
+        }
+        self.report.update(backend.stats())
+
+    def combine_with_index(self, output, single_pass=True):
+        """Combine PDFs with interactive index and bookmarks.
+
+        ``output`` is a file path or a binary writable: a file opened with
+        'wb', ``sys.stdout.buffer``, a socket, a BytesIO... Writables are
+        written sequentially in large chunks and are not closed. Returns
+        ``output``.
+
+        With ``single_pass`` (default) the index links are added while the
+        document is assembled and the output is written once. The legacy path
+        writes a temporary file and re-saves it with PyMuPDF.
+        """
+        backend = self._new_backend()
+        temp_file = None if single_pass else self._temp_file(output)
+        previous_state = self._file_state(output)
+        try:
+            try:
+                backend.begin(output if single_pass else temp_file)
+                self._start_progress(backend)
+                self._assemble_indexed(backend)
+
+                if not single_pass:
+                    return self._write_with_link_pass(backend, temp_file, output)
+
+                self._add_index_links(backend, self.layout, self.start_pages)
+                self._write(backend, output)
+                self._update_report(backend, index_pages=self.layout.page_count)
+                self._emit('done', backend)
+            finally:
+                backend.close()
+        except Exception:
+            self._discard_failed_output(output, previous_state)
+            if temp_file is not None:
+                for path in (temp_file, LinkProcessor.linked_path(temp_file)):
+                    if os.path.exists(path):
+                        os.remove(path)
+            raise
+
+        return output
+
+    @staticmethod
+    def temp_outputs(output_path):
+        """Temporary files a merge into ``output_path`` may create.
+
+        A crashed process leaves them behind; job runners remove them when
+        they recover the job.
+        """
+        root, ext = os.path.splitext(os.fspath(output_path))
+        # Only a .pdf suffix is replaced: "report" gets "report_temp.pdf", never itself
+        temp_file = (root if ext.lower() == '.pdf' else root + ext) + '_temp.pdf'
+        return [temp_file, LinkProcessor.linked_path(temp_file)]
+
+    def _temp_file(self, output):
+        """Temporary file for the legacy link pass into ``output``."""
+        if is_output_path(output):
+            return self.temp_outputs(output)[0]
+        fd, temp_file = tempfile.mkstemp(prefix='pdfcombiner_', suffix='_temp.pdf')
+        os.close(fd)
+        return temp_file
+
+    @staticmethod
+    def _file_state(path):
+        if not is_output_path(path):
+            return None
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def _discard_failed_output(cls, output, previous_state):
+        """Remove an output file left incomplete by a failed merge.
+
+        A pre-existing file the merge never touched is kept. Bytes already
+        sent to a writable cannot be taken back; its consumer sees the error.
+        """
+        state = cls._file_state(output)
+        if state is not None and state != previous_state:
+            os.remove(output)
+
+    def _assemble_indexed(self, backend):
+        """Assemble index pages, bookmarks and content into the backend.
+
+        Each input is opened and parsed exactly once: content is appended
+        first, recording page counts, and the index (whose size depends only
+        on the titles) is inserted in front afterwards.
+        """
+        self.layout = IndexLayout(self.titles)
+
+        # Add content, recording page counts
+        counts = self._document_counts(self._add_content(backend))
+        self.start_pages = self.layout.start_pages(counts)
+
+        # Create index and insert it before the content
+        index_buffer = IndexGenerator.create_index(self.start_pages, self.titles, self.layout)
+        backend.add_document(index_buffer, at=0)
+        self._pages_done += self.layout.page_count
+        self._emit('index', backend)
+
+        self._add_index_outline(backend, self.titles, self.start_pages, self.layout.page_count)
+
+    def _add_content(self, backend):
+        """Append every input (or its selected pages) to the backend.
+
+        Returns the number of pages added per input. ``page_counts`` only
+        records whole-document counts of file paths.
+        """
+        self.page_counts = {}
+        counts = self.content_counts = []
+        try:
+            for i, (pdf_file, pages) in enumerate(zip(self.files, self.page_ranges)):
+                self._check_cancelled()
+                self._pages_base = self._pages_done
+                try:
+                    counts.append(backend.add_document(pdf_file, pages=pages))
+                except ValueError as e:
+                    if pages is None:
+                        raise
+                    name = os.path.basename(pdf_file) if is_input_path(pdf_file) else self.titles[i]
+                    raise ValueError(f"{name}: {e}") from e
+                if pages is None and is_input_path(pdf_file):
+                    self.page_counts[pdf_file] = counts[-1]
+                self._file_index = i
+                self._pages_done = self._pages_base + counts[-1]
+                self._emit('content', backend)
+        finally:
+            self._pages_base = None
+        return counts
 
-        for pdf_file in self.files:
-            self.start_pages.append(current_page)
-            current_page += PDFUtils.get_page_count(pdf_file)
+    def _document_counts(self, counts):
+        """Page counts per document: the input counts, split up by ``document_pages``."""
+        if self.document_pages is None:
+            return counts
+        for pdf_file, count, documents in zip(self.files, counts, self.document_pages):
+            if sum(documents) != count:
+                raise ValueError(f"{pdf_file} has {count} pages, expected {sum(documents)}")
+        return [pages for documents in self.document_pages for pages in documents]
 
-        # Create index
-        index_buffer = IndexGenerator.create_index(self.start_pages, self.titles)
+    def _check_cancelled(self):
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
 
-        # Merge PDFs
-        merger = PyPDF2.PdfWriter()
+    def _start_progress(self, backend):
+        self._started = time.perf_counter()
+        self._pages_done = 0
+        self._file_index = -1
+        self._emit('start', backend)
 
-        # Add index
-        index_reader = PyPDF2.PdfReader(index_buffer)
-        merger.add_page(index_reader.pages[0])
-        merger.add_outline_item("📋 INDEX", 0)
+    def _write(self, backend, output):
+        """Write the output; the backend reports each chunk as a 'write' event."""
+        self._check_cancelled()
+        self._emit('write', backend)
+        backend.write(output)
 
-        # Add content bookmark
-        content_bookmark = merger.add_outline_item("📚 CONTENT", 1)
+    def _emit(self, stage, backend):
+        """Report a MergeProgress event to the progress callback."""
+        self._stage = stage
+        if self.progress_callback is None:
+            return
+        self.progress_callback(MergeProgress(
+            stage, self._file_index, len(self.files), self._pages_done,
+            backend.stats().get('bytes_written', 0), time.perf_counter() - self._started))
 
-        # Add PDFs with bookmarks
-        page_index = 1
-        for i, (pdf_file, title) in enumerate(zip(self.files, self.titles)):
-            with open(pdf_file, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                merger.add_outline_item(f"📄 {i+1}: {title}", page_index, content_bookmark)
+    @staticmethod
+    def _add_index_outline(backend, titles, start_pages, index_pages):
+        """Add the index, content and per-document bookmarks."""
+        backend.add_outline_item(INDEX_BOOKMARK, 0)
+        content_bookmark = backend.add_outline_item(CONTENT_BOOKMARK, index_pages)
+        for i, (title, start_page) in enumerate(zip(titles, start_pages)):
+            backend.add_outline_item(f"📄 {i+1}: {title}", start_page - 1, content_bookmark)
 
-                for page in reader.pages:
-                    merger.add_page(page)
-                    page_index += 1
+    @staticmethod
+    def _add_index_links(backend, layout, start_pages):
+        """Link every index entry to the first page of its document."""
+        for (page_index, rect), start_page in zip(layout.link_rects(), start_pages):
+            backend.add_link(page_index, rect, start_page - 1)
 
+    def _write_with_link_pass(self, backend, temp_file, output):
+        """Legacy three-step save: temp file, PyMuPDF link pass, rename (or copy to a writable)."""
         # Save combined PDF
-        temp_file = output_path.replace('.pdf', '_temp.pdf')
-        with open(temp_file, 'wb') as file:
-            merger.write(file)
+        self._write(backend, temp_file)
+        self._update_report(backend, index_pages=self.layout.page_count)
 
         # Add clickable links
-        final_file = LinkProcessor.add_links(temp_file, self.start_pages, self.titles)
+        final_file = LinkProcessor.add_links(temp_file, self.start_pages, self.titles, self.layout)
 
         # Move final file to desired location
-        if final_file != output_path:
-            os.rename(final_file, output_path)
+        if is_output_path(output):
+            os.replace(final_file, output)
+        else:
+            with open(final_file, 'rb') as file, OutputSink(output) as sink:
+                shutil.copyfileobj(file, sink, OUTPUT_BUFFER_SIZE)
+            os.remove(final_file)
 
         # Cleanup temporary file
         if os.path.exists(temp_file):
             os.remove(temp_file)
 
-        return output_path
+        self._emit('done', backend)
+        return output
+
+    def append_to(self, combined_path):
+        """Append the files to an existing combined PDF as an incremental update.
+
+        The new documents, the rebuilt index pages and the extended outline are
+        written after the existing bytes, so the cost grows with the new files
+        rather than the whole archive. A PDF combined without an index keeps
+        its outline, and each new document gets a "📄 N: title" bookmark
+        numbered after those of earlier appends. Requires PyMuPDF.
+        """
+        fitz = _get_fitz()
+        doc = fitz.open(combined_path)
+        if not doc.can_save_incrementally():
+            doc.close()
+            raise ValueError(f"{combined_path} cannot be updated incrementally")
+
+        backend = self._attach(PyMuPDFBackend(document=doc))
+        try:
+            self._start_progress(backend)
+            parsed = PDFUtils.parse_index_outline(doc.get_toc())
+            old_index_pages, entries = parsed if parsed is not None else (0, [])
+            titles = [title for title, _ in entries] + list(self.titles)
+            self.layout = IndexLayout(titles) if parsed is not None else None
+            index_pages = self.layout.page_count if self.layout else 0
+            shift = index_pages - old_index_pages
+
+            # Existing documents keep their pages, shifted if the index grows
+            self.start_pages = [page + shift for _, page in entries]
+            current_page = doc.page_count + shift + 1
+            counts = self._add_content(backend)
+            for count in counts:
+                self.start_pages.append(current_page)
+                current_page += count
+
+            if self.layout is not None:
+                # Replace the index with one covering old and new entries
+                doc.delete_pages(0, old_index_pages - 1)
+                index_buffer = IndexGenerator.create_index(self.start_pages, titles, self.layout)
+                backend.add_document(index_buffer, at=0)
+                self._pages_done += index_pages
+                self._emit('index', backend)
+                self._add_index_links(backend, self.layout, self.start_pages)
+                self._add_index_outline(backend, titles, self.start_pages, index_pages)
+            else:
+                self._extend_outline(backend, doc.get_toc(simple=False), self.titles, self.start_pages)
+
+            # Nothing has been written yet: cancelling leaves the file untouched
+            self._check_cancelled()
+            self._emit('write', backend)
+            backend.write_incremental(combined_path)
+            self._update_report(backend, index_pages=0)
+            self._emit('done', backend)
+        finally:
+            backend.close()
+
+        return combined_path
+
+    @staticmethod
+    def _extend_outline(backend, toc, titles, start_pages):
+        """Keep the outline of a PDF without index and bookmark the appended documents."""
+        backend.toc = [list(item) for item in toc]
+        first = 1 + sum(1 for level, title, *_ in toc if level == 1 and ENTRY_BOOKMARK_PATTERN.match(title))
+        for i, (title, start_page) in enumerate(zip(titles, start_pages), first):
+            backend.add_outline_item(f"📄 {i}: {title}", start_page - 1)
+
+    def combine_simple(self, output):
+        """Simple PDF combination without index.
+
+        ``output`` is a file path or a binary writable, as in
+        ``combine_with_index``. Returns ``output``.
+        """
+        backend = self._new_backend()
+        previous_state = self._file_state(output)
+        try:
+            try:
+                backend.begin(output)
+                self._start_progress(backend)
+                self._add_content(backend)
+                self._write(backend, output)
+                self._update_report(backend)
+                self._emit('done', backend)
+            finally:
+                backend.close()
+        except Exception:
+            self._discard_failed_output(output, previous_state)
+            raise
+
+        return output
 
-    def combine_simple(self, output_path):
-        """Simple PDF combination without index."""
-        merger = PyPDF2.PdfWriter()
 
-        for pdf_file in self.files:
-            with open(pdf_file, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    merger.add_page(page)
+# ============================================================================
+# SPLITTING
+# ============================================================================
+
+class SplitSection(NamedTuple):
+    """A part of a document to write as its own PDF."""
+    title: str
+    pages: str  # Page-range spec of the source, see PageRanges
+
+
+def outline_sections(toc, page_count):
+    """Sections of a combined PDF, one per "📄 N: title" outline entry.
+
+    ``toc`` is a table of contents as PDFUtils.parse_index_outline takes it.
+    Each section runs from its entry's start page to the page before the
+    next entry (the last one to the end); index pages are left out.
+    Returns None if the document was not combined with an index.
+    """
+    parsed = PDFUtils.parse_index_outline(toc)
+    if parsed is None:
+        return None
+    _, entries = parsed
+    sections = []
+    for position, (title, start) in enumerate(entries):
+        end = entries[position + 1][1] - 1 if position + 1 < len(entries) else page_count
+        if start <= end:
+            sections.append(SplitSection(title, f"{start}-{end}"))
+    return sections
+
+
+class PDFSplitter:
+    """Writes parts of one source PDF as separate documents.
+
+    The source is opened and its cross-reference table parsed once; every
+    part is then copied from the same PdfReader with StreamingPDFWriter, so
+    objects already resolved for one part are not parsed again for the next.
+    ``output_profile`` and ``compression_level`` work as in the combiner.
+    """
+
+    def __init__(self, source, output_profile='classic', compression_level=DEFAULT_COMPRESSION_LEVEL):
+        if output_profile not in OUTPUT_PROFILES:
+            raise ValueError(f"Unknown output profile: {output_profile}")
+        self.source = source
+        self.compact = output_profile == 'compact'
+        self.compression_level = compression_level
+        self._file = open_input(source)
+        try:
+            self.reader = open_reader(_get_pypdf2(), self._file, zero_copy=True)
+            if self.reader.is_encrypted:
+                self.reader.decrypt('')
+            self.page_count = len(PageTree(self.reader))
+        except Exception:
+            self._file.close()
+            raise
+
+    def toc(self):
+        """The outline as [level, title, page] rows with 1-based pages."""
+        toc = []
+
+        def walk(items, level):
+            for item in items:
+                if isinstance(item, list):
+                    walk(item, level + 1)
+                    continue
+                page = self.reader.get_destination_page_number(item)
+                toc.append([level, item.title, page + 1 if page is not None else -1])
+
+        walk(self.reader.outline, 1)
+        return toc
+
+    def sections(self):
+        """Sections given by the outline written by ``combine_with_index``."""
+        sections = outline_sections(self.toc(), self.page_count)
+        if sections is None:
+            raise ValueError(f"{self.source} has no index outline to split by")
+        return sections
+
+    def write(self, pages, output):
+        """Write the pages selected by ``pages`` (a spec or PageRanges) to a path
+        or binary writable. Returns the number of pages written.
+
+        A partially written file is removed if the write fails.
+        """
+        selection = PageRanges.parse(pages)
+        try:
+            with OutputSink(output) as sink:
+                writer = StreamingPDFWriter(sink, compact=self.compact,
+                                            compression_level=self.compression_level)
+                count = writer.import_reader(self.reader, pages=selection)
+                writer.close()
+        except Exception:
+            if is_output_path(output) and os.path.exists(output):
+                os.remove(output)
+            raise
+        return count
+
+    def close(self):
+        self._file.close()
 
-        with open(output_path, 'wb') as file:
-            merger.write(file)
+    def __enter__(self):
+        return self
 
-        return output_path
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,66 @@
+"""
+Shared fixtures: small synthetic PDFs generated with reportlab.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def page_label(label, page):
+    """Text drawn at the top of page ``page`` (1-based) of document ``label``."""
+    return f"{label} page {page}"
+
+
+def write_pdf(path, label, pages, image=None):
+    """Write a PDF whose pages read ``page_label(label, n)``.
+
+    With ``image`` (a PNG path) every page also draws that image, so several
+    PDFs written with the same image share an identical image XObject and
+    Helvetica font dictionary.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for page in range(1, pages + 1):
+        c.setFont("Helvetica", 14)
+        c.drawString(72, 720, page_label(label, page))
+        if image:
+            c.drawImage(str(image), 72, 400, width=64, height=64)
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep the metadata cache and job queue databases out of the user's cache directory."""
+    monkeypatch.setenv('PDFCOMBINER_CACHE_DIR', str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def shared_image(tmp_path):
+    """A small PNG to embed in several PDFs."""
+    from PIL import Image
+
+    path = tmp_path / "logo.png"
+    image = Image.new("RGB", (32, 32))
+    image.putdata([(x * 8, y * 8, 128) for y in range(32) for x in range(32)])
+    image.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def make_pdfs(tmp_path):
+    """Factory: ``make_pdfs([2, 3, 1])`` writes doc1..docN with those page counts."""
+    def make(page_counts, image=None, directory="inputs"):
+        folder = tmp_path / directory
+        folder.mkdir(exist_ok=True)
+        return [write_pdf(folder / f"doc{n}.pdf", f"doc{n}", pages, image)
+                for n, pages in enumerate(page_counts, 1)]
+    return make
@@ -0,0 +1,92 @@
+"""
+Tests for AdvancedPDFCombiner.append_to: incremental updates of a combined PDF.
+"""
+import fitz
+import pytest
+
+from conftest import page_label
+from pdf_utils import AdvancedPDFCombiner, IndexLayout
+
+
+def summary(path):
+    """Text of every page, the outline and every link as (page, target page)."""
+    with fitz.open(str(path)) as doc:
+        return {
+            'text': [page.get_text() for page in doc],
+            'toc': doc.get_toc(),
+            'links': [(page.number, link['page']) for page in doc for link in page.get_links()],
+        }
+
+
+def titles_for(files):
+    return [f"Doc {n}" for n in range(1, len(files) + 1)]
+
+
+def append(combined, files, titles):
+    before = combined.read_bytes()
+    combiner = AdvancedPDFCombiner(files, titles)
+    combiner.append_to(str(combined))
+    # An incremental update only adds bytes after the existing ones
+    assert combined.read_bytes().startswith(before)
+    return combiner
+
+
+@pytest.mark.parametrize('old_count', [3, 50], ids=['same-index-page', 'index-grows'])
+def test_append_matches_a_full_merge(tmp_path, make_pdfs, old_count):
+    files = make_pdfs([1 + n % 2 for n in range(old_count + 2)])
+    titles = titles_for(files)
+    combined = tmp_path / "combined.pdf"
+    full = tmp_path / "full.pdf"
+    AdvancedPDFCombiner(files[:-2], titles[:-2], backend='pymupdf').combine_with_index(str(combined))
+    AdvancedPDFCombiner(files, titles, backend='pymupdf').combine_with_index(str(full))
+
+    combiner = append(combined, files[-2:], titles[-2:])
+
+    old_index_pages = IndexLayout(titles[:-2]).page_count
+    assert combiner.layout.page_count == old_index_pages + (1 if old_count == 50 else 0)
+    expected = summary(full)
+    assert summary(combined) == expected
+    assert len(expected['links']) == len(files)
+    # Every link lands on the first page of its document
+    with fitz.open(str(combined)) as doc:
+        for (_, target), n in zip(expected['links'], range(1, len(files) + 1)):
+            assert doc[target].get_text().splitlines()[0] == page_label(f"doc{n}", 1)
+
+
+def test_append_twice(tmp_path, make_pdfs):
+    files = make_pdfs([1, 2, 1, 2])
+    titles = titles_for(files)
+    combined = tmp_path / "combined.pdf"
+    full = tmp_path / "full.pdf"
+    AdvancedPDFCombiner(files[:2], titles[:2], backend='pymupdf').combine_with_index(str(combined))
+    AdvancedPDFCombiner(files, titles, backend='pymupdf').combine_with_index(str(full))
+    append(combined, files[2:3], titles[2:3])
+    append(combined, files[3:], titles[3:])
+    assert summary(combined) == summary(full)
+
+
+def test_append_without_index_bookmarks_new_documents(tmp_path, make_pdfs):
+    files = make_pdfs([2, 1, 3, 1])
+    combined = tmp_path / "combined.pdf"
+    AdvancedPDFCombiner(files[:2], ["A", "B"]).combine_simple(str(combined))
+
+    append(combined, files[2:3], ["C"])
+    append(combined, files[3:], ["D"])
+
+    result = summary(combined)
+    assert [text.splitlines()[0] for text in result['text']] == [
+        page_label(f"doc{n}", page) for n, count in enumerate([2, 1, 3, 1], 1) for page in range(1, count + 1)]
+    assert result['toc'] == [[1, "📄 1: C", 4], [1, "📄 2: D", 7]]
+    assert result['links'] == []
+
+
+def test_append_without_index_keeps_the_existing_outline(tmp_path, make_pdfs):
+    files = make_pdfs([2, 1])
+    combined = tmp_path / "combined.pdf"
+    with fitz.open(files[0]) as doc:
+        doc.set_toc([[1, "Chapter", 1], [2, "Section", 2]])
+        doc.save(str(combined))
+
+    append(combined, files[1:], ["New"])
+
+    assert summary(combined)['toc'] == [[1, "Chapter", 1], [2, "Section", 2], [1, "📄 1: New", 3]]
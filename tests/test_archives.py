@@ -0,0 +1,124 @@
+"""
+Pruebas de los miembros de comprimidos: se abren cuando la combinación llega
+a ellos y se liberan en cuanto se han añadido.
+"""
+import tarfile
+import zipfile
+
+import fitz
+import pytest
+
+import core.archives as archives
+from conftest import page_label
+from core.archives import ArchiveError, ArchiveMember, member_path, open_members
+from core.pdf_combiner import PDFCombinerService
+
+
+@pytest.fixture
+def bundle(tmp_path, make_pdfs):
+    """bundle.zip con doc1.pdf sin comprimir y doc2.pdf, doc3.pdf comprimidos"""
+    files = make_pdfs([1, 2, 3])
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.write(files[0], 'doc1.pdf', compress_type=zipfile.ZIP_STORED)
+        zf.write(files[1], 'doc2.pdf', compress_type=zipfile.ZIP_DEFLATED)
+        zf.write(files[2], 'doc3.pdf', compress_type=zipfile.ZIP_DEFLATED)
+    return str(path)
+
+
+@pytest.fixture
+def tar_bundle(tmp_path, make_pdfs):
+    """bundle.tar.gz con doc1.pdf, doc2.pdf y doc3.pdf"""
+    files = make_pdfs([1, 2, 3])
+    path = tmp_path / "bundle.tar.gz"
+    with tarfile.open(path, 'w:gz') as tf:
+        for n, file in enumerate(files, 1):
+            tf.add(file, f"doc{n}.pdf")
+    return str(path)
+
+
+@pytest.fixture
+def spools(monkeypatch):
+    """Temporales creados al abrir miembros comprimidos"""
+    created = []
+    spool = archives._spool
+
+    def recording_spool(source, max_size):
+        created.append(spool(source, max_size))
+        return created[-1]
+
+    monkeypatch.setattr(archives, '_spool', recording_spool)
+    return created
+
+
+def first_lines(path):
+    with fitz.open(path) as doc:
+        return [page.get_text().splitlines()[0] for page in doc]
+
+
+def test_members_are_not_read_until_opened(bundle, spools):
+    paths = [member_path(bundle, f"doc{n}.pdf") for n in (1, 2, 3)]
+    members = open_members(paths)
+    assert all(isinstance(members[path], ArchiveMember) for path in paths)
+    assert spools == []
+
+    stored = members[paths[0]].open()
+    assert isinstance(stored, memoryview)
+    assert bytes(stored[:5]) == b'%PDF-'
+    with members[paths[1]].open() as deflated:
+        assert deflated.read(5) == b'%PDF-'
+    assert len(spools) == 1
+
+
+def test_large_members_are_spooled_to_disk(bundle, monkeypatch, spools):
+    monkeypatch.setattr(archives, 'SPOOL_MAX_SIZE', 1024)
+    member = open_members([member_path(bundle, 'doc2.pdf')])[member_path(bundle, 'doc2.pdf')]
+    with member.open() as file:
+        assert file._rolled
+        assert file.read(5) == b'%PDF-'
+
+
+def test_missing_zip_member_fails_before_merging(bundle):
+    with pytest.raises(ArchiveError, match="no_existe.pdf"):
+        open_members([member_path(bundle, 'no_existe.pdf')])
+
+
+def test_missing_compressed_tar_member_fails_when_opened(tar_bundle):
+    member = open_members([member_path(tar_bundle, 'no_existe.pdf')])[member_path(tar_bundle, 'no_existe.pdf')]
+    with pytest.raises(ArchiveError, match="no_existe.pdf"):
+        member.open()
+
+
+@pytest.mark.parametrize('backend', ['pypdf2', 'stream', 'pymupdf'])
+def test_each_member_is_released_once_added(tmp_path, bundle, spools, backend):
+    paths = [member_path(bundle, f"doc{n}.pdf") for n in (3, 1, 2)]
+    still_open = []
+
+    def check_released(event):
+        # El evento que completa cada entrada (los de cada página llegan antes)
+        if event.stage == 'content' and event.file_index == len(still_open):
+            still_open.append([spool for spool in spools if not spool.closed])
+
+    output = str(tmp_path / "merged.pdf")
+    PDFCombinerService().combine(paths, output, create_index=False, backend=backend,
+                                 progress_callback=check_released)
+
+    assert first_lines(output) == [page_label("doc3", 1), page_label("doc3", 2), page_label("doc3", 3),
+                                   page_label("doc1", 1), page_label("doc2", 1), page_label("doc2", 2)]
+    assert len(spools) == 2
+    assert still_open == [[], [], []]
+
+
+def test_compressed_tar_is_read_in_one_pass(tmp_path, tar_bundle, monkeypatch):
+    passes = []
+    open_tar = archives._open_tar
+    monkeypatch.setattr(archives, '_open_tar', lambda archive: passes.append(archive) or open_tar(archive))
+
+    # Otro orden que el del comprimido, y un miembro repetido
+    paths = [member_path(tar_bundle, name) for name in ('doc3.pdf', 'doc1.pdf', 'doc3.pdf')]
+    output = str(tmp_path / "merged.pdf")
+    PDFCombinerService().combine(paths, output, create_index=False, titles=['Tres', 'Uno', 'Tres'])
+
+    assert passes == [tar_bundle]
+    assert first_lines(output) == [page_label("doc3", p) for p in (1, 2, 3)] + [page_label("doc1", 1)] + \
+        [page_label("doc3", p) for p in (1, 2, 3)]
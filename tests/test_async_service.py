@@ -0,0 +1,139 @@
+"""
+Pruebas de AsyncPDFCombinerService: límite de combinaciones simultáneas,
+entrega de eventos en el bucle y cancelación de la tarea.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+import pdf_utils
+from core.async_service import AsyncPDFCombinerService
+from core.pdf_combiner import PDFCombinerService
+
+
+@pytest.fixture
+def stalled_merge(monkeypatch):
+    """Las combinaciones se detienen en su primera página hasta que se cancelan.
+
+    Devuelve dos eventos: ``reached`` se activa al llegar a esa página y
+    ``released`` hace que las siguientes combinaciones ya no se detengan.
+    """
+    reached = threading.Event()
+    released = threading.Event()
+    page_added = pdf_utils.MergeBackend._page_added
+
+    def stall(backend, pages):
+        reached.set()
+        deadline = time.monotonic() + 10
+        while not released.is_set() and time.monotonic() < deadline:
+            backend._poll()  # MergeCancelled en cuanto se cancela el token
+            time.sleep(0.01)
+        page_added(backend, pages)
+
+    monkeypatch.setattr(pdf_utils.MergeBackend, '_page_added', stall)
+    return reached, released
+
+
+def page_count(path):
+    with fitz.open(str(path)) as doc:
+        return doc.page_count
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 2])
+def test_semaphore_limits_simultaneous_merges(tmp_path, make_pdfs, monkeypatch, max_concurrency):
+    files = make_pdfs([1, 2])
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    combine = PDFCombinerService.combine
+
+    def counting_combine(self, *args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            time.sleep(0.1)
+            return combine(self, *args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(PDFCombinerService, 'combine', counting_combine)
+
+    async def main():
+        # El executor admite más trabajos: el límite lo pone el semáforo
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            service = AsyncPDFCombinerService(executor, max_concurrency=max_concurrency)
+            return await asyncio.gather(*(
+                service.combine(files, str(tmp_path / f"salida{n}.pdf"), create_index=False)
+                for n in range(4)))
+
+    outputs = asyncio.run(main())
+    assert peak[0] == max_concurrency
+    assert [page_count(output) for output in outputs] == [3] * 4
+
+
+def test_events_are_delivered_on_the_loop_thread(tmp_path, make_pdfs):
+    events = []
+    threads = set()
+
+    def progress(event):
+        threads.add(threading.get_ident())
+        events.append(event)
+
+    async def main():
+        async with AsyncPDFCombinerService(max_concurrency=1) as service:
+            await service.combine(make_pdfs([2, 1]), str(tmp_path / "salida.pdf"),
+                                  titles=["A", "B"], progress_callback=progress)
+            # Todos los eventos llegan antes de que termine la espera
+            return threading.get_ident(), [event.stage for event in events]
+
+    loop_thread, stages = asyncio.run(main())
+    assert threads == {loop_thread}
+    assert stages[0] == 'start' and stages[-1] == 'done'
+
+
+def test_cancelling_the_task_removes_partial_output(tmp_path, make_pdfs, stalled_merge):
+    reached, _ = stalled_merge
+    output = tmp_path / "salida.pdf"
+
+    async def main():
+        async with AsyncPDFCombinerService(max_concurrency=1) as service:
+            task = asyncio.create_task(service.combine(make_pdfs([5]), str(output),
+                                                       create_index=False, backend='stream'))
+            while not reached.is_set():
+                await asyncio.sleep(0.01)
+            # El backend stream ya ha abierto la salida
+            assert output.exists()
+
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # La salida ya se eliminó cuando la tarea termina
+            assert not output.exists()
+
+    asyncio.run(main())
+
+
+def test_wait_for_timeout_removes_partial_output(tmp_path, make_pdfs, stalled_merge):
+    reached, released = stalled_merge
+    files = make_pdfs([5])
+    output = tmp_path / "salida.pdf"
+
+    async def main():
+        async with AsyncPDFCombinerService(max_concurrency=1) as service:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(service.combine(files, str(output), create_index=False,
+                                                       backend='stream'), timeout=0.2)
+            assert reached.is_set()
+            assert not output.exists()
+
+            # El semáforo quedó libre: la siguiente combinación no espera
+            released.set()
+            return await asyncio.wait_for(service.combine(files, str(output), create_index=False), timeout=10)
+
+    assert page_count(asyncio.run(main())) == 5
@@ -0,0 +1,74 @@
+"""
+Pruebas de los manifiestos de lotes: comprimidos como entradas de un trabajo.
+"""
+import json
+import os
+import zipfile
+
+import fitz
+import pytest
+
+from core.archives import member_path
+from core.batch_runner import load_manifest, run_batch
+from core.pdf_combiner import PDFCombinerError
+
+
+@pytest.fixture
+def bundle(tmp_path, make_pdfs):
+    """bundle.zip con doc1.pdf en la raíz y doc2.pdf, doc3.pdf en informes/"""
+    files = make_pdfs([1, 2, 3])
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.write(files[0], 'doc1.pdf')
+        zf.write(files[1], 'informes/doc2.pdf')
+        zf.write(files[2], 'informes/doc3.pdf')
+        zf.writestr('leeme.txt', 'no es un PDF')
+    return str(path)
+
+
+def write_manifest(tmp_path, jobs):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(jobs), encoding='utf-8')
+    return str(path)
+
+
+def test_archives_in_a_manifest_are_expanded(tmp_path, bundle):
+    manifest = write_manifest(tmp_path, [
+        {'id': 'todo', 'files': ['bundle.zip'], 'output': 'todo.pdf'},
+        {'id': 'carpeta', 'files': ['bundle.zip!/informes/'], 'output': 'carpeta.pdf',
+         'titles': ['Dos', 'Tres']},
+        {'id': 'miembro', 'files': ['bundle.zip!/doc1.pdf', 'inputs/doc2.pdf'], 'output': 'miembro.pdf'},
+    ])
+    jobs = {job.job_id: job for job in load_manifest(manifest)}
+
+    assert jobs['todo'].files == [member_path(bundle, name)
+                                  for name in ('doc1.pdf', 'informes/doc2.pdf', 'informes/doc3.pdf')]
+    assert jobs['carpeta'].files == [member_path(bundle, name)
+                                     for name in ('informes/doc2.pdf', 'informes/doc3.pdf')]
+    assert jobs['miembro'].files == [member_path(bundle, 'doc1.pdf'),
+                                     os.path.join(str(tmp_path), 'inputs/doc2.pdf')]
+
+
+def test_titles_are_checked_against_the_expanded_files(tmp_path, bundle):
+    manifest = write_manifest(tmp_path, [
+        {'files': ['bundle.zip'], 'output': 'todo.pdf', 'titles': ['Uno']},
+    ])
+    with pytest.raises(PDFCombinerError, match="un título por archivo"):
+        load_manifest(manifest)
+
+
+def test_unreadable_archive_is_reported_with_its_job(tmp_path):
+    (tmp_path / "roto.zip").write_bytes(b'no es un zip')
+    manifest = write_manifest(tmp_path, [{'files': ['roto.zip'], 'output': 'roto.pdf'}])
+    with pytest.raises(PDFCombinerError, match="Trabajo 1"):
+        load_manifest(manifest)
+
+
+def test_batch_merges_a_whole_archive(tmp_path, bundle):
+    manifest = write_manifest(tmp_path, [{'id': 'todo', 'files': ['bundle.zip'], 'output': 'todo.pdf',
+                                          'index': False}])
+    [result] = run_batch(load_manifest(manifest), workers=1)
+
+    assert result.status == 'ok', result.error
+    with fitz.open(result.output_path) as doc:
+        assert doc.page_count == 1 + 2 + 3
@@ -0,0 +1,249 @@
+"""
+Pruebas del servidor HTTP: peticiones locales, salida confinada en
+output_dir, ciclo de vida de los trabajos y lectura de cuerpos multipart.
+"""
+import http.client
+import io
+import json
+import os
+import threading
+import time
+import uuid
+
+import fitz
+import pytest
+
+import core.http_server as http_server
+import pdf_utils
+from conftest import page_label
+from core.http_server import CombineRequestHandler, CombineServer, RequestError
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Servidor en un puerto libre con tmp_path/salidas como output_dir"""
+    (tmp_path / "salidas").mkdir()
+    server = CombineServer(host='127.0.0.1', port=0, workers=2, work_dir=str(tmp_path / "trabajos"),
+                           quiet=True, output_dir=str(tmp_path / "salidas"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.close()
+    thread.join()
+
+
+def request(server, method, path, body=None, headers=None):
+    """(estado, cabeceras, cuerpo) de una petición al servidor"""
+    host, port = server.httpd.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        if isinstance(body, dict):
+            body = json.dumps(body).encode('utf-8')
+            headers = {'Content-Type': 'application/json', **(headers or {})}
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        connection.close()
+
+
+def multipart(parts):
+    """Cuerpo multipart/form-data de [(nombre, nombre de archivo o None, datos)]"""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        body.write(f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode('utf-8'))
+        body.write(data)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode('ascii'))
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def wait_for_job(server, job_id, statuses=('done', 'error', 'cancelled')):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        status, _, body = request(server, 'GET', f"/jobs/{job_id}")
+        job = json.loads(body)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"El trabajo {job_id} no terminó")
+
+
+def first_lines(data):
+    with fitz.open(stream=data, filetype='pdf') as doc:
+        return [page.get_text().splitlines()[0] for page in doc]
+
+
+@pytest.mark.parametrize('headers', [
+    {'Host': 'ejemplo.com'},
+    {'Host': 'ejemplo.com:8765'},
+    {'Origin': 'http://ejemplo.com'},
+    {'Origin': 'http://localhost.ejemplo.com:8765'},
+], ids=['host', 'host-puerto', 'origen', 'origen-parecido'])
+def test_requests_from_other_hosts_are_forbidden(server, make_pdfs, headers):
+    status, _, body = request(server, 'POST', '/jobs', {'files': make_pdfs([1])}, headers)
+    assert status == 403
+    assert 'no permitido' in json.loads(body)['error']
+    assert server.list_jobs() == []
+
+
+def test_local_origin_is_accepted(server):
+    port = server.httpd.server_address[1]
+    for headers in ({'Host': f'localhost:{port}'}, {'Origin': f'http://127.0.0.1:{port}'}):
+        status, _, _ = request(server, 'GET', '/health', headers=headers)
+        assert status == 200
+
+
+@pytest.mark.parametrize('output', ['../fuera.pdf', '/tmp/fuera.pdf', '.', 'sub/../../fuera.pdf'])
+def test_output_outside_output_dir_is_forbidden(server, make_pdfs, tmp_path, output):
+    status, _, body = request(server, 'POST', '/jobs', {'files': make_pdfs([1]), 'output': output})
+    assert status == 403
+    assert not (tmp_path / "fuera.pdf").exists()
+    # El directorio del trabajo rechazado no se conserva
+    assert os.listdir(server.work_dir) == []
+
+
+def test_output_requires_output_dir(tmp_path):
+    server = CombineServer(host='127.0.0.1', port=0, work_dir=str(tmp_path / "trabajos"), quiet=True)
+    try:
+        with pytest.raises(RequestError) as error:
+            server.resolve_output('salida.pdf')
+        assert error.value.status == 403
+    finally:
+        server.httpd.server_close()
+        server.executor.shutdown()
+
+
+def test_output_inside_output_dir(server, make_pdfs, tmp_path):
+    status, _, body = request(server, 'POST', '/jobs?wait=1',
+                              {'files': make_pdfs([2]), 'output': 'informe.pdf', 'index': False})
+    assert status == 200
+    assert (tmp_path / "salidas" / "informe.pdf").read_bytes() == body
+
+
+def test_job_lifecycle(server, make_pdfs):
+    files = make_pdfs([2, 1])
+    status, headers, body = request(server, 'POST', '/jobs', {'files': files, 'titles': ["A", "B"]})
+    assert status == 202
+    job = json.loads(body)
+    assert headers['Location'] == f"/jobs/{job['id']}"
+    assert job['status'] in ('queued', 'running', 'done')
+
+    job = wait_for_job(server, job['id'])
+    assert job['status'] == 'done'
+    assert job['progress']['stage'] == 'done'
+    assert job['report']['files'] == 2
+    assert job['result'] == f"/jobs/{job['id']}/result"
+
+    status, headers, pdf = request(server, 'GET', job['result'])
+    assert status == 200
+    assert headers['Content-Type'] == 'application/pdf'
+    assert first_lines(pdf)[1:] == [page_label("doc1", 1), page_label("doc1", 2), page_label("doc2", 1)]
+    work_dir = os.path.dirname(server.get_job(job['id']).output_path)
+
+    status, _, body = request(server, 'GET', '/jobs')
+    assert [listed['id'] for listed in json.loads(body)['jobs']] == [job['id']]
+
+    status, _, body = request(server, 'DELETE', f"/jobs/{job['id']}")
+    assert status == 200 and json.loads(body)['status'] == 'deleted'
+    status, _, _ = request(server, 'GET', f"/jobs/{job['id']}")
+    assert status == 404
+    deadline = time.monotonic() + 10
+    while os.path.exists(work_dir) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not os.path.exists(work_dir)
+
+
+def test_deleting_a_running_job_cancels_it(server, make_pdfs, monkeypatch):
+    reached = threading.Event()
+    page_added = pdf_utils.MergeBackend._page_added
+
+    def stall(backend, pages):
+        # Detenerse en la primera página hasta que se cancele el trabajo
+        reached.set()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            backend._poll()
+            time.sleep(0.01)
+        page_added(backend, pages)
+
+    monkeypatch.setattr(pdf_utils.MergeBackend, '_page_added', stall)
+    status, _, body = request(server, 'POST', '/jobs', {'files': make_pdfs([3]), 'backend': 'stream'})
+    job = server.get_job(json.loads(body)['id'])
+    assert reached.wait(10)
+
+    status, _, _ = request(server, 'DELETE', f"/jobs/{job.job_id}")
+    assert status == 200
+    assert job.done.wait(10)
+    assert job.status == 'cancelled'
+    assert not os.path.exists(job.output_path)
+
+
+def test_multipart_upload_with_wait(server, make_pdfs):
+    files = make_pdfs([1, 2])
+    parts = []
+    for n, path in enumerate(files, 1):
+        with open(path, 'rb') as file:
+            parts.append(('files', f"Capitulo {n}.pdf", file.read()))
+    body, content_type = multipart(parts)
+
+    status, headers, pdf = request(server, 'POST', '/jobs?wait=1', body, {'Content-Type': content_type})
+    assert status == 200
+    # Títulos tomados de los nombres de archivo
+    with fitz.open(stream=pdf, filetype='pdf') as doc:
+        assert [title for _, title, _ in doc.get_toc()][2:] == ["📄 1: Capitulo 1", "📄 2: Capitulo 2"]
+
+    body, content_type = multipart(parts + [('index', None, b'0')])
+
+    status, headers, pdf = request(server, 'POST', '/jobs?wait=1', body, {'Content-Type': content_type})
+    assert status == 200
+    assert first_lines(pdf) == [page_label("doc1", 1), page_label("doc2", 1), page_label("doc2", 2)]
+    job = server.get_job(headers['X-Job-Id'])
+    # Los temporales de las subidas se cierran al terminar
+    assert job.files is None
+
+
+def test_multipart_parts_are_copied_exactly(tmp_path):
+    boundary_like = b"--" + b"x" * 32
+    payloads = [
+        b"%PDF-1.4\r\nbinario\x00\xff\r\r\n\r\n",
+        b"sin salto final",
+        b"\n\r\n" + boundary_like + b"mas\r\n" + b"linea " + boundary_like + b"\r\n",
+        b"",
+    ]
+    body, content_type = multipart([('files', f"doc{n}.pdf", data) for n, data in enumerate(payloads)]
+                                   + [('titles', None, "Título".encode('utf-8')), ('index', None, b'no')])
+    fields, files, titles = CombineRequestHandler._parse_multipart(io.BytesIO(body), content_type, str(tmp_path))
+
+    assert [file.read() for file in files] == payloads
+    assert titles == [f"Doc{n}" for n in range(len(payloads))]
+    assert fields == {'titles': ["Título"], 'index': 'no'}
+
+
+def test_large_uploads_are_spooled_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_server, 'SPOOL_MAX_SIZE', 1024)
+    data = os.urandom(64 * 1024)
+    body, content_type = multipart([('files', "grande.pdf", data), ('files', "corto.pdf", b"%PDF")])
+    fields, files, titles = CombineRequestHandler._parse_multipart(io.BytesIO(body), content_type, str(tmp_path))
+    assert [file._rolled for file in files] == [True, False]
+    assert files[0].read() == data
+
+
+@pytest.mark.parametrize('body', [
+    b"--otro\r\n\r\ndatos\r\n--otro--\r\n",
+    b"--limite\r\nContent-Disposition: form-data; name=\"a\"\r\n\r\nsin cierre",
+], ids=['sin-delimitador', 'sin-cierre'])
+def test_invalid_multipart_is_rejected(tmp_path, body):
+    with pytest.raises(RequestError, match="multipart"):
+        CombineRequestHandler._parse_multipart(io.BytesIO(body), "multipart/form-data; boundary=limite",
+                                               str(tmp_path))
+
+
+def test_large_text_fields_are_rejected(tmp_path):
+    body, content_type = multipart([('titles', None, b"x" * (http_server.MAX_FIELD_SIZE + 1))])
+    with pytest.raises(RequestError, match="demasiado grande"):
+        CombineRequestHandler._parse_multipart(io.BytesIO(body), content_type, str(tmp_path))
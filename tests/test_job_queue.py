@@ -0,0 +1,259 @@
+"""
+Pruebas de la cola persistente: concesiones, recuperación, reintentos y
+procesos de trabajo que mueren a mitad de una combinación.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import core.job_queue as job_queue
+from core.batch_runner import BatchJob, run_job
+from core.job_queue import DONE, FAILED, PENDING, RUNNING, JobQueue, _owner_alive, run_queue
+from pdf_utils import AdvancedPDFCombiner
+
+CRASH_JOB_ID = 'crash'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def open_queue(db_path):
+    """Fábrica de colas sobre la misma base de datos: cada una es un proceso dueño distinto"""
+    queues = []
+
+    def open_(**options):
+        options.setdefault('retry_delay', 0)
+        queue = JobQueue(db_path, **options)
+        queues.append(queue)
+        return queue
+
+    yield open_
+    for queue in queues:
+        queue.close()
+
+
+def make_job(tmp_path, job_id='1', files=None):
+    return BatchJob(job_id, files or [str(tmp_path / "missing.pdf")], str(tmp_path / f"out_{job_id}.pdf"))
+
+
+def dead_pid():
+    """PID de un proceso que ya terminó"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def set_lease_owner(queue, job_id, owner):
+    with queue._transaction() as conn:
+        conn.execute("UPDATE jobs SET lease_owner = ? WHERE job_id = ?", (owner, job_id))
+
+
+def job_status(queue, job_id):
+    return {job['id']: job for job in queue.jobs()}[job_id]
+
+
+# ------------------------------------------------------------------ concesiones
+
+def test_enqueue_ignores_known_ids(open_queue, tmp_path):
+    queue = open_queue()
+    assert queue.enqueue([make_job(tmp_path, '1'), make_job(tmp_path, '2')]) == 2
+    assert queue.enqueue([make_job(tmp_path, '2'), make_job(tmp_path, '3')]) == 1
+    assert queue.counts()[PENDING] == 3
+
+
+def test_claimed_job_is_not_claimed_twice(open_queue, tmp_path):
+    first, second = open_queue(), open_queue()
+    first.enqueue([make_job(tmp_path)])
+    assert len(first.claim(5)) == 1
+    assert second.claim(5) == []
+    assert job_status(first, '1')['status'] == RUNNING
+
+
+def test_expired_lease_is_reclaimed(open_queue, tmp_path):
+    first = open_queue(lease_seconds=0.05)
+    second = open_queue(lease_seconds=60)
+    first.enqueue([make_job(tmp_path)])
+    [claimed] = first.claim()
+    assert claimed.attempts == 1
+
+    time.sleep(0.1)
+    [reclaimed] = second.claim()
+    assert reclaimed.job.job_id == '1'
+    assert reclaimed.attempts == 2
+
+    # El dueño anterior ya no puede cerrar el trabajo
+    first.complete('1')
+    assert first.fail('1', "tarde") == RUNNING
+    assert job_status(second, '1')['status'] == RUNNING
+    second.complete('1', {'pages': 1})
+    assert job_status(second, '1')['status'] == DONE
+
+
+def test_renewed_lease_is_not_reclaimed(open_queue, tmp_path):
+    first = open_queue(lease_seconds=0.3)
+    second = open_queue()
+    first.enqueue([make_job(tmp_path)])
+    first.claim()
+    time.sleep(0.2)
+    first.renew(['1'])
+    time.sleep(0.2)
+    assert second.claim() == []
+    time.sleep(0.2)
+    assert len(second.claim()) == 1
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(open_queue, tmp_path):
+    first = open_queue(lease_seconds=0.05, max_attempts=1)
+    second = open_queue()
+    first.enqueue([make_job(tmp_path)])
+    first.claim()
+    time.sleep(0.1)
+    assert second.claim() == []
+    job = job_status(second, '1')
+    assert job['status'] == FAILED
+    assert job['attempts'] == 1
+    assert job['error']
+
+
+# ------------------------------------------------------------------ recuperación
+
+def test_owner_alive():
+    host = socket.gethostname()
+    assert not _owner_alive(None, 'yo')
+    assert _owner_alive('yo', 'yo')
+    assert not _owner_alive('sin formato', 'yo')
+    assert _owner_alive(f"{host}:{os.getpid()}:abcd", 'yo')
+    assert _owner_alive(f"{host}:{os.getppid()}:abcd", 'yo')
+    assert not _owner_alive(f"{host}:{dead_pid()}:abcd", 'yo')
+    # En otro equipo no se puede comprobar: se confía en la concesión
+    assert _owner_alive(f"otro-{host}:{dead_pid()}:abcd", 'yo')
+
+
+def test_recover_requeues_jobs_of_dead_owner(open_queue, tmp_path):
+    crashed = open_queue(lease_seconds=60)
+    crashed.enqueue([make_job(tmp_path, '1'), make_job(tmp_path, '2')])
+    crashed.claim(2)
+    host = socket.gethostname()
+    set_lease_owner(crashed, '1', f"{host}:{dead_pid()}:abcd")
+    set_lease_owner(crashed, '2', f"{host}:{os.getppid()}:abcd")
+
+    # Salida y temporales a medias del trabajo interrumpido
+    output = make_job(tmp_path, '1').output_path
+    leftovers = [output] + AdvancedPDFCombiner.temp_outputs(output)
+    for path in leftovers:
+        with open(path, 'wb') as file:
+            file.write(b'%PDF-1.7 a medias')
+
+    runner = open_queue(lease_seconds=60)
+    assert runner.recover() == ['1']
+    assert job_status(runner, '1')['status'] == PENDING
+    assert job_status(runner, '2')['status'] == RUNNING
+    assert not any(os.path.exists(path) for path in leftovers)
+    assert [queued.job.job_id for queued in runner.claim(5)] == ['1']
+
+
+def test_recover_requeues_expired_leases(open_queue, tmp_path):
+    crashed = open_queue(lease_seconds=0.05)
+    crashed.enqueue([make_job(tmp_path)])
+    crashed.claim()
+    set_lease_owner(crashed, '1', f"otro-{socket.gethostname()}:1:abcd")
+    time.sleep(0.1)
+    assert open_queue().recover() == ['1']
+
+
+# ------------------------------------------------------------------ reintentos
+
+def test_retry_after_doubles_up_to_the_limit(open_queue):
+    queue = open_queue(retry_delay=2, retry_max_delay=10)
+    assert [queue.retry_after(attempts) for attempts in range(0, 6)] == [2, 2, 4, 8, 10, 10]
+
+
+def test_failed_attempts_back_off_until_max_attempts(open_queue, tmp_path):
+    queue = open_queue(max_attempts=3, retry_delay=0.1, retry_max_delay=0.15)
+    queue.enqueue([make_job(tmp_path)])
+
+    delays = []
+    for attempt in range(1, 4):
+        [claimed] = queue.claim()
+        assert claimed.attempts == attempt
+        failed_at = time.time()
+        status = queue.fail('1', f"fallo {attempt}")
+        if attempt < 3:
+            assert status == PENDING
+            available_at = job_status(queue, '1')['available_at']
+            delays.append(available_at - failed_at)
+            # No se reintenta antes de tiempo
+            assert queue.claim() == []
+            time.sleep(max(available_at - time.time(), 0) + 0.01)
+        else:
+            assert status == FAILED
+
+    assert delays[0] == pytest.approx(0.1, abs=0.05)
+    assert delays[1] == pytest.approx(0.15, abs=0.05)
+    job = job_status(queue, '1')
+    assert job['status'] == FAILED
+    assert job['attempts'] == 3
+    assert job['error'] == "fallo 3"
+    assert queue.claim() == []
+    assert queue.next_available() is None
+
+
+# ------------------------------------------------------------------ run_queue
+
+def test_run_queue_retries_failures_and_completes_jobs(open_queue, tmp_path, make_pdfs):
+    files = make_pdfs([1, 2])
+    queue = open_queue(max_attempts=2)
+    good = make_job(tmp_path, 'good', files)
+    bad = make_job(tmp_path, 'bad')
+    queue.enqueue([good, bad])
+
+    results = []
+    summary = run_queue(queue, workers=1, poll_interval=0.05,
+                        on_result=lambda result, status: results.append((result.job_id, status)))
+
+    assert summary == {DONE: 1, PENDING: 1, FAILED: 1}
+    assert sorted(results) == [('bad', FAILED), ('bad', PENDING), ('good', DONE)]
+    assert os.path.exists(good.output_path)
+    assert not os.path.exists(bad.output_path)
+    assert job_status(queue, 'good')['status'] == DONE
+
+
+def crash_or_run(job, options=None):
+    """Sustituto de run_job: el trabajo CRASH_JOB_ID deja salida a medias y mata su proceso"""
+    if job.job_id == CRASH_JOB_ID:
+        for path in [job.output_path] + AdvancedPDFCombiner.temp_outputs(job.output_path):
+            with open(path, 'wb') as file:
+                file.write(b'%PDF-1.7 a medias')
+        os._exit(1)
+    return run_job(job, options)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="los procesos del pool deben heredar el parche (fork)")
+def test_run_queue_survives_a_dead_worker(open_queue, tmp_path, make_pdfs, monkeypatch):
+    monkeypatch.setattr(job_queue, 'run_job', crash_or_run)
+    files = make_pdfs([1])
+    queue = open_queue(max_attempts=2)
+    crash = make_job(tmp_path, CRASH_JOB_ID, files)
+    good = make_job(tmp_path, 'good', files)
+    queue.enqueue([crash, good])
+
+    results = []
+    summary = run_queue(queue, workers=1, poll_interval=0.05,
+                        on_result=lambda result, status: results.append((result.job_id, status, result.error)))
+
+    assert summary == {DONE: 1, PENDING: 1, FAILED: 1}
+    crash_results = [(status, error) for job_id, status, error in results if job_id == CRASH_JOB_ID]
+    assert [status for status, _ in crash_results] == [PENDING, FAILED]
+    assert all("terminó inesperadamente" in error for _, error in crash_results)
+    # La salida a medias del proceso muerto se elimina y el pool se vuelve a crear
+    leftovers = [crash.output_path] + AdvancedPDFCombiner.temp_outputs(crash.output_path)
+    assert not any(os.path.exists(path) for path in leftovers)
+    assert os.path.exists(good.output_path)
+    assert job_status(queue, 'good')['status'] == DONE
@@ -0,0 +1,121 @@
+"""
+Tests for inputs that are not paths: bytes, bytearray, memoryview and
+caller-owned file objects, through AdvancedPDFCombiner and the service.
+"""
+import io
+
+import fitz
+import pytest
+
+from conftest import page_label
+from core.pdf_combiner import PDFCombinerError, PDFCombinerService
+from pdf_utils import AdvancedPDFCombiner, MERGE_BACKENDS
+
+PAGE_COUNTS = [2, 1, 3]
+TITLES = ["Bytes", "Array", "Other"]
+INPUT_KINDS = ['bytes', 'bytearray', 'memoryview', 'bytesio', 'file']
+
+
+@pytest.fixture
+def to_input(request):
+    """Factory: the contents of a PDF path as the given kind of input."""
+    opened = []
+
+    def convert(path, kind):
+        if kind == 'file':
+            opened.append(open(path, 'rb'))
+            return opened[-1]
+        with open(path, 'rb') as file:
+            data = file.read()
+        return {'bytes': data, 'bytearray': bytearray(data), 'memoryview': memoryview(data),
+                'bytesio': io.BytesIO(data)}[kind]
+
+    yield convert
+    for file in opened:
+        file.close()
+
+
+def first_lines(output):
+    with fitz.open(output) as doc:
+        return [page.get_text().splitlines()[0] for page in doc]
+
+
+def expected_labels(page_counts):
+    return [page_label(f"doc{n}", page)
+            for n, count in enumerate(page_counts, 1) for page in range(1, count + 1)]
+
+
+@pytest.mark.parametrize('backend', sorted(MERGE_BACKENDS))
+@pytest.mark.parametrize('kind', INPUT_KINDS)
+def test_each_input_kind_merges_with_index(tmp_path, make_pdfs, to_input, backend, kind):
+    paths = make_pdfs(PAGE_COUNTS)
+    # A path among the in-memory inputs
+    files = [to_input(paths[0], kind), paths[1], to_input(paths[2], kind)]
+    output = tmp_path / "merged.pdf"
+    combiner = AdvancedPDFCombiner(files, TITLES, backend=backend)
+    combiner.combine_with_index(str(output))
+
+    assert first_lines(output)[1:] == expected_labels(PAGE_COUNTS)
+    with fitz.open(str(output)) as doc:
+        assert [title for _, title, _ in doc.get_toc()][2:] == [
+            f"📄 {n}: {title}" for n, title in enumerate(TITLES, 1)]
+    # Only paths get a whole-document page count
+    assert combiner.page_counts == {paths[1]: 1}
+
+
+@pytest.mark.parametrize('kind', INPUT_KINDS)
+def test_service_merges_each_input_kind(tmp_path, make_pdfs, to_input, kind):
+    paths = make_pdfs(PAGE_COUNTS)
+    files = [to_input(path, kind) for path in paths]
+    output = tmp_path / "merged.pdf"
+    PDFCombinerService().combine(files, str(output), create_index=False, titles=TITLES)
+    assert first_lines(output) == expected_labels(PAGE_COUNTS)
+
+
+def test_titles_are_required_for_non_path_inputs(tmp_path, make_pdfs):
+    paths = make_pdfs([1, 1])
+    with open(paths[0], 'rb') as file:
+        data = file.read()
+
+    with pytest.raises(ValueError, match="titles are required"):
+        AdvancedPDFCombiner([data, paths[1]])
+    with pytest.raises(PDFCombinerError, match="títulos"):
+        PDFCombinerService().combine([data, paths[1]], str(tmp_path / "merged.pdf"))
+    assert not (tmp_path / "merged.pdf").exists()
+
+
+@pytest.mark.parametrize('backend', sorted(MERGE_BACKENDS))
+def test_caller_files_are_rewound_and_left_open(tmp_path, make_pdfs, backend):
+    paths = make_pdfs([2, 1])
+    with open(paths[0], 'rb') as first, open(paths[1], 'rb') as second:
+        # Positions left elsewhere by the caller, and one file used twice
+        first.seek(100)
+        second.read()
+        output = tmp_path / "merged.pdf"
+        AdvancedPDFCombiner([first, second, first], ["A", "B", "A"], backend=backend).combine_simple(str(output))
+
+        assert not first.closed and not second.closed
+        assert first_lines(output) == expected_labels([2, 1]) + expected_labels([2])
+        first.seek(0)
+        assert first.read(5) == b'%PDF-'
+
+
+def test_validate_files_checks_the_pdf_header(make_pdfs):
+    [path] = make_pdfs([1])
+    with open(path, 'rb') as file:
+        data = file.read()
+    service = PDFCombinerService()
+
+    assert service.validate_files([data, bytearray(data), memoryview(data), io.BytesIO(data), path]) == []
+    assert service.validate_files([b'not a pdf', path, io.BytesIO(b'GIF89a')]) == [
+        "Entrada 1: No es un archivo PDF", "Entrada 3: No es un archivo PDF"]
+    assert service.validate_files([object()]) == ["Entrada 1: Tipo de entrada no soportado: object"]
+
+
+def test_validate_files_rewinds_file_objects(make_pdfs):
+    [path] = make_pdfs([1])
+    with open(path, 'rb') as file:
+        file.seek(50)
+        assert PDFCombinerService().validate_files([file]) == []
+        assert file.tell() == 0
+        assert not file.closed
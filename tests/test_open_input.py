@@ -0,0 +1,66 @@
+"""
+Tests for open_input/open_reader: memory-mapped and in-memory inputs give
+PyPDF2 bytes; only the streaming writer gets zero-copy stream data.
+"""
+import fitz
+import pytest
+import PyPDF2
+
+from pdf_utils import AdvancedPDFCombiner, BufferInput, MappedInput, open_input, open_reader
+
+LABEL = "large content stream"
+
+
+@pytest.fixture
+def large_stream_pdf(tmp_path):
+    """One page whose uncompressed content stream is well over ZERO_COPY_MIN."""
+    from reportlab.pdfgen import canvas
+
+    path = tmp_path / "large.pdf"
+    c = canvas.Canvas(str(path), pageCompression=0)
+    c.setFont("Helvetica", 6)
+    for line in range(2500):
+        c.drawString(10, 10 + (line % 120) * 6, f"line {line}")
+    c.setFont("Helvetica", 14)
+    c.drawString(72, 800, LABEL)
+    c.showPage()
+    c.save()
+    return str(path)
+
+
+def test_content_stream_is_large(large_stream_pdf):
+    with fitz.open(large_stream_pdf) as doc:
+        assert len(doc[0].read_contents()) >= BufferInput.ZERO_COPY_MIN
+
+
+@pytest.mark.parametrize('source', ['path', 'bytes'])
+def test_pypdf2_gets_bytes(large_stream_pdf, source):
+    if source == 'bytes':
+        with open(large_stream_pdf, 'rb') as file:
+            source = file.read()
+    else:
+        source = large_stream_pdf
+
+    with open_input(source) as file:
+        assert isinstance(file, MappedInput if source == large_stream_pdf else BufferInput)
+        page = open_reader(PyPDF2, file).pages[0]
+        contents = page.get_contents()
+        assert isinstance(contents.get_data(), bytes)
+        assert len(contents.get_data()) >= BufferInput.ZERO_COPY_MIN
+        assert LABEL in page.extract_text()
+        assert file.zero_copy_bytes == 0
+
+
+def test_zero_copy_reader_passes_memoryviews(large_stream_pdf):
+    with open_input(large_stream_pdf) as file:
+        page = open_reader(PyPDF2, file, zero_copy=True).pages[0]
+        assert isinstance(page.get_contents()._data, memoryview)
+        assert file.zero_copy_bytes >= BufferInput.ZERO_COPY_MIN
+
+
+@pytest.mark.parametrize('backend', ['pypdf2', 'stream'])
+def test_merged_large_stream_round_trip(tmp_path, large_stream_pdf, backend):
+    output = tmp_path / "merged.pdf"
+    AdvancedPDFCombiner([large_stream_pdf, large_stream_pdf], backend=backend).combine_simple(str(output))
+    reader = PyPDF2.PdfReader(str(output))
+    assert [LABEL in page.extract_text() for page in reader.pages] == [True, True]
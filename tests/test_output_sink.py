@@ -0,0 +1,90 @@
+"""
+Tests for OutputSink: partial writes, full non-blocking outputs and writers that stall.
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+from pdf_utils import OutputSink
+
+DATA = bytes(range(256)) * 4096  # 1 MiB
+
+
+class TrickleWriter:
+    """Accepts at most ``limit`` bytes per call."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.received = bytearray()
+
+    def write(self, data):
+        chunk = bytes(data[:self.limit])
+        self.received += chunk
+        return len(chunk)
+
+
+class StalledWriter:
+    """Never accepts anything and has no descriptor to wait on."""
+
+    def write(self, data):
+        return 0
+
+
+class NoneWriter:
+    """Writers that return None from write() have taken everything."""
+
+    def __init__(self):
+        self.received = bytearray()
+
+    def write(self, data):
+        self.received += data
+
+
+def test_partial_writes_are_retried():
+    writer = TrickleWriter(1000)
+    with OutputSink(writer, buffer_size=4096) as sink:
+        sink.write(DATA[:100])
+        sink.write(DATA[100:])
+    assert writer.received == DATA
+    assert sink.tell() == len(DATA)
+
+
+def test_none_from_a_buffered_writer_means_everything_was_written():
+    writer = NoneWriter()
+    with OutputSink(writer, buffer_size=4096) as sink:
+        sink.write(DATA)
+    assert writer.received == DATA
+
+
+def test_stalled_writer_raises_instead_of_spinning():
+    sink = OutputSink(StalledWriter(), buffer_size=16)
+    with pytest.raises(OSError):
+        sink.write(DATA[:64])
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="select() only waits on sockets on Windows")
+def test_full_non_blocking_pipe_is_waited_on():
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+    received = bytearray()
+
+    def drain():
+        with open(read_fd, 'rb', buffering=0) as reader:
+            while True:
+                chunk = reader.read(4096)
+                if not chunk:
+                    break
+                received.extend(chunk)
+
+    # The pipe holds far less than DATA: writes return None or short counts until it drains
+    thread = threading.Thread(target=drain)
+    thread.start()
+    with open(write_fd, 'wb', buffering=0) as pipe:
+        with OutputSink(pipe, buffer_size=8192) as sink:
+            for start in range(0, len(DATA), 3000):
+                sink.write(DATA[start:start + 3000])
+            sink.write(DATA)
+    thread.join(timeout=30)
+    assert bytes(received) == DATA + DATA
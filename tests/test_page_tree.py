@@ -0,0 +1,80 @@
+"""
+Tests for PageTree: page lookup by /Count without flattening the tree.
+"""
+from io import BytesIO
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_utils import PageRanges, PageTree, select_pages
+
+
+def build_pdf(objects):
+    """Serialize ``{number: body}`` into a PDF with a classic xref; object 1 is the catalog."""
+    out = BytesIO()
+    out.write(b'%PDF-1.7\n')
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = out.tell()
+        out.write(f'{number} 0 obj\n{objects[number]}\nendobj\n'.encode('ascii'))
+    xref = out.tell()
+    size = max(objects) + 1
+    out.write(f'xref\n0 {size}\n0000000000 65535 f \n'.encode('ascii'))
+    for number in range(1, size):
+        out.write(f'{offsets[number]:010d} 00000 n \n'.encode('ascii'))
+    out.write(f'trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('ascii'))
+    return out.getvalue()
+
+
+def page(name, parent):
+    return f'<< /Type /Page /Parent {parent} 0 R /Name ({name}) >>'
+
+
+def names(reader, indices):
+    tree = PageTree(reader)
+    return [tree.page(index)['/Name'] for index in indices]
+
+
+def test_flat_tree():
+    pdf = build_pdf({
+        1: '<< /Type /Catalog /Pages 2 0 R >>',
+        2: '<< /Type /Pages /Count 3 /Kids [3 0 R 4 0 R 5 0 R] /MediaBox [0 0 200 100] >>',
+        3: page('A', 2), 4: page('B', 2), 5: page('C', 2),
+    })
+    reader = PdfReader(BytesIO(pdf))
+    assert names(reader, [2, 0, 1]) == ['C', 'A', 'B']
+    # Inherited attributes are applied to the page
+    assert [float(v) for v in PageTree(reader).page(1)['/MediaBox']] == [0, 0, 200, 100]
+
+
+def test_empty_pages_node_next_to_a_subtree():
+    # /Count equals len(/Kids), but kid 1 is page A and kid 2 holds B and C
+    pdf = build_pdf({
+        1: '<< /Type /Catalog /Pages 2 0 R >>',
+        2: '<< /Type /Pages /Count 3 /Kids [3 0 R 4 0 R 5 0 R] >>',
+        3: '<< /Type /Pages /Parent 2 0 R /Count 0 /Kids [] >>',
+        4: page('A', 2),
+        5: '<< /Type /Pages /Parent 2 0 R /Count 2 /Kids [6 0 R 7 0 R] >>',
+        6: page('B', 5), 7: page('C', 5),
+    })
+    reader = PdfReader(BytesIO(pdf))
+    assert names(reader, [0, 1, 2]) == ['A', 'B', 'C']
+    assert [p['/Name'] for p in reader.pages] == ['A', 'B', 'C']
+
+
+def test_nested_tree_with_empty_nodes():
+    pdf = build_pdf({
+        1: '<< /Type /Catalog /Pages 2 0 R >>',
+        2: '<< /Type /Pages /Count 4 /Kids [3 0 R 4 0 R 8 0 R] >>',
+        3: '<< /Type /Pages /Parent 2 0 R /Count 2 /Kids [5 0 R 6 0 R] >>',
+        4: '<< /Type /Pages /Parent 2 0 R /Count 0 /Kids [] >>',
+        5: page('A', 3), 6: page('B', 3),
+        7: page('D', 8),
+        8: '<< /Type /Pages /Parent 2 0 R /Count 2 /Kids [9 0 R 7 0 R] >>',
+        9: page('C', 8),
+    })
+    reader = PdfReader(BytesIO(pdf))
+    assert names(reader, [3, 2, 1, 0]) == ['D', 'C', 'B', 'A']
+    assert [p['/Name'] for p in select_pages(reader, PageRanges("2-3,-1"))] == ['B', 'C', 'D']
+    with pytest.raises(IndexError):
+        PageTree(reader).page(4)
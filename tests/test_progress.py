@@ -0,0 +1,145 @@
+"""
+Tests for merge progress events and cancellation: per-page and per-chunk
+events, timeouts inside a single input or the write, and removal of the
+partial output.
+"""
+import itertools
+import os
+import time
+
+import pytest
+
+from core.pdf_combiner import PDFCombinerCancelled, PDFCombinerService
+from pdf_utils import MERGE_STAGES, AdvancedPDFCombiner, CancellationToken, MergeCancelled
+
+# Backends that report and check per page and per written chunk
+PAGED_BACKENDS = ['pypdf2', 'stream']
+
+
+@pytest.fixture
+def noisy_pdfs(tmp_path, make_pdfs):
+    """Two 3-page PDFs with a different incompressible image each (about 3 MiB merged)."""
+    from PIL import Image
+
+    paths = []
+    for n in (1, 2):
+        image = tmp_path / f"noise{n}.png"
+        Image.frombytes("RGB", (640, 640), os.urandom(640 * 640 * 3)).save(image)
+        paths += make_pdfs([3], image=str(image), directory=f"noisy{n}")
+    return paths
+
+
+def expire(token):
+    """Make a token with a timeout count as timed out from now on."""
+    token.deadline = time.monotonic()
+
+
+def stages(events):
+    return [stage for stage, _ in itertools.groupby(event.stage for event in events)]
+
+
+@pytest.mark.parametrize('backend', PAGED_BACKENDS)
+def test_events_per_page_and_per_chunk(tmp_path, noisy_pdfs, make_pdfs, backend):
+    files = noisy_pdfs + make_pdfs([2])
+    events = []
+    output = tmp_path / "merged.pdf"
+    AdvancedPDFCombiner(files, ["A", "B", "C"], backend=backend,
+                        progress_callback=events.append).combine_with_index(str(output))
+
+    assert stages(events) == list(MERGE_STAGES)
+    content = [event for event in events if event.stage == 'content']
+    # One event per page plus one when each input is complete
+    assert len(content) == 8 + 3
+    assert [event.pages_done for event in content] == [1, 2, 3, 3, 4, 5, 6, 6, 7, 8, 8]
+    assert [event.file_index for event in content] == [-1] * 3 + [0] * 4 + [1] * 3 + [2]
+    assert events[-1].pages_done == 9
+    assert events[-1].bytes_written == os.path.getsize(output)
+
+    written = [event.bytes_written for event in events if event.stage in ('write', 'done')]
+    assert written == sorted(written)
+    if backend == 'pypdf2':
+        # The whole output is written in the write stage, one event per chunk
+        assert len(written) > 3
+        assert written[0] == 0 < written[1]
+
+
+def test_pymupdf_reports_per_input(tmp_path, make_pdfs):
+    events = []
+    AdvancedPDFCombiner(make_pdfs([2, 1, 3]), ["A", "B", "C"], backend='pymupdf',
+                        progress_callback=events.append).combine_with_index(str(tmp_path / "merged.pdf"))
+    assert [(event.stage, event.file_index, event.pages_done) for event in events] == [
+        ('start', -1, 0), ('content', 0, 2), ('content', 1, 3), ('content', 2, 6),
+        ('index', 2, 7), ('write', 2, 7), ('done', 2, 7)]
+
+
+@pytest.mark.parametrize('backend', PAGED_BACKENDS)
+def test_timeout_stops_a_single_input(tmp_path, make_pdfs, backend):
+    [big] = make_pdfs([40])
+    token = CancellationToken(timeout=3600)
+    events = []
+
+    def progress(event):
+        events.append(event)
+        if event.pages_done == 5:
+            expire(token)
+
+    output = tmp_path / "merged.pdf"
+    combiner = AdvancedPDFCombiner([big], backend=backend, progress_callback=progress, cancel_token=token)
+    with pytest.raises(MergeCancelled, match="timed out"):
+        combiner.combine_simple(str(output))
+
+    assert events[-1].pages_done == 5
+    assert events[-1].file_index == -1
+    assert not output.exists()
+
+
+@pytest.mark.parametrize('backend', PAGED_BACKENDS)
+def test_cancel_during_write_removes_partial_output(tmp_path, noisy_pdfs, backend):
+    token = CancellationToken()
+    events = []
+
+    def progress(event):
+        events.append(event)
+        if event.stage == 'write' and event.bytes_written > 0:
+            token.cancel()
+
+    output = tmp_path / "merged.pdf"
+    combiner = AdvancedPDFCombiner(noisy_pdfs, ["A", "B"], backend=backend,
+                                   progress_callback=progress, cancel_token=token)
+    with pytest.raises(MergeCancelled, match="cancelled"):
+        combiner.combine_with_index(str(output))
+
+    assert events[-1].stage == 'write'
+    assert 'done' not in stages(events)
+    assert not output.exists()
+
+
+@pytest.mark.parametrize('backend', ['pypdf2', 'pymupdf'])
+def test_cancel_before_writing_keeps_an_existing_output(tmp_path, make_pdfs, backend):
+    output = tmp_path / "merged.pdf"
+    output.write_bytes(b"previous contents")
+    token = CancellationToken()
+
+    def progress(event):
+        if event.stage == 'content' and event.file_index == 0:
+            token.cancel()
+
+    combiner = AdvancedPDFCombiner(make_pdfs([2, 2]), ["A", "B"], backend=backend,
+                                   progress_callback=progress, cancel_token=token)
+    with pytest.raises(MergeCancelled):
+        combiner.combine_with_index(str(output))
+    assert output.read_bytes() == b"previous contents"
+
+
+def test_service_reports_timeout_and_removes_output(tmp_path, make_pdfs):
+    token = CancellationToken(timeout=3600)
+
+    def progress(event):
+        if event.pages_done == 3:
+            expire(token)
+
+    output = tmp_path / "merged.pdf"
+    with pytest.raises(PDFCombinerCancelled, match="Tiempo límite agotado"):
+        PDFCombinerService().combine(make_pdfs([20]), str(output), create_index=False, backend='stream',
+                                     progress_callback=progress, cancel_token=token)
+    assert not output.exists()
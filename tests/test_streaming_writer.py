@@ -0,0 +1,271 @@
+"""
+Round-trip tests for StreamingPDFWriter (the 'stream' merge backend).
+
+Every output is reopened with PyPDF2 and PyMuPDF and checked page by page:
+page count, text, outline and index link targets, resource deduplication
+and, for the compact profile, the xref stream and object streams.
+"""
+import re
+import zlib
+
+import fitz
+import pytest
+from PyPDF2 import PdfReader
+
+from conftest import page_label
+from pdf_utils import AdvancedPDFCombiner, ENTRY_BOOKMARK_PATTERN
+
+PAGE_COUNTS = [2, 3, 1]
+TITLES = ["First", "Second", "Third"]
+PROFILES = ['classic', 'compact']
+
+
+def merge(files, output, indexed=True, **options):
+    combiner = AdvancedPDFCombiner(files, TITLES[:len(files)], backend='stream', **options)
+    if indexed:
+        combiner.combine_with_index(str(output))
+    else:
+        combiner.combine_simple(str(output))
+    return combiner
+
+
+def expected_labels(page_counts):
+    return [page_label(f"doc{n}", page)
+            for n, count in enumerate(page_counts, 1) for page in range(1, count + 1)]
+
+
+def pypdf2_page_numbers(reader):
+    return {page.indirect_reference.idnum: number for number, page in enumerate(reader.pages)}
+
+
+def pypdf2_outline(reader, items=None):
+    """Flattened (title, page index) pairs of the outline."""
+    flat = []
+    for item in reader.outline if items is None else items:
+        if isinstance(item, list):
+            flat.extend(pypdf2_outline(reader, item))
+        else:
+            flat.append((item.title, reader.get_destination_page_number(item)))
+    return flat
+
+
+def pypdf2_link_targets(reader, page_index):
+    numbers = pypdf2_page_numbers(reader)
+    targets = []
+    for annot in reader.pages[page_index].get('/Annots') or []:
+        annot = annot.get_object()
+        if annot.get('/Subtype') == '/Link':
+            targets.append(numbers[annot['/Dest'][0].idnum])
+    return targets
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+@pytest.mark.parametrize('dedup', [False, True])
+def test_pages_and_text_round_trip(tmp_path, make_pdfs, shared_image, profile, dedup):
+    files = make_pdfs(PAGE_COUNTS, shared_image)
+    output = tmp_path / "merged.pdf"
+    merge(files, output, indexed=False, dedup=dedup, output_profile=profile)
+    labels = expected_labels(PAGE_COUNTS)
+
+    reader = PdfReader(str(output), strict=True)
+    assert len(reader.pages) == len(labels)
+    for page, label in zip(reader.pages, labels):
+        assert label in page.extract_text()
+
+    with fitz.open(str(output)) as doc:
+        assert doc.page_count == len(labels)
+        assert not doc.is_repaired
+        assert [page.get_text().splitlines()[0] for page in doc] == labels
+        for page in doc:
+            assert len(page.get_images()) == 1
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+def test_page_ranges_round_trip(tmp_path, make_pdfs, profile):
+    files = make_pdfs(PAGE_COUNTS)
+    output = tmp_path / "merged.pdf"
+    merge(files, output, indexed=False, output_profile=profile, page_ranges=["2", "3,1", None])
+
+    with fitz.open(str(output)) as doc:
+        assert [page.get_text().splitlines()[0] for page in doc] == [
+            page_label("doc1", 2), page_label("doc2", 3), page_label("doc2", 1), page_label("doc3", 1)]
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+def test_outline_and_index_links_point_at_documents(tmp_path, make_pdfs, profile):
+    files = make_pdfs(PAGE_COUNTS)
+    output = tmp_path / "merged.pdf"
+    combiner = merge(files, output, output_profile=profile)
+    index_pages = combiner.layout.page_count
+    # 0-based page index of the first page of each document
+    starts = [start - 1 for start in combiner.start_pages]
+    assert starts == [index_pages, index_pages + 2, index_pages + 5]
+
+    with fitz.open(str(output)) as doc:
+        assert doc.page_count == index_pages + sum(PAGE_COUNTS)
+        for start, n in zip(starts, range(1, 4)):
+            assert doc[start].get_text().splitlines()[0] == page_label(f"doc{n}", 1)
+
+        entries = [(title, page - 1) for _, title, page in doc.get_toc()
+                   if ENTRY_BOOKMARK_PATTERN.match(title)]
+        assert entries == [(f"📄 {n}: {title}", start)
+                           for n, (title, start) in enumerate(zip(TITLES, starts), 1)]
+
+        link_targets = [link['page'] for page in doc.pages(0, index_pages) for link in page.get_links()]
+        assert link_targets == starts
+
+    reader = PdfReader(str(output), strict=True)
+    outline = dict(pypdf2_outline(reader))
+    for n, (title, start) in enumerate(zip(TITLES, starts), 1):
+        assert outline[f"📄 {n}: {title}"] == start
+    assert [target for page in range(index_pages) for target in pypdf2_link_targets(reader, page)] == starts
+
+
+def count_objects(path):
+    with fitz.open(str(path)) as doc:
+        return sum(1 for xref in range(1, doc.xref_length()) if doc.xref_object(xref) != 'null')
+
+
+def count_by_key(path, key, value):
+    with fitz.open(str(path)) as doc:
+        return sum(1 for xref in range(1, doc.xref_length()) if doc.xref_get_key(xref, key) == value)
+
+
+def test_dedup_writes_shared_resources_once(tmp_path, make_pdfs, shared_image):
+    files = make_pdfs(PAGE_COUNTS, shared_image)
+    plain = tmp_path / "plain.pdf"
+    deduped = tmp_path / "deduped.pdf"
+    merge(files, plain, indexed=False)
+    combiner = merge(files, deduped, indexed=False, dedup=True)
+    stats = combiner.report['dedup']
+
+    assert count_by_key(plain, 'Subtype', ('name', '/Image')) == len(files)
+    assert count_by_key(deduped, 'Subtype', ('name', '/Image')) == 1
+    assert count_by_key(plain, 'BaseFont', ('name', '/Helvetica')) == len(files)
+    assert count_by_key(deduped, 'BaseFont', ('name', '/Helvetica')) == 1
+
+    # Every reused resource is one object fewer in the output
+    assert stats['seen'] - stats['written'] == count_objects(plain) - count_objects(deduped)
+    # The image and the font of inputs 2 and 3 are reused
+    assert stats['seen'] - stats['written'] == 2 * (len(files) - 1)
+    with fitz.open(str(deduped)) as doc:
+        image_xref = doc[0].get_images()[0][0]
+        assert stats['bytes_saved'] >= (len(files) - 1) * len(doc.xref_stream_raw(image_xref))
+    assert combiner.report['bytes_written'] == deduped.stat().st_size
+
+
+def test_dedup_keeps_distinct_content_streams(tmp_path, make_pdfs, shared_image):
+    # Same image, different text: the content streams must not be merged
+    files = make_pdfs([1, 1], shared_image)
+    output = tmp_path / "merged.pdf"
+    merge(files, output, indexed=False, dedup=True)
+    with fitz.open(str(output)) as doc:
+        assert [page.get_text().splitlines()[0] for page in doc] == expected_labels([1, 1])
+
+
+# ----------------------------------------------------------------- xref parsing
+
+def read_object_header(data, offset):
+    """(object number, dictionary bytes, stream bytes or None) of the object at ``offset``."""
+    match = re.compile(rb'(\d+) 0 obj\s*').match(data, offset)
+    assert match, f"no object at offset {offset}"
+    start = match.end()
+    stream_at = data.find(b'stream', start)
+    end = data.index(b'endobj', start)
+    if stream_at == -1 or stream_at > end:
+        return int(match.group(1)), data[start:end], None
+    dictionary = data[start:stream_at]
+    length = int(re.search(rb'/Length (\d+)', dictionary).group(1))
+    stream_start = stream_at + len(b'stream')
+    stream_start += 2 if data.startswith(b'\r\n', stream_start) else 1
+    assert data[stream_start + length:].lstrip(b'\r\n').startswith(b'endstream')
+    return int(match.group(1)), dictionary, data[stream_start:stream_start + length]
+
+
+def parse_xref_stream(data):
+    """Entries {object number: (type, field2, field3)} of the final xref stream."""
+    offset = int(re.search(rb'startxref\s+(\d+)\s+%%EOF\s*$', data).group(1))
+    _, dictionary, stream = read_object_header(data, offset)
+    assert b'/Type /XRef' in dictionary
+    assert b'/Prev' not in dictionary
+    widths = [int(w) for w in re.search(rb'/W \[\s*(\d+) (\d+) (\d+)\s*\]', dictionary).groups()]
+    size = int(re.search(rb'/Size (\d+)', dictionary).group(1))
+    rows = zlib.decompress(stream)
+    row_size = sum(widths)
+    assert len(rows) == size * row_size
+
+    entries = {}
+    for number in range(size):
+        row = rows[number * row_size:(number + 1) * row_size]
+        fields, position = [], 0
+        for width in widths:
+            fields.append(int.from_bytes(row[position:position + width], 'big'))
+            position += width
+        entries[number] = tuple(fields)
+    return entries, dictionary
+
+
+def object_stream_members(data, offset):
+    """Object numbers packed in the object stream at ``offset``, in order."""
+    _, dictionary, stream = read_object_header(data, offset)
+    assert b'/Type /ObjStm' in dictionary
+    count = int(re.search(rb'/N (\d+)', dictionary).group(1))
+    first = int(re.search(rb'/First (\d+)', dictionary).group(1))
+    content = zlib.decompress(stream)
+    header = [int(value) for value in content[:first].split()]
+    assert len(header) == 2 * count
+    numbers = header[0::2]
+    object_offsets = header[1::2]
+    assert object_offsets == sorted(object_offsets) and object_offsets[0] == 0
+    return numbers
+
+
+def test_compact_xref_stream_parses_back(tmp_path, make_pdfs, shared_image):
+    files = make_pdfs(PAGE_COUNTS, shared_image)
+    output = tmp_path / "merged.pdf"
+    merge(files, output, output_profile='compact', dedup=True)
+    data = output.read_bytes()
+    entries, trailer = parse_xref_stream(data)
+
+    assert entries[0] == (0, 0, 0xffff)
+    in_file = {n: offset for n, (kind, offset, _) in entries.items() if kind == 1}
+    packed = {n: (stream, index) for n, (kind, stream, index) in entries.items() if kind == 2}
+    assert in_file and packed
+
+    # Offsets point at the right "N 0 obj" header
+    for number, offset in in_file.items():
+        assert read_object_header(data, offset)[0] == number
+
+    # Packed objects are at the recorded index of an object stream written to the file
+    members = {}
+    for number, (stream, index) in packed.items():
+        assert stream in in_file
+        if stream not in members:
+            members[stream] = object_stream_members(data, in_file[stream])
+        assert members[stream][index] == number
+
+    # The root and the page objects resolve through the xref stream
+    root = int(re.search(rb'/Root (\d+) 0 R', trailer).group(1))
+    assert root in packed
+    reader = PdfReader(str(output), strict=True)
+    assert len(reader.pages) == sum(PAGE_COUNTS) + 1
+    with fitz.open(str(output)) as doc:
+        assert not doc.is_repaired
+        assert doc.xref_length() == len(entries)
+
+
+def test_classic_xref_table_offsets(tmp_path, make_pdfs):
+    files = make_pdfs(PAGE_COUNTS)
+    output = tmp_path / "merged.pdf"
+    merge(files, output)
+    data = output.read_bytes()
+
+    offset = int(re.search(rb'startxref\s+(\d+)\s+%%EOF\s*$', data).group(1))
+    assert data[offset:offset + 4] == b'xref'
+    table = data[offset:].split(b'trailer')[0].splitlines()
+    first, size = (int(value) for value in table[1].split())
+    assert first == 0
+    for number, line in enumerate(table[2:2 + size]):
+        position, _, kind = line.split()
+        if kind == b'n':
+            assert read_object_header(data, int(position))[0] == number
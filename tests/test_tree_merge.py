@@ -0,0 +1,58 @@
+"""
+Pruebas de la combinación en árbol: el resultado debe ser el mismo que el
+de una combinación secuencial de las mismas entradas.
+"""
+import fitz
+import pytest
+
+from core.pdf_combiner import PDFCombinerService
+from pdf_utils import MERGE_BACKENDS
+
+
+def summary(path):
+    """Texto de cada página, marcadores y destino de cada enlace"""
+    with fitz.open(path) as doc:
+        return {
+            'pages': doc.page_count,
+            'text': [page.get_text() for page in doc],
+            'toc': doc.get_toc(),
+            'links': [(page.number, link['page']) for page in doc for link in page.get_links()],
+        }
+
+
+def merge(files, output, **options):
+    service = PDFCombinerService()
+    service.combine(files, str(output), preparse_workers=0, skip_duplicates=False, **options)
+    return service.last_report
+
+
+@pytest.mark.parametrize('backend', sorted(MERGE_BACKENDS))
+@pytest.mark.parametrize('page_counts', [[2, 1, 3, 1, 2], [1, 2, 3, 1, 2, 3]], ids=['impar', 'par'])
+@pytest.mark.parametrize('create_index', [True, False], ids=['indice', 'simple'])
+def test_tree_merge_matches_sequential_merge(tmp_path, make_pdfs, backend, page_counts, create_index):
+    files = make_pdfs(page_counts)
+    sequential = tmp_path / "secuencial.pdf"
+    tree = tmp_path / "arbol.pdf"
+    merge(files, sequential, backend=backend, create_index=create_index, tree_batch_size=0)
+    report = merge(files, tree, backend=backend, create_index=create_index,
+                   tree_batch_size=2, tree_workers=1)
+
+    # Con lotes de 2: 5 o 6 entradas -> 3 intermedios -> 2
+    assert report['tree'] == {'batch_size': 2, 'levels': 2, 'intermediates': 2}
+    assert report['files'] == len(files)
+    expected = summary(sequential)
+    assert expected['pages'] == sum(page_counts) + (1 if create_index else 0)
+    assert summary(tree) == expected
+    if create_index:
+        assert len(expected['links']) == len(files)
+        assert len(expected['toc']) == 2 + len(files)
+
+
+def test_tree_merge_with_page_ranges_and_pool(tmp_path, make_pdfs):
+    files = make_pdfs([3, 2, 3, 1, 2])
+    page_ranges = ["2-3", None, "-1,1", None, "2"]
+    sequential = tmp_path / "secuencial.pdf"
+    tree = tmp_path / "arbol.pdf"
+    merge(files, sequential, page_ranges=page_ranges, tree_batch_size=0)
+    merge(files, tree, page_ranges=page_ranges, tree_batch_size=2, tree_workers=2)
+    assert summary(tree) == summary(sequential)